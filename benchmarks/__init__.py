@@ -0,0 +1 @@
+"""Benchmarks for the pod_point integration, run with `python -m benchmarks.<name>`"""
@@ -0,0 +1,96 @@
+"""Per-poll cost of merging new charges, and totalling them per pod, as charge
+history grows.
+
+Compares the charge store with the list-plus-set merge and full re-summation it
+replaced. Each poll merges three charges, two we already hold and one new one,
+which is what an incremental refresh returns.
+
+    python -m benchmarks.charge_store
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+import time
+from typing import List
+
+from podpointclient.charge import Charge
+
+HISTORY_SIZES = [1_000, 10_000, 100_000]
+POLLS = 200
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def build_charge(charge_id: int) -> Charge:
+    """A charge starting an hour after the previous one"""
+    return Charge(
+        data={
+            "id": charge_id,
+            "kwh_used": 7.5,
+            "duration": 3600,
+            "starts_at": (EPOCH + timedelta(hours=charge_id)).isoformat(),
+            "ends_at": (EPOCH + timedelta(hours=charge_id, minutes=59)).isoformat(),
+            "energy_cost": 120,
+            "location": {"home": True},
+            "pod": {"id": 1},
+        }
+    )
+
+
+def poll(next_id: int) -> List[Charge]:
+    """The charges returned by an incremental refresh, newest first"""
+    return [build_charge(next_id), build_charge(next_id - 1), build_charge(next_id - 2)]
+
+
+def bench_list_merge(history: List[Charge]) -> float:
+    """Seconds per poll for the previous list-plus-set merge and re-summation"""
+    home_charges = list(reversed(history))
+    polls = [poll(len(history) + i) for i in range(POLLS)]
+
+    started = time.perf_counter()
+    for new_charges in polls:
+        new_charge_ids = set([charge.id for charge in new_charges])
+        home_charges = new_charges + [
+            charge for charge in home_charges if charge.id not in new_charge_ids
+        ]
+
+        total_kwh, total_charge_seconds, total_cost = 0.0, 0, 0
+        for charge in home_charges:
+            total_kwh += charge.kwh_used
+            total_charge_seconds += charge.duration
+            total_cost += charge.energy_cost or 0
+    return (time.perf_counter() - started) / POLLS
+
+
+def bench_charge_store(history: List[Charge]) -> float:
+    """Seconds per poll for the charge store"""
+    # podpointclient creates an aiohttp session when the integration is imported,
+    # which needs a running event loop
+    from custom_components.pod_point.charge_store import (  # pylint: disable=import-outside-toplevel
+        ChargeStore,
+    )
+
+    store = ChargeStore(history)
+    polls = [poll(len(history) + i) for i in range(POLLS)]
+
+    started = time.perf_counter()
+    for new_charges in polls:
+        store.upsert_many(new_charges)
+
+        pod_charges = store.pod_charges(1)
+        _ = (pod_charges.total_kwh, pod_charges.total_charge_seconds)
+        _ = (pod_charges.total_cost, pod_charges.last_charge_cost)
+    return (time.perf_counter() - started) / POLLS
+
+
+async def main() -> None:
+    """Print the per-poll merge and totalling cost for each history size"""
+    print(f"{'charges':>10} {'list merge + sum (us)':>22} {'charge store (us)':>18}")
+    for size in HISTORY_SIZES:
+        history = [build_charge(charge_id) for charge_id in range(1, size + 1)]
+        list_merge = bench_list_merge(history) * 1_000_000
+        charge_store = bench_charge_store(history) * 1_000_000
+        print(f"{size:>10} {list_merge:>22.1f} {charge_store:>18.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,349 @@
+"""Cost of a coordinator refresh, as accounts grow to hundreds of pods and hundreds
+of thousands of charges.
+
+Accounts are generated with the podpointclient factories and served by an
+in-memory client that sleeps for the given latency on every request the real
+client would make. Paginated calls are charged a request per page. For each
+account three refreshes are measured:
+
+- cold: a new coordinator's first refresh, which fetches everything
+- incremental: a connectivity and charges poll that finds one new charge
+- firmware: a firmware poll of every pod
+
+Wall and CPU time come from a plain run of each refresh. Allocations come from a
+second run under tracemalloc: the peak traced during the refresh, and how much
+is still held after it.
+
+A poll should cost the same however long the charge history, so the median CPU
+time of repeated incremental polls is compared with the same pods holding a
+short history. The benchmark fails if it is more than FLAT_TOLERANCE times that.
+
+    python -m benchmarks.coordinator_refresh
+    python -m benchmarks.coordinator_refresh --accounts 500:200000 --latency 50
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+import copy
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import gc
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List, Tuple
+
+from podpointclient.factories import (
+    ChargeFactory,
+    ConnectivityStatusFactory,
+    FirmwareFactory,
+    PodFactory,
+    UserFactory,
+)
+
+from tests.fixtures import (
+    CONNECTIVITY_STATUS_COMPLETE_FIXTURE,
+    FIRMWARE_COMPLETE_FIXTURE,
+    POD_COMPLETE_FIXTURE,
+    USER_COMPLETE_FIXTURE,
+)
+
+# Pods and charges on each generated account
+ACCOUNTS = [(1, 1_000), (10, 10_000), (100, 50_000), (500, 200_000)]
+# Incremental polls timed for the per-poll cost, against a history of
+# BASELINE_CHARGES
+POLLS = 25
+BASELINE_CHARGES = 1_000
+FLAT_TOLERANCE = 3.0
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+FIRST_UNIT_ID = 100_000
+
+
+def build_pods(pod_count: int):
+    """Pods with their own ids, PSLs and unit ids"""
+    pods = []
+    for index in range(pod_count):
+        pod = copy.deepcopy(POD_COMPLETE_FIXTURE)
+        pod["id"] = index + 1
+        pod["ppid"] = f"PSL-{FIRST_UNIT_ID + index}"
+        pod["unit_id"] = FIRST_UNIT_ID + index
+        pods.append(pod)
+
+    return PodFactory().build_pods({"pods": pods})
+
+
+def charge_data(charge_id: int, unit_id: int):
+    """A complete home charge on a pod, an hour after the previous charge"""
+    starts_at = EPOCH + timedelta(hours=charge_id)
+    return {
+        "id": charge_id,
+        "kwh_used": 7.5,
+        "duration": 3540,
+        "starts_at": starts_at.isoformat(),
+        "ends_at": (starts_at + timedelta(minutes=59)).isoformat(),
+        "energy_cost": 120,
+        "location": {"id": 1234, "home": True, "timezone": "Europe/London"},
+        "pod": {"id": unit_id},
+    }
+
+
+def build_charges(charge_count: int, pod_count: int):
+    """Charges spread across the pods, newest first as Pod Point returns them"""
+    return ChargeFactory().build_charges(
+        {
+            "charges": [
+                charge_data(charge_id, FIRST_UNIT_ID + charge_id % pod_count)
+                for charge_id in range(charge_count, 0, -1)
+            ]
+        }
+    )
+
+
+class FakeClient:
+    """Serves a generated account from memory in place of a `PodPointClient`,
+    sleeping for `latency` seconds and counting every request the real client
+    would have made"""
+
+    def __init__(self, pod_count: int, charge_count: int, latency: float) -> None:
+        self.pod_count = pod_count
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.requests = 0
+        self.pods = build_pods(pod_count)
+        self.charges = build_charges(charge_count, pod_count)
+        self.firmwares = FirmwareFactory().build_firmwares(FIRMWARE_COMPLETE_FIXTURE)
+        self.user = UserFactory().build_user(USER_COMPLETE_FIXTURE)
+        self.connectivity_status = (
+            ConnectivityStatusFactory().build_connectivity_status(
+                CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+            )
+        )
+
+    async def __request(self, name: str, pages: int = 1) -> None:
+        self.calls[name] += 1
+        self.requests += pages
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * pages)
+
+    def add_charge(self) -> None:
+        """A charge finishes, it is the newest on the account"""
+        charge_id = self.charges[0].id + 1
+        unit_id = FIRST_UNIT_ID + charge_id % self.pod_count
+        self.charges[0:0] = ChargeFactory().build_charges(
+            {"charges": [charge_data(charge_id, unit_id)]}
+        )
+
+    async def async_get_all_pods(self, perpage=5, includes=None):
+        await self.__request("async_get_all_pods", math.ceil(len(self.pods) / perpage))
+        return build_pods(self.pod_count)
+
+    async def async_get_charges(self, perpage=5, page=1):
+        await self.__request("async_get_charges")
+        return self.charges[(page - 1) * perpage : page * perpage]
+
+    async def async_get_firmware(self, pod):
+        await self.__request("async_get_firmware")
+        return self.firmwares
+
+    async def async_get_user(self, includes=None):
+        await self.__request("async_get_user")
+        return self.user
+
+    async def async_get_connectivity_status(self, pod):
+        await self.__request("async_get_connectivity_status")
+        return self.connectivity_status
+
+
+@dataclass
+class Measurement:
+    """What one refresh cost"""
+
+    wall: float
+    cpu: float
+    peak_kib: float
+    retained_kib: float
+    requests: int
+    calls: Counter
+
+
+async def measure(
+    client: FakeClient, refresh: Callable[[], Awaitable[None]]
+) -> Measurement:
+    """Time a refresh, then run it again under tracemalloc for its allocations"""
+    client.calls.clear()
+    client.requests = 0
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    await refresh()
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    calls, requests = Counter(client.calls), client.requests
+
+    tracemalloc.start()
+    try:
+        await refresh()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(wall, cpu, peak / 1024, retained / 1024, requests, calls)
+
+
+async def bench_account(
+    hass, pod_count: int, charge_count: int, latency: float
+) -> List[Tuple[str, Measurement]]:
+    """Measure the cold, incremental and firmware refreshes of an account"""
+    # pylint: disable=import-outside-toplevel
+    from custom_components.pod_point.const import (
+        TIER_CHARGES,
+        TIER_CONNECTIVITY,
+        TIER_FIRMWARE,
+    )
+    from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+
+    client = FakeClient(pod_count, charge_count, latency)
+    coordinators: List[PodPointDataUpdateCoordinator] = []
+
+    def new_coordinator() -> PodPointDataUpdateCoordinator:
+        coordinator = PodPointDataUpdateCoordinator(
+            hass,
+            client=client,
+            scan_interval=timedelta(seconds=60),
+        )
+        coordinators.append(coordinator)
+        return coordinator
+
+    async def refresh(coordinator: PodPointDataUpdateCoordinator) -> None:
+        await coordinator.async_refresh()
+        if not coordinator.last_update_success:
+            raise RuntimeError(f"Refresh failed: {coordinator.last_exception!r}")
+
+    async def cold() -> None:
+        await refresh(new_coordinator())
+
+    warm = new_coordinator()
+    await refresh(warm)
+
+    async def incremental() -> None:
+        client.add_charge()
+        warm.async_mark_tiers_due(TIER_CONNECTIVITY, TIER_CHARGES)
+        await refresh(warm)
+
+    async def firmware() -> None:
+        warm.async_mark_tiers_due(TIER_FIRMWARE)
+        await refresh(warm)
+
+    results = [
+        ("cold", await measure(client, cold)),
+        ("incremental", await measure(client, incremental)),
+        ("firmware", await measure(client, firmware)),
+    ]
+
+    for coordinator in coordinators:
+        await coordinator.async_shutdown()
+
+    return results
+
+
+async def poll_cost(hass, pod_count: int, charge_count: int) -> float:
+    """Median CPU seconds of an incremental poll of a warm coordinator"""
+    # pylint: disable=import-outside-toplevel
+    from custom_components.pod_point.const import TIER_CHARGES, TIER_CONNECTIVITY
+    from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+
+    client = FakeClient(pod_count, charge_count, 0.0)
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=client,
+        scan_interval=timedelta(seconds=60),
+    )
+    await coordinator.async_refresh()
+    # Leave the garbage of the first refresh out of the polls
+    gc.collect()
+
+    costs = []
+    for _ in range(POLLS):
+        client.add_charge()
+        coordinator.async_mark_tiers_due(TIER_CONNECTIVITY, TIER_CHARGES)
+        started = time.process_time()
+        await coordinator.async_refresh()
+        costs.append(time.process_time() - started)
+        if not coordinator.last_update_success:
+            raise RuntimeError(f"Refresh failed: {coordinator.last_exception!r}")
+
+    await coordinator.async_shutdown()
+    return statistics.median(costs)
+
+
+def parse_account(value: str) -> Tuple[int, int]:
+    """`pods:charges`, such as 500:200000"""
+    pods, charges = value.split(":")
+    return int(pods), int(charges)
+
+
+async def main(accounts: List[Tuple[int, int]], latency: float) -> None:
+    """Print the cost of each refresh for every account"""
+    # pylint: disable=import-outside-toplevel,unused-import
+    # The test Home Assistant puts its own custom_components on the path, import
+    # ours first
+    import custom_components.pod_point.coordinator  # noqa: F401
+    from pytest_homeassistant_custom_component.common import async_test_home_assistant
+
+    print(
+        f"{'pods':>5} {'charges':>8} {'refresh':>12} {'wall (ms)':>10} "
+        f"{'cpu (ms)':>9} {'peak (KiB)':>11} {'held (KiB)':>11} {'requests':>9}  calls"
+    )
+    async with async_test_home_assistant() as hass:
+        for pod_count, charge_count in accounts:
+            for name, result in await bench_account(
+                hass, pod_count, charge_count, latency
+            ):
+                calls = ", ".join(
+                    f"{call.replace('async_get_', '')}={count}"
+                    for call, count in sorted(result.calls.items())
+                )
+                print(
+                    f"{pod_count:>5} {charge_count:>8} {name:>12} "
+                    f"{result.wall * 1000:>10.1f} {result.cpu * 1000:>9.1f} "
+                    f"{result.peak_kib:>11.0f} {result.retained_kib:>11.0f} "
+                    f"{result.requests:>9}  {calls}"
+                )
+
+            cost = await poll_cost(hass, pod_count, charge_count)
+            baseline = await poll_cost(
+                hass, pod_count, min(charge_count, BASELINE_CHARGES)
+            )
+            print(
+                f"{pod_count:>5} {charge_count:>8} {'per poll':>12} "
+                f"{'':>10} {cost * 1000:>9.1f}  "
+                f"{baseline * 1000:.1f} with {min(charge_count, BASELINE_CHARGES)} "
+                "charges"
+            )
+            if cost > baseline * FLAT_TOLERANCE:
+                raise RuntimeError(
+                    f"A poll of {charge_count} charges costs {cost * 1000:.1f}ms, "
+                    f"more than {FLAT_TOLERANCE}x the {baseline * 1000:.1f}ms of "
+                    f"{BASELINE_CHARGES}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--accounts",
+        nargs="+",
+        type=parse_account,
+        default=ACCOUNTS,
+        metavar="PODS:CHARGES",
+        help="accounts to generate (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="milliseconds each request to Pod Point takes (default: 0)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.accounts, args.latency / 1000))
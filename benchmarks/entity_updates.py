@@ -0,0 +1,68 @@
+"""Per-refresh cost of updating every entity, as the number of entities grows.
+
+Compares each entity resolving its pod for itself (building the attributes from
+`pod.dict`, ranking the pod statuses and evaluating the charge schedules) with the
+coordinator resolving each pod once into a view model that its entities read.
+Every pod has 15 entities.
+
+    python -m benchmarks.entity_updates
+"""
+
+import asyncio
+import time
+
+from podpointclient.factories import PodFactory
+
+from tests.fixtures import POD_COMPLETE_FIXTURE
+
+POD_COUNTS = [1, 4, 16, 64]
+ENTITIES_PER_POD = 15
+REFRESHES = 200
+
+
+def bench_per_entity(pods) -> float:
+    """Seconds per refresh when every entity resolves its own pod"""
+    # podpointclient creates an aiohttp session when the integration is imported,
+    # which needs a running event loop
+    from custom_components.pod_point.view_model import (  # pylint: disable=import-outside-toplevel
+        build_pod_view_model,
+    )
+
+    started = time.perf_counter()
+    for _ in range(REFRESHES):
+        for pod in pods:
+            for _ in range(ENTITIES_PER_POD):
+                view_model = build_pod_view_model(pod)
+                _ = (view_model.state, view_model.attributes)
+    return (time.perf_counter() - started) / REFRESHES
+
+
+def bench_view_model(pods) -> float:
+    """Seconds per refresh when each pod is resolved once and shared"""
+    from custom_components.pod_point.view_model import (  # pylint: disable=import-outside-toplevel
+        build_pod_view_model,
+    )
+
+    started = time.perf_counter()
+    for _ in range(REFRESHES):
+        view_models = [build_pod_view_model(pod) for pod in pods]
+        for view_model in view_models:
+            for _ in range(ENTITIES_PER_POD):
+                _ = (view_model.state, view_model.attributes)
+    return (time.perf_counter() - started) / REFRESHES
+
+
+async def main() -> None:
+    """Print the per-refresh entity update cost for each number of entities"""
+    print(f"{'entities':>10} {'per entity (us)':>16} {'view model (us)':>16}")
+    for pod_count in POD_COUNTS:
+        pods = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE] * pod_count})
+        per_entity = bench_per_entity(pods) * 1_000_000
+        view_model = bench_view_model(pods) * 1_000_000
+        print(
+            f"{pod_count * ENTITIES_PER_POD:>10} {per_entity:>16.1f} {view_model:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,7 +9,7 @@ import asyncio
 from datetime import timedelta
 import logging
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntry
@@ -22,20 +22,45 @@ from podpointclient.charge import Charge
 from podpointclient.client import PodPointClient
 from podpointclient.pod import Pod
 
+from .charge_cache import ChargeCache
+from .circuit_breaker import CircuitBreaker, CircuitBreakerClient
 from .const import (
     APP_IMAGE_URL_BASE,
+    CONF_ADAPTIVE_POLLING,
+    CONF_API_CONCURRENCY,
+    CONF_CURRENCY,
     CONF_EMAIL,
     CONF_HTTP_DEBUG,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_DATA_AGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
     CONF_PASSWORD,
+    CONF_REFRESH_WINDOW,
     CONF_SCAN_INTERVAL,
+    CONF_STALE_FAILURES,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_API_CONCURRENCY,
+    DEFAULT_CURRENCY,
     DEFAULT_HTTP_DEBUG,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REFRESH_WINDOW,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_FAILURES,
     DOMAIN,
     PLATFORMS,
     STARTUP_MESSAGE,
+    TIER_CONNECTIVITY,
+    TIER_SCAN_INTERVALS,
 )
 from .coordinator import PodPointDataUpdateCoordinator
+from .energy_statistics import EnergyStatisticsImporter
+from .rate_limiter import RateLimitedClient, RateLimiter, get_rate_limiter
 from .services import async_deregister_services, async_register_services
+from .snapshot import CoordinatorSnapshot
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -47,16 +72,14 @@ async def async_setup(hass: HomeAssistant, config: Config):
     return True
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    """Set up this integration using UI."""
-    # If data for pod_point is not setup, prime it
-    if hass.data.get(DOMAIN) is None:
-        hass.data.setdefault(DOMAIN, {})
-        _LOGGER.info(STARTUP_MESSAGE)
-
-    email = entry.data.get(CONF_EMAIL)
-    password = entry.data.get(CONF_PASSWORD)
-
+def _build_client(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    rate_limiter: RateLimiter,
+    circuit_breaker: CircuitBreaker,
+) -> PodPointClient:
+    """A client for the entry's account, its calls limited and made through the
+    breaker"""
     session = async_get_clientsession(hass)
 
     # If http debug is set, use that, or default
@@ -66,24 +89,101 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         http_debug = DEFAULT_HTTP_DEBUG
 
     client = PodPointClient(
-        username=email, password=password, session=session, http_debug=http_debug
+        username=entry.data.get(CONF_EMAIL),
+        password=entry.data.get(CONF_PASSWORD),
+        session=session,
+        http_debug=http_debug,
     )
+    client = RateLimitedClient(client, rate_limiter)
+    return CircuitBreakerClient(client, circuit_breaker)
 
+
+def _coordinator_options(entry: ConfigEntry) -> Dict[str, Any]:
+    """The coordinator's options from the entry, defaulting those that are not set"""
     # If a scan interval is set, use that, or default
     try:
         scan_interval = timedelta(seconds=entry.options[CONF_SCAN_INTERVAL])
     except KeyError:
         scan_interval = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
 
+    # Each class of data has its own interval, the scan interval above is used for
+    # connectivity status
+    tier_intervals = {
+        tier: timedelta(seconds=entry.options.get(option, default))
+        for tier, (option, default) in TIER_SCAN_INTERVALS.items()
+        if tier != TIER_CONNECTIVITY
+    }
+
+    return {
+        "scan_interval": scan_interval,
+        "tier_intervals": tier_intervals,
+        # Limit how many per-pod API calls the coordinator will make at once
+        "api_concurrency": entry.options.get(
+            CONF_API_CONCURRENCY, DEFAULT_API_CONCURRENCY
+        ),
+        # Poll faster while pods are active, and back off while they are idle
+        "adaptive_polling": entry.options.get(
+            CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+        ),
+        "min_scan_interval": timedelta(
+            seconds=entry.options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+        ),
+        "max_scan_interval": timedelta(
+            seconds=entry.options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+        ),
+        # Refreshes requested after commands within this window are combined
+        "refresh_window": timedelta(
+            seconds=entry.options.get(CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW)
+        ),
+        # The last good data is shown through failed refreshes, until too many fail
+        # in a row or it gets too old
+        "stale_failures": entry.options.get(
+            CONF_STALE_FAILURES, DEFAULT_STALE_FAILURES
+        ),
+        "max_data_age": timedelta(
+            seconds=entry.options.get(CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE)
+        ),
+    }
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Set up this integration using UI."""
+    # If data for pod_point is not setup, prime it
+    if hass.data.get(DOMAIN) is None:
+        hass.data.setdefault(DOMAIN, {})
+        _LOGGER.info(STARTUP_MESSAGE)
+
+    email = entry.data.get(CONF_EMAIL)
+
+    # Every call made for the account shares one rate limiter and request budget
+    rate_limiter = get_rate_limiter(hass, email)
+
+    # Stop calling Pod Point while it cannot be reached, before using the budget
+    circuit_breaker = CircuitBreaker()
+
     # Setup our data coordinator with the desired scan interval
     coordinator = PodPointDataUpdateCoordinator(
-        hass, client=client, scan_interval=scan_interval
+        hass,
+        client=_build_client(hass, entry, rate_limiter, circuit_breaker),
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+        entry_id=entry.entry_id,
+        **_coordinator_options(entry),
     )
+    coordinator.entry_options = dict(entry.options)
 
-    # Check the credentials we have and ensure that we can perform a refresh
-    await coordinator.async_config_entry_first_refresh()
+    if await coordinator.async_restore_snapshot():
+        # Entities are created from the snapshot straight away, even if Pod Point
+        # cannot be reached, and brought up to date by a refresh in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        # Check the credentials we have and ensure that we can perform a refresh
+        await coordinator.async_config_entry_first_refresh()
 
-    # Given a successful inital refresh, store this coordinator for this specific config entry
+    # Given a successful inital refresh or a snapshot, store this coordinator for this
+    # specific config entry
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     # Setup static image asset serving
@@ -101,7 +201,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
 
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Backfill charge history into long-term statistics, and keep it up to date
+    if "recorder" in hass.config.components and entry.options.get(
+        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+    ):
+        importer = EnergyStatisticsImporter(
+            hass, coordinator, entry.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+        )
+        entry.async_on_unload(
+            coordinator.async_add_listener(importer.async_handle_coordinator_update)
+        )
+        entry.async_on_unload(entry.add_update_listener(importer.async_update_options))
+        entry.async_create_background_task(
+            hass, importer.async_import(), f"{DOMAIN} statistics import"
+        )
 
     # Register the services
     await async_register_services(hass)
@@ -122,15 +237,62 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
     if unloaded:
+        # Saves are delayed to batch them, a reload would read what was there before
+        await coordinator.async_flush_caches()
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unloaded
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    unloaded = await async_unload_entry(hass, entry)
-    if unloaded is False:
-        _LOGGER.error("Error unloading entry: %s", entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove cached data when an entry is deleted."""
+    await ChargeCache(hass, entry.entry_id).async_remove()
+    await CoordinatorSnapshot(hass, entry.entry_id).async_remove()
 
-    await async_setup_entry(hass, entry)
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator and entities. The entry is
+    only reloaded when its credentials, platforms or statistics import change."""
+    coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    previous = coordinator.entry_options
+    changed = {
+        option
+        for option in set(previous.keys()) | set(entry.options.keys())
+        if previous.get(option) != entry.options.get(option)
+    }
+    credentials_changed = (
+        entry.data.get(CONF_EMAIL) != coordinator.api.email
+        or entry.data.get(CONF_PASSWORD) != coordinator.api.password
+    )
+    platforms_changed = coordinator.platforms != [
+        platform for platform in PLATFORMS if entry.options.get(platform, True)
+    ]
+    import_statistics_changed = previous.get(
+        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+    ) != entry.options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS)
+
+    if credentials_changed or platforms_changed or import_statistics_changed:
+        await async_reload_entry(hass, entry)
+        return
+
+    if len(changed) == 0:
+        return
+
+    _LOGGER.debug("=== OPTIONS UPDATE ===\nChanged: %s", sorted(changed))
+    coordinator.entry_options = dict(entry.options)
+
+    if CONF_HTTP_DEBUG in changed:
+        coordinator.api = _build_client(
+            hass, entry, coordinator.rate_limiter, coordinator.circuit_breaker
+        )
+
+    coordinator.apply_options(**_coordinator_options(entry))
+
+    # Currency and availability are read by the entities as they write their state
+    coordinator.async_rewrite_states()
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload config entry, through the config entries so the listeners and
+    subscriptions of the previous setup are removed"""
+    await hass.config_entries.async_reload(entry.entry_id)
@@ -9,9 +9,9 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.helpers.entity import EntityCategory
 
-from .const import ATTR_CONNECTION_STATE_ONLINE, ATTR_STATE, ATTRIBUTION, DOMAIN
+from .const import DOMAIN
 from .coordinator import PodPointDataUpdateCoordinator
-from .entity import PodPointEntity
+from .entity import PodPointEntity, async_track_pods
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -19,21 +19,17 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 async def async_setup_entry(hass, entry, async_add_devices):
     """Setup binary_sensor platform."""
     coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    # Handle coordinator offline on boot - no data will be populated
-    if coordinator.online is False:
+    # Handle coordinator offline on boot without a snapshot - no data will be populated
+    if coordinator.data is None:
         return
 
-    sensors = []
-    for i in range(len(coordinator.data)):
-        cable_sensor = PodPointCableConnectionSensor(coordinator, entry, i)
-        cable_sensor.pod_id = i
-        sensors.append(cable_sensor)
+    def create_sensors(unit_id: int):
+        return [
+            PodPointCableConnectionSensor(coordinator, entry, unit_id),
+            PodPointCloudConnectionSensor(coordinator, entry, unit_id),
+        ]
 
-        cloud_sensor = PodPointCloudConnectionSensor(coordinator, entry, i)
-        cloud_sensor.pod_id = i
-        sensors.append(cloud_sensor)
-
-    async_add_devices(sensors)
+    async_add_devices(async_track_pods(hass, entry, async_add_devices, create_sensors))
 
 
 class PodPointCableConnectionSensor(PodPointEntity, BinarySensorEntity):
@@ -68,16 +64,7 @@ class PodPointCloudConnectionSensor(PodPointEntity, BinarySensorEntity):
     @property
     def is_on(self):
         """Return true if the binary_sensor is on."""
-        if self.pod is None:
-            return False
-
-        if self.pod.connectivity_status is None:
-            return False
-
-        return (
-            self.pod.connectivity_status.connectivity_status
-            == ATTR_CONNECTION_STATE_ONLINE
-        )
+        return self.view_model.cloud_connected
 
     @property
     def icon(self):
@@ -0,0 +1,58 @@
+"""Timeouts for calls to Pod Point that only count the request itself"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+
+from .const import DOMAIN
+
+_current: ContextVar[Optional["CallTimeout"]] = ContextVar(
+    f"{DOMAIN}_call_timeout", default=None
+)
+
+
+class CallTimeout:
+    """Abandons a call after `seconds`, or at the `deadline` (loop time) whichever
+    comes first. While the call waits for the rate limiter the timeout is held
+    until the deadline, so only the request itself counts against `seconds`."""
+
+    def __init__(self, seconds: float, deadline: float = None) -> None:
+        self.seconds = seconds
+        self.deadline = deadline
+        self._timeout: asyncio.Timeout = None
+        self._token = None
+        self.waiting = False  # For the rate limiter, the request is yet to be made
+
+    @staticmethod
+    def current() -> Optional["CallTimeout"]:
+        """The timeout of the call being made, if it has one"""
+        return _current.get()
+
+    @property
+    def expired(self) -> bool:
+        """Has the call been abandoned?"""
+        return self._timeout is not None and self._timeout.expired()
+
+    def pause(self) -> None:
+        """The call is waiting its turn, only the deadline applies"""
+        self.waiting = True
+        self._timeout.reschedule(self.deadline)
+
+    def resume(self) -> None:
+        """The request is being made, it has `seconds` from now"""
+        self.waiting = False
+        when = asyncio.get_running_loop().time() + self.seconds
+        if self.deadline is not None:
+            when = min(when, self.deadline)
+        self._timeout.reschedule(when)
+
+    async def __aenter__(self) -> "CallTimeout":
+        self._timeout = asyncio.timeout_at(None)
+        await self._timeout.__aenter__()
+        self.resume()
+        self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> Optional[bool]:
+        _current.reset(self._token)
+        return await self._timeout.__aexit__(exc_type, exc_value, traceback)
@@ -0,0 +1,127 @@
+"""Persistent cache of home charges, so a restart does not refetch every charge"""
+
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from podpointclient.charge import Charge
+from podpointclient.helpers.functions import lazy_iso_format_datetime
+
+from .const import CHARGE_CACHE_KEY, CHARGE_CACHE_SAVE_DELAY, CHARGE_CACHE_VERSION
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+@dataclass
+class ChargesPull:
+    """A pull of every charge that is part way through, the pages fetched so far
+    and the page to carry on from"""
+
+    next_page: int = 1
+    charges: List[Charge] = field(default_factory=list)
+
+
+class _VersionedStore(Store):
+    """Store that discards data written with a different schema version. The cache
+    can always be rebuilt from Pod Point, so there is nothing to migrate."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict
+    ) -> Dict:
+        _LOGGER.debug(
+            "Discarding charge cache with schema version %s.%s",
+            old_major_version,
+            old_minor_version,
+        )
+        return {}
+
+
+class ChargeCache:
+    """Persist the home charges and the pods they were fetched for"""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = _VersionedStore(
+            hass, CHARGE_CACHE_VERSION, f"{CHARGE_CACHE_KEY}.{entry_id}"
+        )
+        self._pending: Callable[[], Dict[str, Any]] = None  # Save yet to be written
+
+    async def async_load(
+        self,
+    ) -> Tuple[Set[int], List[Charge], Optional[ChargesPull]]:
+        """Load the cached pod ids and charges, empty if nothing is cached, along
+        with any pull of every charge still under way"""
+        data = await self._store.async_load() or {}
+
+        pod_ids: Set[int] = set(data.get("pod_ids", []))
+        charges: List[Charge] = [
+            Charge(data=charge_data) for charge_data in data.get("charges", [])
+        ]
+
+        pull: ChargesPull = None
+        if data.get("pull") is not None:
+            pull = ChargesPull(
+                next_page=data["pull"]["next_page"],
+                charges=[
+                    Charge(data=charge_data) for charge_data in data["pull"]["charges"]
+                ],
+            )
+
+        return pod_ids, charges, pull
+
+    def async_save(
+        self,
+        pod_ids: Set[int],
+        charges: Iterable[Charge],
+        pull: ChargesPull = None,
+    ) -> None:
+        """Schedule a write of the pod ids and charges, writes are batched. Charges
+        are read when the write happens"""
+
+        def data() -> Dict[str, Any]:
+            self._pending = None
+            return self.__serialize(pod_ids, charges, pull)
+
+        self._pending = data
+        self._store.async_delay_save(data, CHARGE_CACHE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the scheduled save now, if it has not been written yet"""
+        if self._pending is not None:
+            await self._store.async_save(self._pending())
+
+    async def async_remove(self) -> None:
+        """Remove the cache from disk"""
+        await self._store.async_remove()
+
+    @classmethod
+    def __serialize(
+        cls, pod_ids: Set[int], charges: Iterable[Charge], pull: ChargesPull
+    ) -> Dict[str, Any]:
+        data = {
+            "pod_ids": sorted(pod_ids),
+            "charges": [cls.__serialize_charge(charge) for charge in charges],
+        }
+        if pull is not None:
+            data["pull"] = {
+                "next_page": pull.next_page,
+                "charges": [cls.__serialize_charge(charge) for charge in pull.charges],
+            }
+
+        return data
+
+    @staticmethod
+    def __serialize_charge(charge: Charge) -> Dict[str, Any]:
+        """Only the fields used by the integration are stored, in the same shape as
+        the Pod Point API so charges can be rebuilt with `Charge(data=...)`"""
+        return {
+            "id": charge.id,
+            "kwh_used": charge.kwh_used,
+            "duration": charge.duration,
+            "starts_at": lazy_iso_format_datetime(charge.starts_at),
+            "ends_at": lazy_iso_format_datetime(charge.ends_at),
+            "energy_cost": charge.energy_cost,
+            "location": {"home": charge.location.home},
+            "pod": {"id": charge.pod.id},
+        }
@@ -0,0 +1,236 @@
+"""Indexed store of home charges"""
+
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from podpointclient.charge import Charge
+
+SortKey = Tuple[float, int]
+
+# Energy is totalled as an integer number of micro kWh, so that adding and removing
+# charges never lets floating point error creep into the totals
+_KWH_SCALE = 1_000_000
+
+
+def _sort_key(charge: Charge) -> SortKey:
+    starts_at = charge.starts_at.timestamp() if charge.starts_at else 0.0
+    return (starts_at, charge.id)
+
+
+class _SortedKeys:
+    """Sort keys kept in order, oldest first. A key after the last is appended, the
+    common case of a charge that started after all others. Any other key waits to
+    be merged with a single sort the next time the order is read, Pod Point lists
+    charges newest first so a page of them would otherwise be an O(n) insert each."""
+
+    def __init__(self) -> None:
+        self._keys: List[SortKey] = []
+        self._unmerged: List[SortKey] = []
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._unmerged)
+
+    def add(self, key: SortKey) -> None:
+        """Add a key"""
+        if len(self._keys) == 0 or key > self._keys[-1]:
+            self._keys.append(key)
+        else:
+            self._unmerged.append(key)
+
+    def remove(self, key: SortKey) -> None:
+        """Remove a key, only needed when a charge's start time or pod changes"""
+        del self.ordered()[bisect_left(self._keys, key)]
+
+    def ordered(self) -> List[SortKey]:
+        """The keys oldest first, not to be modified"""
+        if len(self._unmerged) > 0:
+            # Both are runs timsort finds, merging them is close to linear
+            self._keys.extend(self._unmerged)
+            self._keys.sort()
+            self._unmerged = []
+
+        return self._keys
+
+
+class PodCharges(Sequence):
+    """The charges for one pod, newest first, along with totals that are kept up to
+    date as charges are added and changed"""
+
+    def __init__(self, charges: Dict[int, Charge]) -> None:
+        self._charges = charges  # Shared with the store
+        self._order = _SortedKeys()
+        self._ongoing: Set[SortKey] = set()
+
+        self._total_kwh: int = 0
+        self.total_charge_seconds: int = 0
+        self.total_cost: int = 0
+        self.last_charge: Charge = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, index: int) -> Charge:
+        return self._charges[self._order.ordered()[-1 - index][1]]
+
+    def __iter__(self) -> Iterator[Charge]:
+        for _, charge_id in reversed(self._order.ordered()):
+            yield self._charges[charge_id]
+
+    @property
+    def total_kwh(self) -> float:
+        """Energy used by every charge"""
+        return self._total_kwh / _KWH_SCALE
+
+    @property
+    def current_kwh(self) -> float:
+        """Energy used by the earliest ongoing charge"""
+        if len(self._ongoing) == 0:
+            return 0.0
+
+        return self._charges[min(self._ongoing)[1]].kwh_used
+
+    @property
+    def last_charge_cost(self) -> int:
+        """Cost of the most recently completed charge"""
+        return self.last_charge.energy_cost if self.last_charge is not None else None
+
+    def _add(self, charge: Charge, key: SortKey, order: bool = True) -> None:
+        if order:
+            self._order.add(key)
+        self._total_kwh += round(charge.kwh_used * _KWH_SCALE)
+        self.total_charge_seconds += charge.duration
+        self.total_cost += charge.energy_cost or 0
+
+        if charge.ends_at is None:
+            self._ongoing.add(key)
+        elif self.__is_last_charge(charge):
+            self.last_charge = charge
+
+    def _remove(self, charge: Charge, key: SortKey) -> None:
+        self.__subtract(charge, key)
+
+        if self.last_charge is charge:
+            self.__find_last_charge()
+
+    def _replace(
+        self, previous: Charge, previous_key: SortKey, charge: Charge, key: SortKey
+    ) -> None:
+        """Swap in a newer version of a charge, typically an ongoing charge or one
+        that has just completed"""
+        was_last_charge = self.last_charge is previous
+        # A charge that kept its start time keeps its place in the ordering
+        moved = previous_key != key
+        self.__subtract(previous, previous_key, moved)
+
+        if was_last_charge and not self.__is_last_charge(charge, previous):
+            # The last charge no longer qualifies, rare so search for its successor
+            self.__find_last_charge()
+        elif was_last_charge:
+            self.last_charge = None
+
+        self._add(charge, key, moved)
+
+    def __subtract(self, charge: Charge, key: SortKey, order: bool = True) -> None:
+        if order:
+            self._order.remove(key)
+        self._total_kwh -= round(charge.kwh_used * _KWH_SCALE)
+        self.total_charge_seconds -= charge.duration
+        self.total_cost -= charge.energy_cost or 0
+        self._ongoing.discard(key)
+
+    def __is_last_charge(self, charge: Charge, than: Charge = None) -> bool:
+        """Did this charge complete after the last charge (or `than`), with a cost?"""
+        than = than if than is not None else self.last_charge
+
+        if charge.ends_at is None or charge.energy_cost is None:
+            return False
+
+        return than is None or charge.ends_at >= than.ends_at
+
+    def __find_last_charge(self) -> None:
+        self.last_charge = None
+        for charge in self:
+            if self.__is_last_charge(charge):
+                self.last_charge = charge
+
+
+class ChargeStore:
+    """Charges keyed by id and kept ordered by start time. Merging a new charge is a
+    dict lookup, new charges are almost always the most recent so are appended to
+    the end of the ordering and older ones are sorted in together when next read.
+    Per-pod totals are updated as charges are merged, rather than summed from every
+    charge"""
+
+    def __init__(self, charges: Iterable[Charge] = ()) -> None:
+        self._charges: Dict[int, Charge] = {}
+        self._keys: Dict[int, SortKey] = {}
+        self._order = _SortedKeys()
+        self._pods: Dict[int, PodCharges] = {}
+
+        self.upsert_many(charges)
+
+    def __len__(self) -> int:
+        return len(self._charges)
+
+    def __contains__(self, charge_id: int) -> bool:
+        return charge_id in self._charges
+
+    def __iter__(self) -> Iterator[Charge]:
+        """Iterate charges newest first, the order Pod Point returns them in"""
+        return self.newest_first()
+
+    def get(self, charge_id: int) -> Charge:
+        """Return the charge with this id, or None"""
+        return self._charges.get(charge_id, None)
+
+    def pod_charges(self, unit_id: int) -> PodCharges:
+        """Return the charges and totals for a pod"""
+        if unit_id not in self._pods:
+            self._pods[unit_id] = PodCharges(self._charges)
+
+        return self._pods[unit_id]
+
+    def newest_first(self) -> Iterator[Charge]:
+        """Iterate charges from the most recent start time"""
+        for _, charge_id in reversed(self._order.ordered()):
+            yield self._charges[charge_id]
+
+    def oldest_first(self) -> Iterator[Charge]:
+        """Iterate charges from the earliest start time"""
+        for _, charge_id in self._order.ordered():
+            yield self._charges[charge_id]
+
+    def upsert(self, charge: Charge) -> bool:
+        """Add a charge, or replace the charge with the same id. Returns True if the
+        charge was added"""
+        if charge.id is None:
+            return False
+
+        key = _sort_key(charge)
+        previous = self._charges.get(charge.id, None)
+        previous_key = self._keys.get(charge.id, None)
+
+        if previous_key != key:
+            if previous_key is not None:
+                self._order.remove(previous_key)
+            self._order.add(key)
+            self._keys[charge.id] = key
+
+        self._charges[charge.id] = charge
+
+        # pylint: disable=protected-access
+        pod_charges = self.pod_charges(charge.pod.id)
+        if previous is None:
+            pod_charges._add(charge, key)
+        elif previous.pod.id == charge.pod.id:
+            pod_charges._replace(previous, previous_key, charge, key)
+        else:
+            self.pod_charges(previous.pod.id)._remove(previous, previous_key)
+            pod_charges._add(charge, key)
+
+        return previous is None
+
+    def upsert_many(self, charges: Iterable[Charge]) -> int:
+        """Upsert every charge, returning how many were added"""
+        return sum(1 for charge in charges if self.upsert(charge))
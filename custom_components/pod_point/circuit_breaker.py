@@ -0,0 +1,158 @@
+"""Circuit breaker that stops calling Pod Point while it cannot be reached"""
+
+import asyncio
+from functools import wraps
+import logging
+import random
+import time
+from typing import Any, Callable
+
+from podpointclient.client import PodPointClient
+from podpointclient.errors import ApiConnectionError
+
+from .call_timeout import CallTimeout
+from .const import (
+    CIRCUIT_BREAKER_BASE_DELAY,
+    CIRCUIT_BREAKER_MAX_DELAY,
+    CIRCUIT_BREAKER_THRESHOLD,
+)
+from .rate_limiter import RequestBudgetExhausted
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ApiConnectionError):
+    """Pod Point is not being called until the breaker's delay has passed"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Not calling Pod Point for another {seconds:.0f}s")
+
+
+class CircuitBreaker:
+    """Closed, calls are made as normal. Once `threshold` calls in a row fail to
+    connect or time out it opens, and calls fail straight away for a delay that
+    doubles each time it opens, with jitter so installations do not retry in
+    lockstep. After the delay it is half open, a single call is let through as a
+    probe and closes the breaker if it answers or opens it again if not."""
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+        base_delay: float = CIRCUIT_BREAKER_BASE_DELAY,
+        max_delay: float = CIRCUIT_BREAKER_MAX_DELAY,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._jitter = jitter
+
+        self._state = STATE_CLOSED
+        self.failures = 0  # Calls in a row that failed to connect
+        self.times_opened = 0  # Since the breaker last closed
+        self.retry_at: float = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """The breaker's state, open becomes half open once the delay has passed"""
+        if self._state == STATE_OPEN and self._clock() >= self.retry_at:
+            self._state = STATE_HALF_OPEN
+        return self._state
+
+    @property
+    def seconds_until_retry(self) -> float:
+        """Seconds until a probe can be made, 0 unless the breaker is open"""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return self.retry_at - self._clock()
+
+    async def async_call(self, request: Callable[[], Any]) -> Any:
+        """Make the call unless the breaker is open, or a probe is in flight"""
+        state = self.state
+        if state == STATE_OPEN or (state == STATE_HALF_OPEN and self._probing):
+            raise CircuitOpenError(max(self.seconds_until_retry, 0.0))
+
+        probe = state == STATE_HALF_OPEN
+        self._probing = probe
+        try:
+            result = await request()
+        except RequestBudgetExhausted:
+            raise
+        except (ApiConnectionError, TimeoutError):
+            self.__record_failure(probe)
+            raise
+        except asyncio.CancelledError:
+            # Abandoned by its timeout, Pod Point did not answer in time
+            call_timeout = CallTimeout.current()
+            if (
+                call_timeout is not None
+                and call_timeout.expired
+                and not call_timeout.waiting
+            ):
+                self.__record_failure(probe)
+            raise
+        except Exception:
+            # Pod Point answered, even if not with what we wanted
+            self.__record_success()
+            raise
+        finally:
+            if probe:
+                self._probing = False
+
+        self.__record_success()
+        return result
+
+    def __record_success(self) -> None:
+        if self._state != STATE_CLOSED:
+            _LOGGER.debug("Circuit breaker closed after %s failures", self.failures)
+        self._state = STATE_CLOSED
+        self.failures = 0
+        self.times_opened = 0
+        self.retry_at = None
+
+    def __record_failure(self, probe: bool) -> None:
+        self.failures += 1
+        if probe or (self._state == STATE_CLOSED and self.failures >= self.threshold):
+            self.__open()
+
+    def __open(self) -> None:
+        self.times_opened += 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.times_opened - 1))
+        # Somewhere between half and all of the delay
+        delay = self._jitter(delay / 2, delay)
+
+        self._state = STATE_OPEN
+        self.retry_at = self._clock() + delay
+        _LOGGER.debug(
+            "=== CIRCUIT BREAKER ===\nOpened: %s times\nFailures: %s\nRetry in: %.1fs",
+            self.times_opened,
+            self.failures,
+            delay,
+        )
+
+
+class CircuitBreakerClient:
+    """Stands in for a `PodPointClient`, each of its `async_` calls is made through
+    the breaker"""
+
+    def __init__(self, client: PodPointClient, breaker: CircuitBreaker) -> None:
+        self.client = client
+        self.breaker = breaker
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.client, name)
+        if not name.startswith("async_") or not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        async def guarded(*args, **kwargs):
+            return await self.breaker.async_call(lambda: attribute(*args, **kwargs))
+
+        return guarded
@@ -0,0 +1,148 @@
+"""Per-pod queue of commands sent to Pod Point"""
+
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List
+
+from homeassistant.core import HomeAssistant
+
+from .call_timeout import CallTimeout
+from .const import API_CALL_TIMEOUT, COMMAND_LATENCY_SAMPLES, DOMAIN
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Kinds of command, a queued command is superseded by a later one of the same kind
+COMMAND_SCHEDULE = "schedule"
+COMMAND_CHARGE_OVERRIDE = "charge_override"  # Charge mode and charge now
+
+
+class _Command:
+    """A command waiting to be sent, along with everyone waiting on its result"""
+
+    def __init__(
+        self, key: Hashable, request: Callable[[], Awaitable[Any]], queued_at: float
+    ) -> None:
+        self.key = key
+        self.request = request
+        self.queued_at = queued_at
+        self.waiters: List[asyncio.Future] = []
+
+
+class CommandQueue:
+    """Sends the commands for each pod one at a time, in the order they were made.
+    Commands for different pods are sent side by side.
+
+    A command still waiting in the queue is replaced by a later command of the same
+    kind, which takes its place at the back of the queue. A command identical to
+    the one being sent joins it rather than being sent again."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        # Commands waiting to be sent for each pod, by kind, oldest first
+        self._queues: Dict[int, Dict[str, _Command]] = {}
+        self._sending: Dict[int, _Command] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+        self.commands_sent = 0
+        self.commands_superseded = 0
+        self.commands_joined = 0
+        self.max_depth = 0
+        # Seconds from a command being made to its response, most recent last
+        self.latencies: Deque[float] = deque(maxlen=COMMAND_LATENCY_SAMPLES)
+
+    def depth(self, unit_id: int = None) -> int:
+        """Commands waiting or being sent, for one pod or all of them"""
+        if unit_id is not None:
+            return len(self._queues.get(unit_id, {})) + (unit_id in self._sending)
+
+        return sum(len(queue) for queue in self._queues.values()) + len(self._sending)
+
+    async def async_send(
+        self,
+        unit_id: int,
+        kind: str,
+        key: Hashable,
+        request: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Queue `request` as the pod's next command of `kind` and wait for its
+        response. `key` identifies the command's arguments, so identical commands
+        can be joined. A superseded command resolves with its replacement's result."""
+        waiter = self.hass.loop.create_future()
+        queue = self._queues.setdefault(unit_id, {})
+        sending = self._sending.get(unit_id)
+
+        if kind not in queue and sending is not None and sending.key == (kind, key):
+            sending.waiters.append(waiter)
+            self.commands_joined += 1
+            return await waiter
+
+        command = _Command((kind, key), request, time.monotonic())
+        superseded = queue.pop(kind, None)
+        if superseded is not None:
+            command.waiters.extend(superseded.waiters)
+            command.queued_at = superseded.queued_at
+            self.commands_superseded += 1
+        command.waiters.append(waiter)
+        queue[kind] = command
+
+        self.max_depth = max(self.max_depth, self.depth(unit_id))
+        if unit_id not in self._workers:
+            # Not started eagerly, the worker must be registered before it can finish
+            self._workers[unit_id] = self.hass.async_create_background_task(
+                self.__async_work(unit_id),
+                name=f"{DOMAIN} commands for {unit_id}",
+                eager_start=False,
+            )
+
+        return await waiter
+
+    async def __async_work(self, unit_id: int) -> None:
+        """Send the pod's commands until its queue is empty"""
+        queue = self._queues[unit_id]
+        try:
+            while len(queue) > 0:
+                kind = next(iter(queue))
+                command = self._sending[unit_id] = queue.pop(kind)
+
+                try:
+                    async with CallTimeout(API_CALL_TIMEOUT):
+                        result = await command.request()
+                except asyncio.CancelledError:
+                    for waiter in command.waiters:
+                        waiter.cancel()
+                    raise
+                except Exception as exception:  # pylint: disable=broad-except
+                    for waiter in command.waiters:
+                        if not waiter.done():
+                            waiter.set_exception(exception)
+                else:
+                    for waiter in command.waiters:
+                        if not waiter.done():
+                            waiter.set_result(result)
+                finally:
+                    del self._sending[unit_id]
+
+                self.commands_sent += 1
+                self.latencies.append(time.monotonic() - command.queued_at)
+                _LOGGER.debug(
+                    "=== COMMAND SENT ===\nPod: %s\nCommand: %s\nWaiters: %s\n\
+Latency: %.3fs\nQueued: %s",
+                    unit_id,
+                    kind,
+                    len(command.waiters),
+                    self.latencies[-1],
+                    len(queue),
+                )
+        finally:
+            del self._workers[unit_id]
+            for command in queue.values():
+                for waiter in command.waiters:
+                    waiter.cancel()
+            queue.clear()
+
+    def async_shutdown(self) -> None:
+        """Stop sending commands, anyone waiting is cancelled"""
+        for worker in self._workers.values():
+            worker.cancel()
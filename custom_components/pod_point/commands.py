@@ -0,0 +1,38 @@
+"""Optimistic changes to a pod, applied once the API has accepted a command"""
+
+from datetime import datetime
+from typing import Callable, Optional
+
+from podpointclient.charge_override import ChargeOverride
+from podpointclient.factories import ScheduleFactory
+from podpointclient.pod import Pod
+import pytz
+
+PodChange = Callable[[Pod], None]
+
+
+def set_schedules(enabled: bool) -> PodChange:
+    """Replace the pod's schedules with those sent by `async_set_schedule`"""
+
+    def apply(pod: Pod) -> None:
+        pod.charge_schedules = ScheduleFactory().build_schedules(enabled=enabled)
+
+    return apply
+
+
+def set_charge_override(override: Optional[ChargeOverride]) -> PodChange:
+    """Set the pod's charge override to the one returned by the API, or clear it"""
+
+    def apply(pod: Pod) -> None:
+        if override is None or isinstance(override, ChargeOverride):
+            pod.charge_override = override
+
+    return apply
+
+
+def set_charge_mode_manual(pod: Pod) -> None:
+    """Give the pod an open ended override, as `async_set_charge_mode_manual` does"""
+    now = datetime.now(pytz.UTC).isoformat()
+    pod.charge_override = ChargeOverride(
+        data={"ppid": pod.ppid, "requested_at": now, "received_at": now}
+    )
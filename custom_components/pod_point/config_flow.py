@@ -13,17 +13,36 @@ from podpointclient.client import PodPointClient
 import voluptuous as vol
 
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_API_CONCURRENCY,
     CONF_CURRENCY,
     CONF_EMAIL,
     CONF_HTTP_DEBUG,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_DATA_AGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
     CONF_PASSWORD,
+    CONF_REFRESH_WINDOW,
     CONF_SCAN_INTERVAL,
+    CONF_STALE_FAILURES,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_API_CONCURRENCY,
     DEFAULT_CURRENCY,
     DEFAULT_HTTP_DEBUG,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REFRESH_WINDOW,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_FAILURES,
     DOMAIN,
     PLATFORMS,
+    TIER_CONNECTIVITY,
+    TIER_SCAN_INTERVALS,
 )
+from .rate_limiter import RateLimitedClient, get_rate_limiter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -122,8 +141,9 @@ class PodPointFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Return true if credentials is valid."""
         try:
             session = async_create_clientsession(self.hass)
-            client = PodPointClient(
-                username=username, password=password, session=session
+            client = RateLimitedClient(
+                PodPointClient(username=username, password=password, session=session),
+                get_rate_limiter(self.hass, username),
             )
             return await client.async_credentials_verified()
         except Exception:  # pylint: disable=broad-except
@@ -155,14 +175,63 @@ class PodPointOptionsFlowHandler(config_entries.OptionsFlow):
             vol.Required(
                 CONF_CURRENCY,
                 default=self.options.get(CONF_CURRENCY, DEFAULT_CURRENCY),
-            ): str
+            ): vol.All(str, vol.Strip, vol.Upper, vol.Match(r"^[A-Z]{3}$")),
+            vol.Required(
+                CONF_IMPORT_STATISTICS,
+                default=self.options.get(
+                    CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+                ),
+            ): bool,
         }
 
         poll_schema = {
             vol.Required(
                 CONF_SCAN_INTERVAL,
                 default=self.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
-            ): int
+            ): int,
+            vol.Required(
+                CONF_API_CONCURRENCY,
+                default=self.options.get(CONF_API_CONCURRENCY, DEFAULT_API_CONCURRENCY),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                CONF_ADAPTIVE_POLLING,
+                default=self.options.get(
+                    CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+                ),
+            ): bool,
+            vol.Required(
+                CONF_MIN_SCAN_INTERVAL,
+                default=self.options.get(
+                    CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                CONF_MAX_SCAN_INTERVAL,
+                default=self.options.get(
+                    CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                CONF_REFRESH_WINDOW,
+                default=self.options.get(CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_STALE_FAILURES,
+                default=self.options.get(CONF_STALE_FAILURES, DEFAULT_STALE_FAILURES),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Required(
+                CONF_MAX_DATA_AGE,
+                default=self.options.get(CONF_MAX_DATA_AGE, DEFAULT_MAX_DATA_AGE),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+
+        # Independent intervals for each tier, scan interval covers connectivity
+        tier_schema = {
+            vol.Required(option, default=self.options.get(option, default)): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            )
+            for tier, (option, default) in TIER_SCAN_INTERVALS.items()
+            if tier != TIER_CONNECTIVITY
         }
 
         platforms_schema = {
@@ -181,7 +250,13 @@ class PodPointOptionsFlowHandler(config_entries.OptionsFlow):
         }
 
         options_schema = vol.Schema(
-            {**currency_schema, **platforms_schema, **debug_schema, **poll_schema}
+            {
+                **currency_schema,
+                **platforms_schema,
+                **debug_schema,
+                **poll_schema,
+                **tier_schema,
+            }
         )
 
         return self.async_show_form(step_id="user", data_schema=options_schema)
@@ -41,10 +41,107 @@ CONF_HTTP_DEBUG = "http_debug"
 DEFAULT_HTTP_DEBUG = False
 CONF_CURRENCY = "currency"
 DEFAULT_CURRENCY = "GBP"
+CONF_API_CONCURRENCY = "api_concurrency"
+DEFAULT_API_CONCURRENCY = 4
+CONF_USER_SCAN_INTERVAL = "user_scan_interval"
+DEFAULT_USER_SCAN_INTERVAL = 3600
+CONF_POD_SCAN_INTERVAL = "pod_scan_interval"
+DEFAULT_POD_SCAN_INTERVAL = 3600
+CONF_CHARGES_SCAN_INTERVAL = "charges_scan_interval"
+DEFAULT_CHARGES_SCAN_INTERVAL = DEFAULT_SCAN_INTERVAL
+CONF_FIRMWARE_SCAN_INTERVAL = "firmware_scan_interval"
+DEFAULT_FIRMWARE_SCAN_INTERVAL = 5 * DEFAULT_SCAN_INTERVAL
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+DEFAULT_ADAPTIVE_POLLING = True
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = 60
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MAX_SCAN_INTERVAL = 1800
+CONF_IMPORT_STATISTICS = "import_statistics"
+DEFAULT_IMPORT_STATISTICS = True
+CONF_REFRESH_WINDOW = "refresh_window"
+DEFAULT_REFRESH_WINDOW = 5
+CONF_STALE_FAILURES = "stale_failures"
+DEFAULT_STALE_FAILURES = 3
+CONF_MAX_DATA_AGE = "max_data_age"
+DEFAULT_MAX_DATA_AGE = 3600
+
+# Refresh tiers, each class of data is refreshed on its own interval
+TIER_USER = "user"
+TIER_PODS = "pods"
+TIER_CONNECTIVITY = "connectivity"
+TIER_CHARGES = "charges"
+TIER_FIRMWARE = "firmware"
+TIERS = [TIER_USER, TIER_PODS, TIER_CONNECTIVITY, TIER_CHARGES, TIER_FIRMWARE]
+POD_TIERS = frozenset([TIER_PODS, TIER_CONNECTIVITY, TIER_CHARGES, TIER_FIRMWARE])
+TIER_SCAN_INTERVALS = {
+    TIER_USER: (CONF_USER_SCAN_INTERVAL, DEFAULT_USER_SCAN_INTERVAL),
+    TIER_PODS: (CONF_POD_SCAN_INTERVAL, DEFAULT_POD_SCAN_INTERVAL),
+    TIER_CONNECTIVITY: (CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+    TIER_CHARGES: (CONF_CHARGES_SCAN_INTERVAL, DEFAULT_CHARGES_SCAN_INTERVAL),
+    TIER_FIRMWARE: (CONF_FIRMWARE_SCAN_INTERVAL, DEFAULT_FIRMWARE_SCAN_INTERVAL),
+}
+# Tiers polled faster while a pod is active, and backed off while everything is idle
+ADAPTIVE_TIERS = frozenset([TIER_CONNECTIVITY, TIER_CHARGES])
 
 # Defaults
 DEFAULT_NAME = DOMAIN
 
+# Charge cache storage
+CHARGE_CACHE_KEY = f"{DOMAIN}.charges"
+CHARGE_CACHE_VERSION = 1
+CHARGE_CACHE_SAVE_DELAY = 30
+
+# Snapshot of the pods and user, so entities can be created before the first refresh
+SNAPSHOT_KEY = f"{DOMAIN}.snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+SNAPSHOT_TIERS = frozenset([TIER_USER, TIER_PODS, TIER_FIRMWARE])
+
+# Dispatcher signals sent with the unit ids of pods that appeared on, or left, the
+# account. Formatted with the config entry id.
+SIGNAL_PODS_ADDED = f"{DOMAIN}_pods_added_{{}}"
+SIGNAL_PODS_REMOVED = f"{DOMAIN}_pods_removed_{{}}"
+# A pod has left the account once this many fetches of the pods in a row have not
+# returned it, until then its entities are unavailable
+POD_RETIRE_AFTER = 3
+
+# Long-term statistics import
+STATISTICS_IMPORT_BATCH_SIZE = 500
+
+# After a command, the affected pod is refreshed until it reports in, falling back
+# to a full refresh after the given number of attempts
+COMMAND_CONFIRM_ATTEMPTS = 6
+# Number of recent command latencies kept for diagnostics
+COMMAND_LATENCY_SAMPLES = 50
+
+# Requests to Pod Point for an account are limited to a steady rate with bursts,
+# and to a budget per hour. Each pod on the account adds to them, so that every pod
+# can be polled within the sweep (seconds), a refresh of every tier (connectivity
+# and firmware for each pod) fits in a burst, and pods can be polled at the minimum
+# scan interval for the hour. Once less than the low fraction of the budget
+# remains, polling is stretched by up to the max stretch.
+RATE_LIMIT_PER_SECOND = 1.0
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_BURST_PER_POD = 2
+RATE_LIMIT_HOURLY_BUDGET = 1000
+RATE_LIMIT_SWEEP = 20
+RATE_LIMIT_HOURLY_BUDGET_PER_POD = 60 * 60 // DEFAULT_MIN_SCAN_INTERVAL
+RATE_LIMIT_LOW_BUDGET = 0.25
+RATE_LIMIT_MAX_STRETCH = 8
+
+# Calls to Pod Point stop once this many in a row fail to connect, for a delay
+# (seconds) that doubles each time up to the max, before a single probe is made
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_BASE_DELAY = 30
+CIRCUIT_BREAKER_MAX_DELAY = 1800
+
+# Seconds before an API call is abandoned, each page of charges is one call.
+# Connectivity and firmware stop at the refresh deadline, keeping what they have,
+# as does fetching every charge, which carries on from there the next refresh.
+API_CALL_TIMEOUT = 30
+REFRESH_DEADLINE = 60
+
 # State attributes
 ATTR_ID = "pod_id"
 ATTR_PSL = "psl"
@@ -104,6 +201,10 @@ ATTR_STATE_RANKING = [
     ATTR_STATE_OUT_OF_SERVICE,
     ATTR_STATE_SUSPENDED_EVSE,
 ]
+# States in which a pod is expected to change soon, polling speeds up while in them
+ATTR_STATES_ACTIVE = frozenset(
+    [ATTR_STATE_CHARGING, ATTR_STATE_PENDING, ATTR_STATE_CONNECTED_WAITING]
+)
 ATTR_CONNECTION_STATE_ONLINE = "ONLINE"
 
 ATTR_CONFIG_ENTRY_ID = "config_entry_id"
@@ -2,172 +2,900 @@
 Data coordinator for pod point client
 """
 
+import asyncio
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Set, Tuple
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_point_in_utc_time,
+)
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 from podpointclient.charge import Charge
 from podpointclient.client import PodPointClient
+from podpointclient.connectivity_status import ConnectivityStatus
 from podpointclient.errors import ApiConnectionError, AuthError, SessionError
 from podpointclient.pod import Firmware, Pod
 from podpointclient.user import User
 import pytz
 
-from .const import DOMAIN, LIMITED_POD_INCLUDES
+from .call_timeout import CallTimeout
+from .charge_cache import ChargeCache, ChargesPull
+from .charge_store import ChargeStore, PodCharges
+from .circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+)
+from .command_queue import CommandQueue
+from .const import (
+    ADAPTIVE_TIERS,
+    API_CALL_TIMEOUT,
+    ATTR_STATES_ACTIVE,
+    COMMAND_CONFIRM_ATTEMPTS,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_API_CONCURRENCY,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_DATA_AGE,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_REFRESH_WINDOW,
+    DEFAULT_STALE_FAILURES,
+    DOMAIN,
+    LIMITED_POD_INCLUDES,
+    POD_RETIRE_AFTER,
+    REFRESH_DEADLINE,
+    SIGNAL_PODS_ADDED,
+    SIGNAL_PODS_REMOVED,
+    SNAPSHOT_TIERS,
+    TIER_CHARGES,
+    TIER_CONNECTIVITY,
+    TIER_FIRMWARE,
+    TIER_PODS,
+    TIER_SCAN_INTERVALS,
+    TIER_USER,
+    TIERS,
+)
+from .rate_limiter import RateLimiter, RequestBudgetExhausted
+from .snapshot import CoordinatorSnapshot
+from .state import next_charging_transition
+from .view_model import PodViewModel, build_pod_view_model
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
+class ApiCallTimeout(ApiConnectionError):
+    """An API call was abandoned, having taken too long"""
+
+    def __init__(self, seconds: float):
+        super().__init__(f"Timed out after {seconds:.0f}s")
+
+
 class PodPointDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
-    _firmware_refresh_interval = 5  # How many refreshes between a firmware update call
+    # Seconds of leeway when deciding if a tier is due, the refresh timer is not exact
+    _tier_due_tolerance = 1.0
+    # Cap on how many times an idle interval is doubled
+    _max_backoff_exponent = 16
 
     def __init__(
-        self, hass: HomeAssistant, client: PodPointClient, scan_interval: timedelta
+        self,
+        hass: HomeAssistant,
+        client: PodPointClient,
+        scan_interval: timedelta,
+        api_concurrency: int = DEFAULT_API_CONCURRENCY,
+        tier_intervals: Dict[str, timedelta] = None,
+        adaptive_polling: bool = DEFAULT_ADAPTIVE_POLLING,
+        min_scan_interval: timedelta = timedelta(seconds=DEFAULT_MIN_SCAN_INTERVAL),
+        max_scan_interval: timedelta = timedelta(seconds=DEFAULT_MAX_SCAN_INTERVAL),
+        refresh_window: timedelta = timedelta(seconds=DEFAULT_REFRESH_WINDOW),
+        stale_failures: int = DEFAULT_STALE_FAILURES,
+        max_data_age: timedelta = timedelta(seconds=DEFAULT_MAX_DATA_AGE),
+        rate_limiter: RateLimiter = None,
+        circuit_breaker: CircuitBreaker = None,
+        entry_id: str = None,
     ) -> None:
         """Initialize."""
         self.api: PodPointClient = client
+        self.entry_id = entry_id
+        # Shared with every other caller for the account, when calls are limited
+        self.rate_limiter = rate_limiter
+        # Stops calls while Pod Point cannot be reached, and how many times it had
+        # opened when last reported
+        self.circuit_breaker = circuit_breaker
+        self._breaker_opened = 0
+        self.api_concurrency = max(1, api_concurrency)  # Max per-pod calls in flight
         self.platforms = []
-        self.pods: List[Pod] = []
-        self.home_charges: List[Charge] = []
+        # The config entry options the coordinator was last set up with
+        self.entry_options: Dict[str, Any] = {}
+        # Pods by unit id, updated in place by each refresh so entities can look
+        # their pod up directly. What the entities display for each pod, by unit id.
+        self.pod_registry: Dict[int, Pod] = {}
+        self.view_models: Dict[int, PodViewModel] = {}
+        # Pods Pod Point stopped returning, by unit id, with how many fetches of the
+        # pods in a row have missed them. They stay in the registry until retired.
+        self.missing_pods: Dict[int, int] = {}
+        # Pods whose view model changed in the last refresh, entities of other pods
+        # skip writing their state. Counts of the state writes made and skipped.
+        self.changed_unit_ids: Set[int] = set()
+        self.state_writes = 0
+        self.suppressed_state_writes = 0
+        # Pods are re-resolved when charging next becomes allowed or blocked
+        self.next_charging_transition: datetime = None
+        self._unsub_charging_transition: Callable[[], None] = None
+        # Commands are sent one at a time for each pod
+        self.command_queue = CommandQueue(hass)
+        # Commands awaiting confirmation from their pod, by unit id, with the time
+        # they were sent and the refreshes left before falling back to a full one
+        self._unconfirmed: Dict[int, Tuple[datetime, int]] = {}
+        # Pod refreshes requested within the window are combined into one refresh
+        # of the pods that were touched. Counts of requests, refreshes made and
+        # requests that were folded into a refresh already pending.
+        self.refresh_window = refresh_window
+        self._pending_refresh_unit_ids: Set[int] = set()
+        self._unsub_pod_refresh: Callable[[], None] = None
+        self._pod_refresh_tasks: Set[asyncio.Task] = set()
+        self.pod_refresh_requests = 0
+        self.pod_refreshes = 0
+        self.coalesced_pod_refreshes = 0
+        self.home_charges: ChargeStore = ChargeStore()
         self.charges_perpage_all = (
             50  # When we are fetching all charges (new pod, or first launch)
         )
         self.charges_perpage_update = (
             3  # Fetching an update, unlikely to change from poll to poll by more than 1
         )
-        self.pod_dict = None
+        # Charges are persisted between restarts when we have a config entry to key
+        # them by, along with the unit ids of the pods they were fetched for
+        self.charge_cache: ChargeCache = (
+            ChargeCache(hass, entry_id) if entry_id is not None else None
+        )
+        self.cached_unit_ids: Set[int] = set()
+        # Fetching every charge can take many pages, those fetched are kept (and
+        # cached) should it be cut short so the next refresh carries on from them
+        self.charges_pull: ChargesPull = None
+        # The pods and user are persisted too, so entities can be created from them
+        # at startup and reconciled by a refresh in the background
+        self.snapshot: CoordinatorSnapshot = (
+            CoordinatorSnapshot(hass, entry_id) if entry_id is not None else None
+        )
+        self.restored_snapshot = False
         self.online = None
-        self.firmware_refresh = 1  # Initial refresh will be a firmware refresh too, ensuring we pull firmware for all pods at startup
+        # While refreshes fail the last good data is still shown, until this many
+        # fail in a row or it is older than the max age. When that data was fetched
+        # and how many refreshes have failed since.
+        self.stale_failures = max(1, stale_failures)
+        self.max_data_age = max_data_age
+        self.last_success_at: datetime = None
+        self.consecutive_failures = 0
         self.user: User = None
+        # Seconds taken by each stage of the last refresh, and the slowest chain
+        self.stage_timings: Dict[str, float] = {}
+        self.critical_path: str = None
+        # Loop time the current refresh's non-critical stages must finish by, and
+        # the tiers each pod kept from before as they missed it, by unit id
+        self.refresh_deadline: float = None
+        self.stale_fields: Dict[int, Set[str]] = {}
         self.last_message_at = datetime(1970, 1, 1, 0, 0, 0, 0, pytz.UTC)
 
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=scan_interval)
+        # Each class of data (tier) is refreshed on its own interval. The scan interval
+        # drives the connectivity tier, the most frequently changing data.
+        self.tier_intervals: Dict[str, timedelta] = {
+            tier: timedelta(seconds=default)
+            for tier, (_, default) in TIER_SCAN_INTERVALS.items()
+        }
+        self.tier_intervals[TIER_CONNECTIVITY] = scan_interval
+        if tier_intervals is not None:
+            self.tier_intervals.update(tier_intervals)
+
+        # When each tier was last refreshed (monotonic), and which tiers the last
+        # refresh updated. Tiers that have never been refreshed are always due.
+        self.tier_refreshed_at: Dict[str, float] = {}
+        self.refreshed_tiers: Set[str] = set()
+
+        # Tiers read by the running entities and other consumers, counted by
+        # consumer. Tiers nothing reads are not fetched, until something registers
+        # every tier is. Charges skipped meanwhile are all fetched again once read.
+        self._tier_demand: Dict[str, int] = {}
+        self._charges_outdated = False
+
+        # Adaptive polling shortens the adaptive tiers to the minimum interval while
+        # any pod is active, and doubles them (up to the maximum) for every
+        # consecutive refresh where all pods are idle.
+        self.adaptive_polling = adaptive_polling
+        self.min_scan_interval = min_scan_interval
+        self.max_scan_interval = max(min_scan_interval, max_scan_interval)
+        self.pods_active = False
+        self.idle_polls = 0
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=min(self.tier_intervals.values()),
+        )
+
+    @property
+    def pods(self) -> List[Pod]:
+        """The pods, in the order Pod Point first returned them"""
+        return list(self.pod_registry.values())
+
+    @pods.setter
+    def pods(self, pods: List[Pod]) -> None:
+        self.__update_pod_registry(pods, retire_after=1)
+
+    def __update_pod_registry(
+        self,
+        pods: List[Pod],
+        fetched: bool = True,
+        retire_after: int = POD_RETIRE_AFTER,
+    ) -> Tuple[Set[int], Set[int]]:
+        """Update the registry in place. When the pods were `fetched`, those not
+        returned are missing, and dropped once missed `retire_after` times in a row.
+        Returns the unit ids of the pods added and removed."""
+        unit_ids = set(pod.unit_id for pod in pods)
+        added = unit_ids - set(self.pod_registry.keys())
+        for pod in pods:
+            self.pod_registry[pod.unit_id] = pod
+            self.missing_pods.pop(pod.unit_id, None)
+
+        removed: Set[int] = set()
+        if fetched:
+            for unit_id in set(self.pod_registry.keys()) - unit_ids:
+                self.missing_pods[unit_id] = self.missing_pods.get(unit_id, 0) + 1
+                if self.missing_pods[unit_id] >= retire_after:
+                    removed.add(unit_id)
+
+        for unit_id in removed:
+            del self.pod_registry[unit_id]
+            del self.missing_pods[unit_id]
+            self._unconfirmed.pop(unit_id, None)
+
+        return added, removed
+
+    def __announce_pods(self, added: Set[int], removed: Set[int]) -> None:
+        """Let the platforms add entities for new pods, and the entities of pods
+        that have gone retire themselves. Entities for the pods of the first
+        refresh are created from the registry as the platforms are set up."""
+        if self.entry_id is None or self.data is None:
+            return
+
+        if len(added) > 0 or len(removed) > 0 or len(self.missing_pods) > 0:
+            _LOGGER.debug(
+                "=== POD CHANGES ===\nAdded: %s\nMissing: %s\nRemoved: %s",
+                sorted(added),
+                self.missing_pods,
+                sorted(removed),
+            )
+        if len(removed) > 0:
+            async_dispatcher_send(
+                self.hass, SIGNAL_PODS_REMOVED.format(self.entry_id), removed
+            )
+        if len(added) > 0:
+            async_dispatcher_send(
+                self.hass, SIGNAL_PODS_ADDED.format(self.entry_id), added
+            )
+
+    @property
+    def demanded_tiers(self) -> Set[str]:
+        """Tiers something reads, pods are always fetched as everything hangs off
+        them"""
+        if len(self._tier_demand) == 0:
+            return set(TIERS)
+
+        return {TIER_PODS} | set(self._tier_demand.keys())
+
+    @callback
+    def async_add_tier_demand(self, tiers: Iterable[str]) -> Callable[[], None]:
+        """Register the tiers a consumer reads, returns a callback that removes
+        them again"""
+        tiers = frozenset(tiers)
+        for tier in tiers:
+            self._tier_demand[tier] = self._tier_demand.get(tier, 0) + 1
+
+        @callback
+        def remove_demand() -> None:
+            for tier in tiers:
+                self._tier_demand[tier] -= 1
+                if self._tier_demand[tier] <= 0:
+                    del self._tier_demand[tier]
+
+        return remove_demand
+
+    def tiers_refreshed(self, tiers: Set[str]) -> bool:
+        """Did the last refresh update any of the given tiers?"""
+        return not self.refreshed_tiers.isdisjoint(tiers)
+
+    @property
+    def data_available(self) -> bool:
+        """Is there data fit to show? Failed refreshes leave the last good data in
+        place until too many fail in a row, or it gets too old"""
+        if self.online is True:
+            return True
+
+        if self.last_success_at is None:
+            return False
+
+        return (
+            self.consecutive_failures < self.stale_failures
+            and dt_util.utcnow() - self.last_success_at < self.max_data_age
+        )
+
+    @property
+    def data_age(self) -> int:
+        """Seconds since the data shown was fetched, None unless refreshes are
+        failing or it was restored from the snapshot"""
+        if self.online is True or self.last_success_at is None:
+            return None
+
+        return int((dt_util.utcnow() - self.last_success_at).total_seconds())
+
+    def apply_options(
+        self,
+        scan_interval: timedelta,
+        tier_intervals: Dict[str, timedelta] = None,
+        api_concurrency: int = DEFAULT_API_CONCURRENCY,
+        adaptive_polling: bool = DEFAULT_ADAPTIVE_POLLING,
+        min_scan_interval: timedelta = timedelta(seconds=DEFAULT_MIN_SCAN_INTERVAL),
+        max_scan_interval: timedelta = timedelta(seconds=DEFAULT_MAX_SCAN_INTERVAL),
+        refresh_window: timedelta = timedelta(seconds=DEFAULT_REFRESH_WINDOW),
+        stale_failures: int = DEFAULT_STALE_FAILURES,
+        max_data_age: timedelta = timedelta(seconds=DEFAULT_MAX_DATA_AGE),
+    ) -> None:
+        """Change the options of the running coordinator. Nothing is fetched, the
+        next refresh is rescheduled to suit the new intervals."""
+        self.api_concurrency = max(1, api_concurrency)
+        self.tier_intervals[TIER_CONNECTIVITY] = scan_interval
+        if tier_intervals is not None:
+            self.tier_intervals.update(tier_intervals)
+        self.adaptive_polling = adaptive_polling
+        self.min_scan_interval = min_scan_interval
+        self.max_scan_interval = max(min_scan_interval, max_scan_interval)
+        self.refresh_window = refresh_window
+        self.stale_failures = max(1, stale_failures)
+        self.max_data_age = max_data_age
+
+        _LOGGER.debug(
+            "=== OPTIONS APPLIED ===\nTier intervals: %s",
+            {tier: self.tier_interval(tier) for tier in TIERS},
+        )
+
+        self.__schedule_next_tier()
+        if self._listeners:
+            self._schedule_refresh()
+
+    @callback
+    def async_rewrite_states(self) -> None:
+        """Have every entity write its state again, for when something they display
+        changed outside of the pod data (such as the currency)"""
+        self.update_view_models()
+        self.changed_unit_ids = set(self.pod_registry.keys())
+        self.refreshed_tiers = set(TIERS)
+        self.async_update_listeners()
+
+    def tier_interval(self, tier: str) -> timedelta:
+        """The interval a tier is currently refreshed on, after adaptive polling and
+        stretching to make the request budget last"""
+        interval = self.tier_intervals[tier]
+
+        if self.adaptive_polling and tier in ADAPTIVE_TIERS:
+            if self.pods_active:
+                interval = min(interval, self.min_scan_interval)
+            else:
+                # The first idle refresh keeps the configured interval, then back off
+                exponent = min(max(self.idle_polls - 1, 0), self._max_backoff_exponent)
+                backoff = interval * (2**exponent)
+                interval = max(
+                    self.min_scan_interval,
+                    min(backoff, max(interval, self.max_scan_interval)),
+                )
+
+        # Make the request budget last when it runs low
+        if self.rate_limiter is not None:
+            interval *= self.rate_limiter.budget_stretch
+
+        return interval
+
+    def update_view_models(self, now: datetime = None) -> None:
+        """Resolve what the entities display for each pod at `now`. Done once per
+        refresh, rather than by each of the entities of a pod"""
+        now = now or dt_util.now()
+        data_age = self.data_age
+        previous_view_models = self.view_models
+
+        self.view_models = {
+            unit_id: build_pod_view_model(
+                pod,
+                self.last_message_at,
+                now,
+                stale_fields=self.stale_fields.get(unit_id, ()),
+                data_age=data_age,
+            )
+            for unit_id, pod in self.pod_registry.items()
+        }
+        self.changed_unit_ids = set(
+            unit_id
+            for unit_id, view_model in self.view_models.items()
+            if previous_view_models.get(unit_id, None) != view_model
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel the schedule transition timer, queued commands and pod refreshes
+        along with the refresh timer"""
+        await super().async_shutdown()
+        self.__cancel_charging_transition()
+        self.command_queue.async_shutdown()
+        if self._unsub_pod_refresh is not None:
+            self._unsub_pod_refresh()
+            self._unsub_pod_refresh = None
+        for task in self._pod_refresh_tasks:
+            task.cancel()
+        self._pending_refresh_unit_ids = set()
+        self._unconfirmed = {}
+
+    async def async_flush_caches(self) -> None:
+        """Write the charge cache and snapshot saves still waiting on their delay"""
+        if self.charge_cache is not None:
+            await self.charge_cache.async_flush()
+        if self.snapshot is not None:
+            await self.snapshot.async_flush()
+
+    @callback
+    def async_command_sent(self, pod: Pod, apply: Callable[[Pod], None] = None) -> None:
+        """A command has been sent to a pod. Show its expected effect, applied to the
+        pod by `apply`, straight away and confirm it by refreshing only that pod"""
+        sent_at = datetime.now(pytz.UTC)
+        self.last_message_at = sent_at
+        self.idle_polls = 0
+
+        if apply is not None:
+            apply(pod)
+        self.__async_update_pod_listeners({TIER_PODS, TIER_CONNECTIVITY})
+
+        # A later command for the same pod restarts its confirmation
+        self._unconfirmed[pod.unit_id] = (sent_at, COMMAND_CONFIRM_ATTEMPTS)
+        self.async_request_pod_refresh(pod.unit_id)
+
+    @callback
+    def async_request_pod_refresh(self, *unit_ids: int) -> None:
+        """Request the connectivity status and charge override of the given pods.
+        Requests made within the refresh window share a single refresh"""
+        self.pod_refresh_requests += 1
+        self._pending_refresh_unit_ids.update(unit_ids)
+
+        if self._unsub_pod_refresh is not None:
+            self.coalesced_pod_refreshes += 1
+            return
+
+        self._unsub_pod_refresh = async_call_later(
+            self.hass, self.refresh_window, self.__handle_pod_refresh
+        )
+
+    @callback
+    def __handle_pod_refresh(self, _now: datetime) -> None:
+        self._unsub_pod_refresh = None
+        unit_ids = self._pending_refresh_unit_ids
+        self._pending_refresh_unit_ids = set()
+
+        task = self.hass.async_create_background_task(
+            self.__async_refresh_pods(unit_ids), name=f"{DOMAIN} pod refresh"
+        )
+        self._pod_refresh_tasks.add(task)
+        task.add_done_callback(self._pod_refresh_tasks.discard)
+
+    async def __async_refresh_pods(self, unit_ids: Set[int]) -> None:
+        """Refresh the connectivity status and charge override of only the given
+        pods, then check whether they have confirmed the commands sent to them"""
+        pods = [
+            self.pod_registry[unit_id]
+            for unit_id in unit_ids
+            if unit_id in self.pod_registry
+        ]
+        if len(pods) == 0:
+            return
 
-    async def _async_update_data(self):
-        """Update data via library."""
         try:
-            _LOGGER.debug("Updating pods and charges")
-            new_pods: List[Pod] = []
-            self.pod_dict: Dict[int, Pod] = None
+            connectivity_statuses, charge_overrides = await asyncio.gather(
+                self.__async_gather_for_pods(
+                    pods, self.api.async_get_connectivity_status, "connectivity status"
+                ),
+                self.__async_gather_for_pods(
+                    pods, self.api.async_get_charge_override, "charge override"
+                ),
+            )
+        except (AuthError, SessionError) as exception:
+            # Leave it to the full refresh to start re-authentication
+            _LOGGER.debug("Unable to refresh pods %s: %s", unit_ids, exception)
+            await self.async_request_refresh()
+            return
 
-            self.user = await self.api.async_get_user()
+        self.pod_refreshes += 1
+        for pod in pods:
+            connectivity_status = connectivity_statuses.get(pod.unit_id)
+            if connectivity_status is not None and not isinstance(
+                connectivity_status, Exception
+            ):
+                self.__apply_connectivity_status(pod, connectivity_status)
+                self.stale_fields.get(pod.unit_id, set()).discard(TIER_CONNECTIVITY)
+
+            charge_override = charge_overrides.get(pod.unit_id)
+            if not isinstance(charge_override, Exception):
+                pod.charge_override = charge_override
+
+        _LOGGER.debug(
+            "=== POD REFRESH ===\nPods: %s\nRequests: %s\nRefreshes: %s\nCoalesced: %s",
+            sorted(unit_ids),
+            self.pod_refresh_requests,
+            self.pod_refreshes,
+            self.coalesced_pod_refreshes,
+        )
 
-            new_pods = await self.__async_update_pods()
+        self.__async_update_pod_listeners({TIER_CONNECTIVITY})
 
+        if self.__confirm_commands(pods):
+            await self.async_request_tier_refresh(TIER_PODS, TIER_CONNECTIVITY)
+
+    def __confirm_commands(self, pods: List[Pod]) -> bool:
+        """Forget the commands that the pods have reported in since, and request
+        another refresh for those still waiting. Returns True when a pod has run out
+        of refreshes and a full refresh is needed."""
+        retry: List[int] = []
+        unconfirmed = False
+
+        for pod in pods:
+            if pod.unit_id not in self._unconfirmed:
+                continue
+
+            sent_at, attempts = self._unconfirmed.pop(pod.unit_id)
+            confirmed = (
+                pod.last_message_at is not None and pod.last_message_at >= sent_at
+            )
             _LOGGER.debug(
-                "=== POD UPDATE ===\nFound Pods: %s\nPrevious Pods: %s",
-                len(new_pods),
-                len(self.pods),
+                "=== COMMAND CONFIRMATION ===\nPod: %s\nAttempts left: %s\nConfirmed: %s",
+                pod.ppid,
+                attempts - 1,
+                confirmed,
             )
 
-            # Group Pods by ID so that we can organise our charges into the pods
-            # they were performed on
-            new_pods_by_id = self.__group_pods_by_unit_id(pods=new_pods)
+            if confirmed:
+                continue
+            if attempts > 1:
+                self._unconfirmed[pod.unit_id] = (sent_at, attempts - 1)
+                retry.append(pod.unit_id)
+            else:
+                unconfirmed = True
+
+        if len(retry) > 0:
+            self.async_request_pod_refresh(*retry)
+
+        return unconfirmed
+
+    def __async_update_pod_listeners(self, tiers: Set[str]) -> None:
+        """Let entities know pod data changed outside of a refresh"""
+        self.update_view_models()
+        self.refreshed_tiers = tiers
+        self.async_update_listeners()
+
+    def __schedule_charging_transition(self) -> None:
+        """Re-resolve the pods when a charge schedule next starts or ends, rather
+        than waiting for the next refresh to notice"""
+        self.__cancel_charging_transition()
+
+        now = dt_util.now()
+        transitions = [
+            transition
+            for transition in (next_charging_transition(pod, now) for pod in self.pods)
+            if transition is not None
+        ]
+        if len(transitions) == 0:
+            return
+
+        self.next_charging_transition = min(transitions)
+        self._unsub_charging_transition = async_track_point_in_utc_time(
+            self.hass, self.__handle_charging_transition, self.next_charging_transition
+        )
 
-            (new_pods, new_pods_by_id) = await self.__async_group_pods(
-                new_pods, new_pods_by_id
-            )
+    def __cancel_charging_transition(self) -> None:
+        self.next_charging_transition = None
+        if self._unsub_charging_transition is not None:
+            self._unsub_charging_transition()
+            self._unsub_charging_transition = None
+
+    @callback
+    def __handle_charging_transition(self, now: datetime) -> None:
+        self._unsub_charging_transition = None
+
+        # The timer can fire a moment early, resolve as of the transition itself
+        now = max(dt_util.as_local(now), self.next_charging_transition)
+        self.update_view_models(now)
+        _LOGGER.debug(
+            "=== SCHEDULE TRANSITION ===\nAt: %s\nChanged pods: %s",
+            now,
+            sorted(self.changed_unit_ids),
+        )
+
+        # Schedules are part of the pod data, entities of the changed pods update
+        self.refreshed_tiers = {TIER_PODS}
+        self.__schedule_charging_transition()
+        self.async_update_listeners()
+
+    def record_state_write(self, written: bool) -> None:
+        """Count an entity update that wrote its state, or was skipped"""
+        if written:
+            self.state_writes += 1
+        else:
+            self.suppressed_state_writes += 1
+
+    def async_mark_tiers_due(self, *tiers: str) -> None:
+        """Ensure the given tiers are refreshed by the next refresh"""
+        for tier in tiers:
+            self.tier_refreshed_at.pop(tier, None)
+
+    async def async_request_tier_refresh(self, *tiers: str) -> None:
+        """Request a refresh that will include the given tiers"""
+        self.async_mark_tiers_due(*tiers)
+
+        # Something is expected to change, stop backing off
+        if not ADAPTIVE_TIERS.isdisjoint(tiers):
+            self.idle_polls = 0
+
+        await self.async_request_refresh()
+
+    async def _async_setup(self) -> None:
+        """Load cached charges, so the first refresh only needs the latest ones"""
+        if self.charge_cache is None:
+            return
+
+        (
+            self.cached_unit_ids,
+            charges,
+            self.charges_pull,
+        ) = await self.charge_cache.async_load()
+        self.home_charges = ChargeStore(charges)
+        _LOGGER.debug(
+            "=== CHARGE CACHE ===\nLoaded Charges: %s\nFor Pods: %s\nPull: %s",
+            len(self.home_charges),
+            self.cached_unit_ids,
+            self.charges_pull.next_page if self.charges_pull is not None else None,
+        )
+
+    async def async_restore_snapshot(self) -> bool:
+        """Show the pods and user from the snapshot until the first refresh, along
+        with the cached charges. False when there is nothing to restore."""
+        if self.snapshot is None:
+            return False
+
+        fetched_at, pods, user = await self.snapshot.async_load()
+        if len(pods) == 0 or user is None:
+            return False
 
-            new_pods_by_id = self.__group_pods_by_unit_id(pods=new_pods)
+        await self._async_setup()
+        for pod in pods:
+            self.__apply_charge_totals(pod)
+
+        self.pods = pods
+        self.user = user
+        self.last_success_at = fetched_at
+        self.restored_snapshot = True
+        self.update_view_models()
+        self.data = self.pods
+
+        _LOGGER.debug(
+            "=== SNAPSHOT ===\nRestored Pods: %s\nFetched At: %s",
+            len(self.pods),
+            fetched_at,
+        )
+        return True
 
-            # Fetch firmware data for pods, if it is needed
-            self.firmware_refresh -= 1
-            if self.firmware_refresh <= 0:
-                new_pods_by_id = await self.__async_refresh_firmware(
-                    new_pods, new_pods_by_id
+    async def _async_update_data(self):
+        """Update data via library."""
+        try:
+            _LOGGER.debug("Updating pods and charges")
+            self.stage_timings = {}
+            self.stale_fields = {}
+            refresh_started = time.monotonic()
+            self.refresh_deadline = self.hass.loop.time() + REFRESH_DEADLINE
+
+            # With the request budget used up, wait for it rather than failing
+            if self.__budget_exhausted() and self.data is not None:
+                return self.__defer_refresh()
+
+            due_tiers = self.__due_tiers(now=refresh_started)
+            refreshed_tiers: Set[str] = set()
+            _LOGGER.debug("Refreshing tiers: %s", sorted(due_tiers))
+
+            # Without any pods or cached charges we know that every charge is needed.
+            # Otherwise we start with the incremental fetch and fall back to a full
+            # fetch should the pods returned by Pod Point differ from the ones we have.
+            # Pods restored from the snapshot have not been fetched yet. A fetch of
+            # every charge cut short before carries on.
+            booting = len(self.pod_registry) == 0 or self.restored_snapshot
+            fetch_all_charges = (
+                booting and len(self.home_charges) == 0
+            ) or self.charges_pull is not None
+            booting_from_cache = booting and not fetch_all_charges
+
+            # Charges are only fetched while something reads them, catching up on
+            # all of them when that starts again
+            charges_demanded = TIER_CHARGES in self.demanded_tiers
+            if not charges_demanded:
+                self._charges_outdated = True
+            elif TIER_CHARGES in due_tiers and self._charges_outdated:
+                fetch_all_charges = True
+            fetch_all_charges = fetch_all_charges and charges_demanded
+
+            # A half open breaker lets a single call through, so the user is fetched
+            # on its own as the probe before anything else is started
+            user_due_tiers = due_tiers
+            if (
+                self.circuit_breaker is not None
+                and self.circuit_breaker.state == STATE_HALF_OPEN
+            ):
+                due_tiers.add(TIER_USER)
+                user_due_tiers = due_tiers - {TIER_USER}
+                self.user = await self.__async_timed_stage(
+                    "user", self.__async_call_api(self.api.async_get_user)
                 )
 
-            # Fetch connection status data for pods
-            new_pods_by_id = await self.__async_update_pod_connection_status(
-                new_pods_by_id
+            # User, pods and charges do not depend on each other so are started
+            # together. Connectivity and firmware start as soon as the pods arrive.
+            self.user, (new_pods_by_id, pods_fetched), charges_result = (
+                await self.__async_gather_stages(
+                    self.__async_update_user_stage(user_due_tiers),
+                    self.__async_update_pods_stages(due_tiers, refreshed_tiers),
+                    self.__async_timed_stage(
+                        "charges",
+                        self.__async_fetch_charges_stage(fetch_all_charges, due_tiers),
+                    ),
+                )
             )
+            new_pods: List[Pod] = list(new_pods_by_id.values())
+            new_charges, charges_exception = charges_result
 
             # Determine if we should fetch for all charges, or just the most recent for a user.
-            should_fetch_all_charges = self.__should_fetch_all_charges(
-                new_pods=new_pods
+            should_fetch_all_charges = (
+                self.__should_fetch_all_charges(new_pods=new_pods) and charges_demanded
             )
 
-            # Fetch a list of new charges
-            new_charges: List[Charge] = await self.__fetch_home_charges(
-                all_charges=should_fetch_all_charges
-            )
+            # Cached charges may no longer line up with Pod Point, if we cannot catch
+            # up with them on boot start again from scratch
+            if booting_from_cache and charges_exception is not None:
+                _LOGGER.debug(
+                    "Unable to update cached charges, fetching all: %s",
+                    charges_exception,
+                )
+                should_fetch_all_charges = True
+
+            if should_fetch_all_charges and not fetch_all_charges:
+                new_charges = await self.__async_timed_stage(
+                    "charges_all", self.__fetch_home_charges(all_charges=True)
+                )
+                refreshed_tiers.add(TIER_CHARGES)
+            elif charges_exception is not None:
+                raise charges_exception
+            elif TIER_CHARGES in due_tiers or fetch_all_charges:
+                refreshed_tiers.add(TIER_CHARGES)
+
+            # Until every charge is fetched the charges we had are kept
+            if self.charges_pull is not None:
+                refreshed_tiers.discard(TIER_CHARGES)
+                for unit_id in new_pods_by_id:
+                    self.stale_fields.setdefault(unit_id, set()).add(TIER_CHARGES)
+
+            if TIER_CHARGES in refreshed_tiers:
+                self._charges_outdated = False
+
+            if TIER_USER in due_tiers:
+                refreshed_tiers.add(TIER_USER)
 
-            # We will filter out any of the new charges from the existing list. This will
-            # ensure any overlap is not duplicated.
-            new_charge_ids: Set(int) = set([charge.id for charge in new_charges])
-            combined_home_charges: List[Charge] = new_charges + [
-                charge
-                for charge in self.home_charges
-                if charge.id not in new_charge_ids
-            ]
+            self.__log_stage_timings(time.monotonic() - refresh_started)
+
+            # Merge the new charges into the store, charges we already hold are
+            # replaced so that any overlap is not duplicated.
+            previous_charge_count = len(self.home_charges)
+            self.home_charges.upsert_many(new_charges)
 
             _LOGGER.debug(
                 "=== CHARGE UPDATE ===\nShould get all charges: %s\nPrevious Charges: %s\n\
 Updated Charges: %s\nCombined Charges: %s",
                 should_fetch_all_charges,
-                len(self.home_charges),
+                previous_charge_count,
                 len(new_charges),
-                len(combined_home_charges),
+                len(self.home_charges),
             )
 
-            # Store charges for next refresh
-            self.home_charges = combined_home_charges
-
-            # Create a dictionary so that we can track the last charge for each
-            # pod, used o calculate the cost of the last charge
-            last_completed_charges_dict: Dict[str, Charge] = {}
-            for key in new_pods_by_id:
-                last_completed_charges_dict[key] = None
-
-            for charge in combined_home_charges:
-                unit_id = charge.pod.id
-                pod: Pod = new_pods_by_id.get(unit_id, None)
-
-                if pod is None:
-                    continue
-
-                pod.charges.append(charge)
-                pod.total_kwh = pod.total_kwh + charge.kwh_used
-                pod.total_charge_seconds = pod.total_charge_seconds + charge.duration
-
-                charge_cost = charge.energy_cost or 0
-                pod.total_cost = pod.total_cost + charge_cost
-
-                # If this charge has an end (is not currently active)
-                if charge.ends_at is not None:
-                    # If either there is no 'last charge' for this pod, or this charge
-                    # is more recent than the last one we found, set the last charge
-                    # cost and update our dictionary
-                    if last_completed_charges_dict.get(pod.unit_id, None) is None or (
-                        charge.ends_at
-                        > last_completed_charges_dict[pod.unit_id].ends_at
-                        and charge.energy_cost is not None
-                    ):
-                        last_completed_charges_dict[pod.unit_id] = charge
-                        setattr(pod, "last_charge_cost", charge.energy_cost)
-                else:
-                    pod.current_kwh = charge.kwh_used
-
-            self.pods = list(new_pods_by_id.values())
+            # Totals are kept up to date by the store as charges are merged
+            for pod in new_pods:
+                self.__apply_charge_totals(pod)
 
             if self.online is False:
                 _LOGGER.info("Connection to Pod Point re-established.")
             self.online = True
+            self.last_success_at = dt_util.utcnow()
+            self.consecutive_failures = 0
+            self.restored_snapshot = False
+
+            added, removed = self.__update_pod_registry(
+                list(new_pods_by_id.values()), fetched=pods_fetched
+            )
+            self.update_view_models()
+            self.__announce_pods(added, removed)
+            self.__schedule_charging_transition()
+
+            if self.charge_cache is not None and (
+                TIER_CHARGES in refreshed_tiers or self.charges_pull is not None
+            ):
+                self.charge_cache.async_save(
+                    set(new_pods_by_id.keys()), self.home_charges, self.charges_pull
+                )
+            if self.snapshot is not None and not refreshed_tiers.isdisjoint(
+                SNAPSHOT_TIERS
+            ):
+                self.snapshot.async_save(self.last_success_at, self.pods, self.user)
+
+            # Tiers that missed the deadline for some pods are due again next time
+            stale_tiers = set().union(*self.stale_fields.values())
+            for tier in refreshed_tiers - stale_tiers:
+                self.tier_refreshed_at[tier] = refresh_started
+            if len(stale_tiers) > 0:
+                _LOGGER.warning(
+                    "Pod Point refresh missed its deadline, keeping previous %s data",
+                    " and ".join(sorted(stale_tiers)),
+                )
+            self.refreshed_tiers = refreshed_tiers
+            if TIER_CONNECTIVITY in refreshed_tiers:
+                self.__adapt_polling()
+            self.__schedule_next_tier()
+
+            _LOGGER.debug(
+                "=== STATE WRITES ===\nChanged pods: %s\nWritten: %s\nSuppressed: %s",
+                sorted(self.changed_unit_ids),
+                self.state_writes,
+                self.suppressed_state_writes,
+            )
+
+            self.__report_circuit_breaker()
 
             return self.pods  # sets coordinator.data
 
+        except RequestBudgetExhausted as exception:
+            if self.data is None:
+                self.__schedule_next_tier()
+                raise UpdateFailed(
+                    "Pod Point request budget used up. Retrying"
+                ) from exception
+
+            return self.__defer_refresh()
+
         except ApiConnectionError as exception:
             if self.online is not False:
                 _LOGGER.warning("Unable to connect to Pod Point. (%s)", exception)
+            self.__report_circuit_breaker()
 
             self.online = False
             _LOGGER.debug(exception)
+            self.__record_failure()
+
+            # Retry as soon as the breaker lets a probe through, rather than on the
+            # normal interval
+            if (
+                self.circuit_breaker is not None
+                and self.circuit_breaker.state == STATE_OPEN
+            ):
+                self.update_interval = timedelta(
+                    seconds=max(
+                        self._tier_due_tolerance,
+                        self.circuit_breaker.seconds_until_retry,
+                    )
+                )
 
             raise UpdateFailed(
                 "Unable to connect to Pod Point. Retrying"
@@ -185,21 +913,295 @@ Updated Charges: %s\nCombined Charges: %s",
 If this issue persists, please contact the developer."
             )
             _LOGGER.exception(exception)
+            self.__record_failure()
             raise UpdateFailed() from exception
 
-    def __group_pods_by_unit_id(self, pods: List[Pod] = None) -> Dict[int, Pod]:
-        """Given a list of pods, will return a dictionary { pod.unit_id: pod, *** }.
-        If no pods are passed, will perfom on self.pods"""
-        pod_dict: Dict[int, Pod] = {}
+    def __budget_exhausted(self) -> bool:
+        return self.rate_limiter is not None and self.rate_limiter.remaining_budget == 0
 
-        if pods is None:
-            pods = self.pods
+    def __defer_refresh(self) -> List[Pod]:
+        """Keep the data we have until the request budget allows another refresh,
+        rather than failing. Tiers not refreshed stay due."""
+        _LOGGER.debug(
+            "=== REFRESH DEFERRED ===\nBudget available in: %.0fs",
+            self.rate_limiter.seconds_until_budget,
+        )
+        self.stale_fields = {}
+        self.changed_unit_ids = set()
+        self.refreshed_tiers = set()
+        self.__schedule_next_tier()
+        return self.data
+
+    def __record_failure(self) -> None:
+        """Count a failed refresh. The last good data stays, showing its age, until
+        it is no longer fit to show"""
+        was_available = self.data_available
+        self.consecutive_failures += 1
+        if self.last_success_at is None:
+            return
+
+        if was_available and not self.data_available:
+            _LOGGER.warning(
+                "Pod Point data is %ss old after %s failed refreshes, marking it \
+unavailable.",
+                self.data_age,
+                self.consecutive_failures,
+            )
 
-        for pod in pods:
-            pod_dict[pod.unit_id] = pod
+        # The coordinator only tells listeners about the first failure in a row
+        self.refreshed_tiers = set()
+        self.update_view_models()
+        self.async_update_listeners()
 
-        self.pod_dict = pod_dict
-        return self.pod_dict
+    async def __async_update_user_stage(self, due_tiers: Set[str]) -> User:
+        """Fetch the user (account balance) when its tier is due"""
+        if TIER_USER not in due_tiers and self.user is not None:
+            return self.user
+
+        return await self.__async_timed_stage(
+            "user", self.__async_call_api(self.api.async_get_user)
+        )
+
+    async def __async_update_pods_stages(
+        self, due_tiers: Set[str], refreshed_tiers: Set[str]
+    ) -> Tuple[Dict[int, Pod], bool]:
+        """Fetch pods, then their connectivity status and firmware side by side.
+        Returns the pods by unit id, and whether they were fetched."""
+        fetch_pods = (
+            len(self.pod_registry) == 0
+            or TIER_PODS in due_tiers
+            or TIER_CONNECTIVITY in due_tiers
+        )
+
+        if fetch_pods:
+            full_pull = len(self.pod_registry) == 0 or TIER_PODS in due_tiers
+            new_pods: List[Pod] = await self.__async_timed_stage(
+                "pods", self.__async_update_pods(full_pull=full_pull)
+            )
+
+            _LOGGER.debug(
+                "=== POD UPDATE ===\nFound Pods: %s\nPrevious Pods: %s",
+                len(new_pods),
+                len(self.pods),
+            )
+
+            new_pods = await self.__async_group_pods(new_pods, full_pull=full_pull)
+
+            # Group Pods by ID so that we can organise our charges into the pods
+            # they were performed on
+            new_pods_by_id = {pod.unit_id: pod for pod in new_pods}
+
+            # Every pod is about to be polled, give the account room for them
+            if self.rate_limiter is not None:
+                self.rate_limiter.scale(len(new_pods_by_id))
+
+            if full_pull:
+                refreshed_tiers.add(TIER_PODS)
+        else:
+            # Neither tier is due, keep working with the pods we already have
+            new_pods_by_id = {
+                unit_id: pod
+                for unit_id, pod in self.pod_registry.items()
+                if unit_id not in self.missing_pods
+            }
+            new_pods = list(new_pods_by_id.values())
+
+        # Fetch connection status data for pods, and firmware data if it is needed
+        stages = []
+
+        if TIER_CONNECTIVITY in due_tiers or len(self.pod_registry) == 0:
+            stages.append(
+                self.__async_timed_stage(
+                    "connectivity",
+                    self.__async_update_pod_connection_status(new_pods_by_id),
+                )
+            )
+            refreshed_tiers.add(TIER_CONNECTIVITY)
+        elif fetch_pods:
+            # Freshly fetched pods have no connectivity data, carry it over
+            for pod in new_pods:
+                self.__carry_over_connectivity(pod, self.pod_registry.get(pod.unit_id))
+
+        if TIER_FIRMWARE in due_tiers:
+            stages.append(
+                self.__async_timed_stage(
+                    "firmware", self.__async_refresh_firmware(new_pods, new_pods_by_id)
+                )
+            )
+            refreshed_tiers.add(TIER_FIRMWARE)
+        else:
+            # Pods new to the account need their firmware before entities are added
+            new_to_account = [pod for pod in new_pods if pod.firmware is None]
+            if len(new_to_account) > 0:
+                stages.append(
+                    self.__async_timed_stage(
+                        "firmware",
+                        self.__async_refresh_firmware(new_to_account, new_pods_by_id),
+                    )
+                )
+
+        await self.__async_gather_stages(*stages)
+
+        return new_pods_by_id, fetch_pods
+
+    async def __async_fetch_charges_stage(
+        self, all_charges: bool, due_tiers: Set[str]
+    ) -> Tuple[List[Charge], Exception]:
+        """Fetch home charges. An incremental fetch may be discarded once we know if the
+        pods have changed, so its failure is returned rather than raised"""
+        if TIER_CHARGES not in due_tiers and not all_charges:
+            return ([], None)
+
+        if all_charges:
+            return (await self.__fetch_home_charges(all_charges=True), None)
+
+        try:
+            return (await self.__fetch_home_charges(all_charges=False), None)
+        except (AuthError, SessionError):
+            raise
+        except Exception as exception:  # pylint: disable=broad-except
+            return ([], exception)
+
+    async def __async_timed_stage(self, name: str, stage: Awaitable[Any]) -> Any:
+        """Await a refresh stage, recording how long it took in `stage_timings`"""
+        started = time.monotonic()
+        try:
+            return await stage
+        finally:
+            self.stage_timings[name] = time.monotonic() - started
+
+    @staticmethod
+    async def __async_gather_stages(*stages: Awaitable[Any]) -> List[Any]:
+        """Run stages concurrently, returning their results in order. If a stage fails
+        the others are cancelled and the error is raised"""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def __log_stage_timings(self, elapsed: float) -> None:
+        timings = self.stage_timings
+        pod_chain = timings.get("pods", 0.0) + max(
+            timings.get("connectivity", 0.0), timings.get("firmware", 0.0)
+        )
+        charges_chain = timings.get("charges", 0.0) + timings.get("charges_all", 0.0)
+        chains = {
+            "user": timings.get("user", 0.0),
+            "pods": pod_chain,
+            "charges": charges_chain,
+        }
+        self.critical_path = max(chains, key=chains.get)
+
+        _LOGGER.debug(
+            "=== REFRESH TIMINGS ===\nTotal: %.3fs\nSum of stages: %.3fs\n\
+Critical path: %s (%.3fs)\nStages: %s",
+            elapsed,
+            sum(timings.values()),
+            self.critical_path,
+            chains[self.critical_path],
+            {name: round(duration, 3) for name, duration in timings.items()},
+        )
+
+    def __report_circuit_breaker(self) -> None:
+        """Log the breaker opening, and closing again, along with the connection"""
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return
+
+        state = breaker.state
+        if state == STATE_OPEN and breaker.times_opened != self._breaker_opened:
+            _LOGGER.warning(
+                "Pausing requests to Pod Point for %.0fs after %s failed attempts.",
+                breaker.seconds_until_retry,
+                breaker.failures,
+            )
+        elif state == STATE_CLOSED and self._breaker_opened > 0:
+            _LOGGER.info("Resuming requests to Pod Point.")
+
+        self._breaker_opened = breaker.times_opened
+
+    def __adapt_polling(self) -> None:
+        """Speed up polling while any pod is active, back off while all are idle"""
+        states = [view_model.state for view_model in self.view_models.values()]
+        pods_active = any(state in ATTR_STATES_ACTIVE for state in states)
+
+        if pods_active:
+            self.idle_polls = 0
+        else:
+            self.idle_polls += 1
+
+        if pods_active != self.pods_active:
+            _LOGGER.debug(
+                "=== ADAPTIVE POLLING ===\nPods active: %s\nStates: %s",
+                pods_active,
+                states,
+            )
+
+        self.pods_active = pods_active
+
+    def __due_tiers(self, now: float) -> Set[str]:
+        """Which tiers should be refreshed at `now`"""
+        due_tiers: Set[str] = set()
+
+        for tier in self.demanded_tiers:
+            refreshed_at = self.tier_refreshed_at.get(tier)
+            interval = self.tier_interval(tier).total_seconds()
+
+            if (
+                refreshed_at is None
+                or now - refreshed_at >= interval - self._tier_due_tolerance
+            ):
+                due_tiers.add(tier)
+
+        return due_tiers
+
+    def __schedule_next_tier(self) -> None:
+        """Set the update interval so the next refresh happens when a tier is due"""
+        now = time.monotonic()
+        seconds_until_due = [
+            self.tier_interval(tier).total_seconds()
+            - (now - self.tier_refreshed_at.get(tier, now))
+            for tier in self.demanded_tiers
+        ]
+
+        seconds = min(seconds_until_due)
+        if self.__budget_exhausted():
+            seconds = max(seconds, self.rate_limiter.seconds_until_budget)
+
+        self.update_interval = timedelta(seconds=max(self._tier_due_tolerance, seconds))
+
+    def __apply_charge_totals(self, pod: Pod) -> None:
+        pod_charges: PodCharges = self.home_charges.pod_charges(pod.unit_id)
+        pod.charges = pod_charges
+        pod.total_kwh = pod_charges.total_kwh
+        pod.total_charge_seconds = pod_charges.total_charge_seconds
+        pod.total_cost = pod_charges.total_cost
+        pod.current_kwh = pod_charges.current_kwh
+        setattr(pod, "last_charge_cost", pod_charges.last_charge_cost)
+
+    @staticmethod
+    def __apply_connectivity_status(
+        pod: Pod, connectivity_status: ConnectivityStatus
+    ) -> None:
+        pod.connectivity_status = connectivity_status
+        pod.last_message_at = connectivity_status.last_message_at
+        pod.charging_state = connectivity_status.charging_state
+
+        if pod.charging_state is not None:
+            pod.charging_state = pod.charging_state.lower().replace("_", "-")
+
+    @staticmethod
+    def __carry_over_connectivity(pod: Pod, previous_pod: Pod) -> None:
+        if previous_pod is None:
+            return
+
+        pod.connectivity_status = previous_pod.connectivity_status
+        pod.last_message_at = previous_pod.last_message_at
+        pod.charging_state = previous_pod.charging_state
 
     async def __fetch_home_charges(self, all_charges: bool = True) -> List[Charge]:
         """Fetch either all charges for a user, or progressively paginate until you have the latest
@@ -207,23 +1209,19 @@ If this issue persists, please contact the developer."
         charges: List[Charge] = []
 
         if all_charges:
-            charges = await self.api.async_get_all_charges(
-                perpage=self.charges_perpage_all
-            )
+            charges = await self.__async_pull_all_charges()
         else:
             # Fetch charges until we have the most recent ones found, should reduce load
             # on the Pod Point servers
-            last_charge_ids: List[int] = [
-                pod.charges[0].id
-                for pod in self.pods
-                if (len(pod.charges) > 0) and pod.charges[0].id is not None
-            ]
+            last_charge_ids: List[int] = self.__last_charge_ids()
             charges: List[Charge] = []
 
             page = 1
             while len(last_charge_ids) > 0:
-                page_charges = await self.api.async_get_charges(
-                    perpage=self.charges_perpage_update, page=page
+                page_charges = await self.__async_call_api(
+                    self.api.async_get_charges,
+                    perpage=self.charges_perpage_update,
+                    page=page,
                 )
 
                 # We should not get to a page with no charges before finding all the charges in our
@@ -258,34 +1256,102 @@ expecting more charges. Page {page}, looking for : {last_charge_ids}"
 
         return home_charges
 
+    async def __async_pull_all_charges(self) -> List[Charge]:
+        """Page through every charge, each page a call of its own. Pages fetched are
+        kept in `charges_pull`, when the refresh deadline or request budget stops
+        the pull part way the next refresh carries on from there. Empty until every
+        page has been fetched."""
+        if self.charges_pull is None:
+            self.charges_pull = ChargesPull()
+        pull = self.charges_pull
+
+        more_charges = True
+        while more_charges:
+            try:
+                page_charges: List[Charge] = await self.__async_call_api(
+                    self.api.async_get_charges,
+                    perpage=self.charges_perpage_all,
+                    page=pull.next_page,
+                    deadline=self.refresh_deadline,
+                )
+            except (ApiCallTimeout, RequestBudgetExhausted) as exception:
+                _LOGGER.debug(
+                    "=== CHARGES PULL ===\nNext Page: %s\nCharges: %s\nStopped: %s",
+                    pull.next_page,
+                    len(pull.charges),
+                    exception,
+                )
+                return []
+
+            # A short page is the last one
+            more_charges = len(page_charges) >= self.charges_perpage_all
+            pull.charges.extend(
+                charge for charge in page_charges if charge.location.home is True
+            )
+            pull.next_page += 1
+
+        self.charges_pull = None
+        return pull.charges
+
+    def __known_unit_ids(self) -> Set[int]:
+        """Unit ids of the pods our charges were fetched for, from the cache on boot"""
+        if len(self.pod_registry) > 0:
+            return set(self.pod_registry.keys()) - set(self.missing_pods.keys())
+
+        return self.cached_unit_ids
+
+    def __last_charge_ids(self) -> List[int]:
+        """The most recent charge we hold for each known pod. Charges are held newest
+        first"""
+        known_unit_ids = self.__known_unit_ids()
+        last_charge_ids: Dict[int, int] = {}
+
+        for charge in self.home_charges:
+            unit_id = charge.pod.id
+            if (
+                charge.id is not None
+                and unit_id in known_unit_ids
+                and unit_id not in last_charge_ids
+            ):
+                last_charge_ids[unit_id] = charge.id
+
+                if len(last_charge_ids) == len(known_unit_ids):
+                    break
+
+        return list(last_charge_ids.values())
+
     def __should_fetch_all_charges(self, new_pods: List[Pod]) -> bool:
         """Given a list of new pods, should we query for all charges on a users account,
         or just the most recent"""
         fetch_all_charges = False
-        if len(new_pods) == len(self.pods):  # There are the same number of pods
-            fetch_all_charges = not self.__pods_match(new_pods=new_pods)
+        known_unit_ids = self.__known_unit_ids()
+        if len(new_pods) == len(known_unit_ids):  # There are the same number of pods
+            fetch_all_charges = any(
+                pod.unit_id not in known_unit_ids for pod in new_pods
+            )
         else:  # There are more (or less) pods than we previously had
             fetch_all_charges = True
 
         return fetch_all_charges
 
-    def __combine_pods(self, new_pods_by_id: Dict[str, Pod]) -> List[Pod]:
-        """Given a new set of pods, combine them with the existing pod data to create a new list"""
-        new_pods: List[Pod] = []
-
-        for previous_pod in self.pods:
-            new_pod = new_pods_by_id[previous_pod.unit_id]
-            new_pod.price = previous_pod.price
-            new_pod.model = previous_pod.model
-            new_pod.unit_connectors = previous_pod.unit_connectors
+    def __combine_pods(self, new_pods: List[Pod], full_pull: bool = False) -> List[Pod]:
+        """Given a new set of pods, combine them with the existing pod data to create a new list.
+        A full pull already has up to date metadata, so only firmware is carried over"""
+        for new_pod in new_pods:
+            previous_pod = self.pod_registry.get(new_pod.unit_id)
+            if previous_pod is None:
+                continue
+
+            if not full_pull:
+                new_pod.price = previous_pod.price
+                new_pod.model = previous_pod.model
+                new_pod.unit_connectors = previous_pod.unit_connectors
             new_pod.firmware = previous_pod.firmware
 
-            new_pods.append(new_pod)
-
         return new_pods
 
     def __pods_match(self, new_pods: List[Pod]) -> bool:
-        set1 = set((pod.id) for pod in self.pods)
+        set1 = set((pod.id) for pod in self.pod_registry.values())
         difference = [pod for pod in new_pods if (pod.id) not in set1]
 
         # Is there a difference in the pod IDs?
@@ -309,44 +1375,58 @@ expecting more charges. Page {page}, looking for : {last_charge_ids}"
         else:
             ir.async_delete_issue(hass, DOMAIN, "firmware_update")
 
-    async def __async_update_pods(self) -> List[Pod]:
+    async def __async_update_pods(self, full_pull: bool = False) -> List[Pod]:
         # Should we get a limited set of data (subsiquent refreshes)
-        if len(self.pods) > 0:
+        if not full_pull:
             _LOGGER.debug("Existing pods found, performing a limited data pull")
-            return await self.api.async_get_all_pods(includes=LIMITED_POD_INCLUDES)
+            return await self.__async_call_api(
+                self.api.async_get_all_pods, includes=LIMITED_POD_INCLUDES
+            )
         else:
-            _LOGGER.debug("No existing pods found, performing a full data pull")
-            return await self.api.async_get_all_pods()
+            _LOGGER.debug("Pod metadata due, performing a full data pull")
+            return await self.__async_call_api(self.api.async_get_all_pods)
 
     async def __async_group_pods(
-        self, new_pods, new_pods_by_id
-    ) -> Tuple[List[Pod], Dict[str, Pod]]:
+        self, new_pods: List[Pod], full_pull: bool = False
+    ) -> List[Pod]:
         # Attempt to update our new pods with additional data from the existing pods.
         # This allows us to query less data each refresh, kinder on the Pod Point APIs.
         if self.__pods_match(new_pods=new_pods):
             # Created an updated list of pods combining old and new data
             _LOGGER.debug("Combining new and old pods")
-            new_pods = self.__combine_pods(new_pods_by_id=new_pods_by_id)
-            new_pods_by_id = self.__group_pods_by_unit_id(pods=new_pods)
+            new_pods = self.__combine_pods(new_pods=new_pods, full_pull=full_pull)
         elif (
-            len(self.pods) > 0
+            len(self.pod_registry) > 0 and not full_pull
         ):  # Ensure that we are not re-querying if this is he first run
             _LOGGER.debug(
                 "New pods from Pod Point do not match those saved. Performing a full data pull."
             )
-            new_pods = await self.api.async_get_all_pods()
+            new_pods = await self.__async_call_api(self.api.async_get_all_pods)
 
-        return (new_pods, new_pods_by_id)
+        return new_pods
 
     async def __async_refresh_firmware(
         self, new_pods: List[Pod], new_pods_by_id: Dict[str, Pod]
     ) -> Dict[str, Pod]:
         _LOGGER.debug("=== FIRMWARE STATUS UPDATE ===")
 
+        # Fetch firmware for each pod, concurrently
+        results = await self.__async_gather_for_pods(
+            new_pods,
+            self.api.async_get_firmware,
+            "firmware",
+            deadline=self.refresh_deadline,
+        )
+
         for pod in new_pods:
-            pod_firmwares: List[Firmware] = await self.api.async_get_firmware(pod=pod)
+            pod_firmwares = results.get(pod.unit_id)
+
+            # A failed call has already been logged, the pod keeps its current firmware
+            if isinstance(pod_firmwares, Exception):
+                self.__mark_stale(pod, TIER_FIRMWARE, pod_firmwares)
+                continue
 
-            if len(pod_firmwares) <= 0:
+            if pod_firmwares is None or len(pod_firmwares) <= 0:
                 _LOGGER.warning(
                     "Unable to retrive firmware information for Pod %s",
                     pod.ppid,
@@ -361,8 +1441,6 @@ expecting more charges. Page {page}, looking for : {last_charge_ids}"
                     pod.firmware = firmware
                     new_pods_by_id[pod.unit_id] = pod
 
-        self.firmware_refresh = self._firmware_refresh_interval
-
         return new_pods_by_id
 
     async def __async_update_pod_connection_status(
@@ -370,19 +1448,112 @@ expecting more charges. Page {page}, looking for : {last_charge_ids}"
     ) -> Dict[str, Pod]:
         _LOGGER.debug("=== POD CONNECTION STATUS UPDATE ===")
 
-        # flat_pods = [item for row in new_pods_by_id.values() for item in row]
-        # Fetch connection status for each pod
-        for pod in new_pods_by_id.values():
-            connectivity_status = await self.api.async_get_connectivity_status(pod=pod)
+        # Fetch connection status for each pod, concurrently
+        results = await self.__async_gather_for_pods(
+            list(new_pods_by_id.values()),
+            self.api.async_get_connectivity_status,
+            "connectivity status",
+            deadline=self.refresh_deadline,
+        )
 
-            if connectivity_status is not None:
-                pod.connectivity_status = connectivity_status
-                pod.last_message_at = connectivity_status.last_message_at
-                pod.charging_state = connectivity_status.charging_state
+        for pod in new_pods_by_id.values():
+            connectivity_status = results.get(pod.unit_id)
 
-                if pod.charging_state is not None:
-                    pod.charging_state = pod.charging_state.lower().replace("_", "-")
+            # If the call for this pod failed, carry over what we knew from the last
+            # refresh rather than dropping the pod's connectivity data
+            if isinstance(connectivity_status, Exception):
+                self.__carry_over_connectivity(pod, self.pod_registry.get(pod.unit_id))
+                self.__mark_stale(pod, TIER_CONNECTIVITY, connectivity_status)
+                continue
 
+            if connectivity_status is not None:
+                self.__apply_connectivity_status(pod, connectivity_status)
                 new_pods_by_id[pod.unit_id] = pod
 
         return new_pods_by_id
+
+    async def __async_call_api(
+        self,
+        request: Callable[..., Awaitable[Any]],
+        *args,
+        timeout: float = API_CALL_TIMEOUT,
+        deadline: float = None,
+        **kwargs,
+    ) -> Any:
+        """Make an API call, abandoning it after `timeout` seconds or at the
+        `deadline` (loop time), whichever comes first. Waiting for the rate limiter
+        only counts against the deadline."""
+        started = self.hass.loop.time()
+        try:
+            async with CallTimeout(timeout, deadline):
+                return await request(*args, **kwargs)
+        except TimeoutError as exception:
+            raise ApiCallTimeout(self.hass.loop.time() - started) from exception
+
+    def __mark_stale(self, pod: Pod, tier: str, exception: Exception) -> None:
+        """A pod kept its previous data for a tier, having missed the deadline or
+        run out of request budget"""
+        if isinstance(exception, (ApiCallTimeout, RequestBudgetExhausted)):
+            self.stale_fields.setdefault(pod.unit_id, set()).add(tier)
+
+    async def __async_gather_for_pods(
+        self,
+        pods: List[Pod],
+        request: Callable[..., Awaitable[Any]],
+        description: str,
+        deadline: float = None,
+    ) -> Dict[int, Any]:
+        """Call `request(pod=pod)` for every pod, with at most `api_concurrency` calls
+        in flight. Returns { pod.unit_id: result } where a failed call's result is the
+        exception it raised, calls still going at the `deadline` fail with
+        `ApiCallTimeout`. Auth and session errors are re-raised."""
+        semaphore = asyncio.Semaphore(self.api_concurrency)
+        call_durations: List[float] = []
+
+        async def call(pod: Pod) -> Any:
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    return await self.__async_call_api(
+                        request, pod=pod, deadline=deadline
+                    )
+                finally:
+                    call_durations.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *[call(pod) for pod in pods], return_exceptions=True
+        )
+        elapsed = time.monotonic() - started
+
+        results_by_id: Dict[int, Any] = {}
+        for pod, result in zip(pods, results):
+            if isinstance(result, (AuthError, SessionError)):
+                raise result
+
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Unable to retrieve %s for Pod %s. (%s)",
+                    description,
+                    pod.ppid,
+                    result,
+                )
+
+            results_by_id[pod.unit_id] = result
+
+        serial_estimate = sum(call_durations)
+        _LOGGER.debug(
+            "Fetched %s for %s pods in %.3fs (serial estimate %.3fs, saved %.3fs, \
+concurrency %s)",
+            description,
+            len(pods),
+            elapsed,
+            serial_estimate,
+            max(0.0, serial_estimate - elapsed),
+            self.api_concurrency,
+        )
+
+        return results_by_id
@@ -0,0 +1,88 @@
+"""Diagnostics support for pod_point."""
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .coordinator import PodPointDataUpdateCoordinator
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    latencies = list(coordinator.command_queue.latencies)
+    limiter = coordinator.rate_limiter
+    breaker = coordinator.circuit_breaker
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "online": coordinator.online,
+            "consecutive_failures": coordinator.consecutive_failures,
+            "data_age": coordinator.data_age,
+            "pods": len(coordinator.pods),
+            "missing_pods": coordinator.missing_pods,
+            "charges": len(coordinator.home_charges),
+            "refreshed_tiers": sorted(coordinator.refreshed_tiers),
+            "demanded_tiers": sorted(coordinator.demanded_tiers),
+            "tier_intervals": {
+                tier: coordinator.tier_interval(tier).total_seconds()
+                for tier in coordinator.tier_intervals
+            },
+            "stage_timings": coordinator.stage_timings,
+        },
+        "state_writes": {
+            "written": coordinator.state_writes,
+            "suppressed": coordinator.suppressed_state_writes,
+            "changed_pods": sorted(coordinator.changed_unit_ids),
+        },
+        "commands": {
+            "queued": coordinator.command_queue.depth(),
+            "max_queued": coordinator.command_queue.max_depth,
+            "sent": coordinator.command_queue.commands_sent,
+            "superseded": coordinator.command_queue.commands_superseded,
+            "joined": coordinator.command_queue.commands_joined,
+            "latency": {
+                "last": latencies[-1] if len(latencies) > 0 else None,
+                "mean": sum(latencies) / len(latencies) if len(latencies) > 0 else None,
+                "max": max(latencies, default=None),
+            },
+        },
+        "rate_limit": (
+            {
+                "remaining_budget": limiter.remaining_budget,
+                "hourly_budget": limiter.hourly_budget,
+                "rate": limiter.rate,
+                "burst": limiter.burst,
+                "polling_stretch": limiter.budget_stretch,
+                "throttle_events": limiter.throttle_events,
+                "throttled_seconds": limiter.throttled_seconds,
+                "rejected_requests": limiter.rejected_requests,
+            }
+            if limiter is not None
+            else None
+        ),
+        "circuit_breaker": (
+            {
+                "state": breaker.state,
+                "failures": breaker.failures,
+                "times_opened": breaker.times_opened,
+                "seconds_until_retry": breaker.seconds_until_retry,
+            }
+            if breaker is not None
+            else None
+        ),
+        "pod_refreshes": {
+            "window": coordinator.refresh_window.total_seconds(),
+            "requested": coordinator.pod_refresh_requests,
+            "refreshed": coordinator.pod_refreshes,
+            "coalesced": coordinator.coalesced_pod_refreshes,
+        },
+    }
@@ -0,0 +1,229 @@
+"""Import charge history into long-term statistics for the Energy dashboard"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+from podpointclient.charge import Charge
+from podpointclient.pod import Pod
+
+from .const import (
+    CONF_CURRENCY,
+    DEFAULT_CURRENCY,
+    DOMAIN,
+    STATISTICS_IMPORT_BATCH_SIZE,
+    TIER_CHARGES,
+)
+from .coordinator import PodPointDataUpdateCoordinator
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+HOUR = timedelta(hours=1)
+
+
+@dataclass
+class HourlyUsage:
+    """Energy (kWh) and cost (pence) used within an hour"""
+
+    kwh: float = 0.0
+    cost: float = 0.0
+
+
+def hour_start(moment: datetime) -> datetime:
+    """Return the start of the hour containing `moment`"""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def hourly_usage(
+    charges: Iterable[Charge], since: datetime, until: datetime
+) -> Dict[datetime, HourlyUsage]:
+    """Spread the energy and cost of completed charges evenly over the hours they
+    ran for, returning the hours starting within [since, until). Charges must be
+    newest first."""
+    hours: Dict[datetime, HourlyUsage] = {}
+
+    for charge in charges:
+        if charge.starts_at is None or charge.ends_at is None:
+            continue
+
+        # Charges on a pod do not overlap, so once a charge ended before `since`
+        # every older charge did too
+        if charge.ends_at < since:
+            break
+
+        seconds = (charge.ends_at - charge.starts_at).total_seconds()
+        cost = charge.energy_cost or 0
+        hour = hour_start(charge.starts_at)
+
+        while hour <= charge.ends_at:
+            if seconds > 0:
+                overlap = (
+                    min(hour + HOUR, charge.ends_at) - max(hour, charge.starts_at)
+                ).total_seconds()
+                share = max(overlap, 0) / seconds
+            else:
+                share = 1.0 if hour == hour_start(charge.starts_at) else 0.0
+
+            if share > 0 and since <= hour < until:
+                usage = hours.setdefault(hour, HourlyUsage())
+                usage.kwh += charge.kwh_used * share
+                usage.cost += cost * share
+
+            hour += HOUR
+
+    return hours
+
+
+class EnergyStatisticsImporter:
+    """Backfills hourly energy and cost statistics for each pod from its charges.
+    The first import covers every charge, later imports continue from the last
+    hour already in the recorder. Charges are not fetched for the import, it follows
+    them while the energy and cost entities have them fetched."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: PodPointDataUpdateCoordinator,
+        currency: str,
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self.currency = currency
+        self._lock = asyncio.Lock()
+
+    async def async_update_options(
+        self, hass: HomeAssistant, entry: ConfigEntry
+    ) -> None:
+        """Follow the currency option. Costs in a new currency go to their own
+        statistic, backfilled from every charge"""
+        currency = entry.options.get(CONF_CURRENCY, DEFAULT_CURRENCY)
+        if currency == self.currency:
+            return
+
+        self.currency = currency
+        if self.coordinator.data is not None:
+            self.hass.async_create_background_task(
+                self.async_import(), name=f"{DOMAIN} statistics import"
+            )
+
+    @callback
+    def async_handle_coordinator_update(self) -> None:
+        """Import new hours whenever charges are refreshed"""
+        if not self.coordinator.tiers_refreshed({TIER_CHARGES}):
+            return
+
+        if self._lock.locked():
+            return
+
+        self.hass.async_create_background_task(
+            self.async_import(), name=f"{DOMAIN} statistics import"
+        )
+
+    async def async_import(self) -> None:
+        """Import every complete hour that is not yet in the recorder"""
+        async with self._lock:
+            # Charges are fetched periodically, give the last hour time to settle
+            until = hour_start(dt_util.utcnow()) - HOUR
+
+            for pod in self.coordinator.pods:
+                await self.__async_import_pod(pod, until)
+
+    async def __async_import_pod(self, pod: Pod, until: datetime) -> None:
+        # Ongoing charges will add to hours after they started, wait for them
+        charges = self.coordinator.home_charges.pod_charges(pod.unit_id)
+        for charge in charges:
+            if charge.ends_at is None and charge.starts_at is not None:
+                until = min(until, hour_start(charge.starts_at))
+
+        energy_id, energy_meta = self.__energy_metadata(pod)
+        cost_id, cost_meta = self.__cost_metadata(pod)
+
+        # A cost statistic in a newly chosen currency starts behind the energy one
+        energy_since, energy_sum = await self.__async_last_statistic(energy_id)
+        cost_since, cost_sum = await self.__async_last_statistic(cost_id)
+
+        usage = hourly_usage(charges, min(energy_since, cost_since), until)
+        if len(usage) == 0:
+            return
+
+        energy_stats: List[StatisticData] = []
+        cost_stats: List[StatisticData] = []
+        for hour in sorted(usage):
+            if hour >= energy_since:
+                energy_sum += usage[hour].kwh
+                energy_stats.append(
+                    StatisticData(start=hour, state=usage[hour].kwh, sum=energy_sum)
+                )
+            if hour >= cost_since:
+                cost_sum += usage[hour].cost / 100
+                cost_stats.append(
+                    StatisticData(
+                        start=hour, state=usage[hour].cost / 100, sum=cost_sum
+                    )
+                )
+
+        _LOGGER.debug(
+            "=== STATISTICS IMPORT ===\nPod: %s\nEnergy hours: %s\nCost hours: %s"
+            "\nCurrency: %s\nUntil: %s",
+            pod.unit_id,
+            len(energy_stats),
+            len(cost_stats),
+            self.currency,
+            until,
+        )
+
+        for meta, stats in ((energy_meta, energy_stats), (cost_meta, cost_stats)):
+            for start in range(0, len(stats), STATISTICS_IMPORT_BATCH_SIZE):
+                async_add_external_statistics(
+                    self.hass, meta, stats[start : start + STATISTICS_IMPORT_BATCH_SIZE]
+                )
+
+    async def __async_last_statistic(self, statistic_id: str) -> Tuple[datetime, float]:
+        """Return the hour after the last imported statistic, and its sum"""
+        last_stats = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+        )
+
+        if not last_stats.get(statistic_id):
+            return dt_util.utc_from_timestamp(0), 0.0
+
+        last_stat = last_stats[statistic_id][0]
+        since = dt_util.utc_from_timestamp(last_stat["start"]) + HOUR
+        return since, last_stat["sum"] or 0.0
+
+    @staticmethod
+    def __energy_metadata(pod: Pod) -> Tuple[str, StatisticMetaData]:
+        statistic_id = f"{DOMAIN}:{pod.unit_id}_energy"
+        return statistic_id, StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{pod.ppid} Energy",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+
+    def __cost_metadata(self, pod: Pod) -> Tuple[str, StatisticMetaData]:
+        # Each currency has its own statistic, sums in different units can't mix.
+        # Currencies saved before they were validated may not be valid in an id.
+        statistic_id = f"{DOMAIN}:{pod.unit_id}_cost_{slugify(self.currency)}"
+        return statistic_id, StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{pod.ppid} Cost ({self.currency})",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement=self.currency,
+        )
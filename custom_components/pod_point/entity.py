@@ -1,146 +1,193 @@
 """PodPointEntity class"""
 
-from datetime import datetime, timedelta
 import logging
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Set
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from podpointclient.charge_mode import ChargeMode
-from podpointclient.charge_override import ChargeOverride
 from podpointclient.pod import Pod
-from podpointclient.schedule import Schedule
 
 from .const import (
     APP_IMAGE_URL_BASE,
-    ATTR_STATE,
-    ATTR_STATE_AVAILABLE,
-    ATTR_STATE_CHARGING,
-    ATTR_STATE_CONNECTED_WAITING,
-    ATTR_STATE_IDLE,
-    ATTR_STATE_PENDING,
-    ATTR_STATE_RANKING,
-    ATTR_STATE_SUSPENDED_EV,
-    ATTR_STATE_SUSPENDED_EVSE,
-    ATTR_STATE_WAITING,
-    ATTRIBUTION,
-    CHARGING_FLAG,
     DOMAIN,
     NAME,
+    POD_TIERS,
+    SIGNAL_PODS_ADDED,
+    SIGNAL_PODS_REMOVED,
+    TIER_CONNECTIVITY,
+    TIER_PODS,
 )
 from .coordinator import PodPointDataUpdateCoordinator
+from .state import compare_state
+from .view_model import PodViewModel
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
+@callback
+def async_track_pods(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: Callable[[List[Entity]], None],
+    create_entities: Callable[[int], List[Entity]],
+) -> List[Entity]:
+    """Return the entities for the pods we have now, those for pods that appear
+    on the account later are added as they do"""
+    coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    @callback
+    def async_add_pods(unit_ids: Iterable[int]) -> None:
+        entities: List[Entity] = []
+        for unit_id in sorted(unit_ids):
+            entities.extend(create_entities(unit_id))
+        async_add_entities(entities)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_PODS_ADDED.format(entry.entry_id), async_add_pods
+        )
+    )
+
+    entities: List[Entity] = []
+    for unit_id in coordinator.pod_registry:
+        entities.extend(create_entities(unit_id))
+    return entities
+
+
 class PodPointEntity(CoordinatorEntity):
     """Pod Point Entity"""
 
+    # Coordinator tiers this entity reads from, it only updates when one is refreshed
+    _data_tiers = POD_TIERS
+    # Tiers its state needs, the coordinator skips fetching those no entity needs
+    _required_tiers = frozenset([TIER_PODS, TIER_CONNECTIVITY])
+
     def __init__(
         self,
         coordinator: PodPointDataUpdateCoordinator,
         config_entry: ConfigEntry,
-        idx: int,
+        unit_id: int,
     ):
         super().__init__(coordinator)
-        self.pod_id = idx
+        self.pod_unit_id = unit_id
         self.config_entry = config_entry
         self.extra_attrs = {}
+        self._last_available = None
+        self._last_data_age = None
+        self._last_fingerprint = None
 
         self.__update_attrs()
 
     def __update_attrs(self):
-        pod: Pod = self.pod
-
-        attrs = {
-            "attribution": ATTRIBUTION,
-            "id": pod.id,
-            "integration": DOMAIN,
-            "suggested_area": "Outside",
-            "total_kwh": pod.total_kwh,
-            "total_charge_seconds": pod.total_charge_seconds,
-            "current_kwh": pod.current_kwh,
-            "charge_mode": pod.charge_mode,
-        }
-
-        attrs.update(pod.dict)
-
-        state = None
-        for status in pod.statuses:
-            state = self.compare_state(state, status.key_name)
-
-        is_available_state = (state == ATTR_STATE_AVAILABLE) or (
-            state == ATTR_STATE_IDLE
-        )
-        is_charging_state = state == ATTR_STATE_CHARGING
-        is_override_charge_mode = pod.charge_mode == ChargeMode.OVERRIDE
-        is_manual_charge_mode = pod.charge_mode == ChargeMode.MANUAL
-        charging_not_allowed = self.charging_allowed is False
-        should_be_waiting_state = is_available_state and charging_not_allowed
-        should_be_connected_waiting_state = is_charging_state and charging_not_allowed
-        should_be_available = is_available_state and (
-            is_override_charge_mode or is_manual_charge_mode
+        view_model: PodViewModel = self.view_model
+
+        self._attr_state = view_model.state
+        self.extra_attrs = view_model.attributes
+
+    async def async_added_to_hass(self) -> None:
+        """Register the data we need, and retire this entity when its pod leaves
+        the account"""
+        await super().async_added_to_hass()
+        self._last_fingerprint = self._render_fingerprint()
+        self.async_on_remove(
+            self.coordinator.async_add_tier_demand(self._required_tiers)
         )
-        should_be_charging = is_charging_state and (
-            is_override_charge_mode or is_manual_charge_mode
-        )
-        should_be_suspended_ev = is_charging_state and (
-            pod.charging_state == ATTR_STATE_SUSPENDED_EV
-        )
-        should_be_suspended_evse = is_charging_state and (
-            pod.charging_state == ATTR_STATE_SUSPENDED_EVSE
-        )
-        should_be_pending = (
-            self.coordinator.last_message_at is not None
-            and self.pod.last_message_at is not None
-            and self.coordinator.last_message_at > self.pod.last_message_at
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_PODS_REMOVED.format(self.config_entry.entry_id),
+                self._async_pods_removed,
+            )
         )
 
-        if should_be_waiting_state:
-            state = ATTR_STATE_WAITING
-
-        if should_be_connected_waiting_state:
-            state = ATTR_STATE_CONNECTED_WAITING
+    @callback
+    def _async_pods_removed(self, unit_ids: Set[int]) -> None:
+        if self.pod_unit_id not in unit_ids:
+            return
+
+        _LOGGER.debug(
+            "=== POD REMOVED ===\nUnit: %s\nEntity: %s",
+            self.pod_unit_id,
+            self.entity_id,
+        )
+        if self.registry_entry is None:
+            self.hass.async_create_task(self.async_remove(force_remove=True))
+            return
+
+        # Taking the pod's device off the config entry removes it, along with the
+        # entities of the pod. The first of them to get here does it for the rest.
+        device_registry = dr.async_get(self.hass)
+        device_id = self.registry_entry.device_id
+        if device_id is not None and device_registry.async_get(device_id) is not None:
+            device_registry.async_update_device(
+                device_id, remove_config_entry_id=self.config_entry.entry_id
+            )
 
-        # Pod should be available if pod is available and state is overriden, or manual charge mode
-        if should_be_available:
-            state = ATTR_STATE_AVAILABLE
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        if not self._should_handle_update():
+            return
 
-        # Pod should be charging if pod is charging and state is overriden, or manual charge mode
-        if should_be_charging:
-            state = ATTR_STATE_CHARGING
+        self.__update_attrs()
+        self.async_write_ha_state()
 
-        # Pod should be suspended evse if pod is charging and connectivity status is suspended evse
-        if should_be_suspended_evse:
-            state = ATTR_STATE_SUSPENDED_EVSE
+    def _should_handle_update(self) -> bool:
+        """Has availability or the age of the data shown changed, or has data this
+        entity reads been refreshed and changed what it renders since our state was
+        last written?"""
+        typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
+        if self.pod_unit_id not in typed_coordinator.pod_registry:
+            # The pod has gone from the account, leave its last state in place
+            typed_coordinator.record_state_write(False)
+            return False
 
-        # Pod should be suspended ev if pod is charging and connectivity status is suspended ev
-        if should_be_suspended_ev:
-            state = ATTR_STATE_SUSPENDED_EV
+        available = self.available
+        availability_changed = available != self._last_available
+        self._last_available = available
 
-        # Should this pod be pending?
-        if should_be_pending:
-            state = ATTR_STATE_PENDING
+        data_age = self.view_model.data_age
+        data_age_changed = data_age != self._last_data_age
+        self._last_data_age = data_age
 
-        attrs[ATTR_STATE] = state
+        handle = availability_changed or data_age_changed
+        fingerprint = None
+        if handle or (
+            typed_coordinator.tiers_refreshed(self._data_tiers)
+            and self.pod_unit_id in typed_coordinator.changed_unit_ids
+        ):
+            # The pod changed, though maybe not in anything this entity renders
+            fingerprint = self._render_fingerprint()
+            handle = handle or fingerprint != self._last_fingerprint
 
-        self._attr_state = state
+        if handle:
+            self._last_fingerprint = fingerprint
 
-        self.extra_attrs = attrs
+        typed_coordinator.record_state_write(handle)
+        return handle
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.__update_attrs()
-        self.async_write_ha_state()
+    def _render_fingerprint(self) -> Any:
+        """The inputs this entity renders its state and attributes from, it is
+        only written when these change. By default the whole view model, for the
+        entities showing all of the pod's attributes"""
+        return self.view_model
 
     @property
     def pod(self) -> Pod:
         """Return the underlying pod that drives this entity"""
-        pod: Pod = self.coordinator.data[self.pod_id]
+        pod: Pod = self.coordinator.pod_registry[self.pod_unit_id]
         return pod
 
+    @property
+    def view_model(self) -> PodViewModel:
+        """Return what this entity displays, resolved by the coordinator"""
+        view_model: PodViewModel = self.coordinator.view_models[self.pod_unit_id]
+        return view_model
+
     @property
     def unique_id(self):
         """Return a unique ID to use for this entity."""
@@ -151,8 +198,13 @@ class PodPointEntity(CoordinatorEntity):
 
     @property
     def available(self) -> bool:
+        """Unavailable while the pod is missing from the account, before it is
+        retired"""
         typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
-        return typed_coordinator.online is True
+        return (
+            typed_coordinator.data_available
+            and self.pod_unit_id not in typed_coordinator.missing_pods
+        )
 
     @property
     def device_info(self) -> Dict[str, Any]:
@@ -180,88 +232,12 @@ class PodPointEntity(CoordinatorEntity):
     @property
     def charging_allowed(self) -> bool:
         """Is charging allowed by schedule?"""
-        pod: Pod = self.coordinator.data[self.pod_id]
-        schedules: List[Schedule] = pod.charge_schedules
-        override: ChargeOverride = pod.charge_override
-
-        # Are we in 'manual' mode?
-        if pod.charge_mode == ChargeMode.MANUAL:
-            return True
-
-        # No schedules are found, we will assume we can charge
-        if len(schedules) <= 0:
-            return True
-
-        # If there is a charge override in place, we can charge
-        if override is not None and override.active:
-            return True
-
-        weekday = datetime.today().weekday() + 1
-        schedule_for_day: Schedule = next(
-            (schedule for schedule in schedules if schedule.start_day == weekday),
-            None,
-        )
-
-        # If no schedule is set for our day, return False early, there should always be a
-        # schedule for each day, even if it is inactive
-        if schedule_for_day is None:
-            return False
-
-        schedule_active = schedule_for_day.is_active
-
-        # If schedule_active is None, there was a problem. we will return False
-        if schedule_active is None:
-            return False
-
-        # If the schedule for this day is not active, we can charge
-        if schedule_active is False:
-            return True
-
-        def to_int(stringy_int):
-            return int(stringy_int)
-
-        start_time = list(map(to_int, schedule_for_day.start_time.split(":")))
-        start_date = datetime.now().replace(
-            hour=start_time[0], minute=start_time[1], second=start_time[2]
-        )
-
-        end_time = list(map(to_int, schedule_for_day.end_time.split(":")))
-        end_day = schedule_for_day.end_day
-        end_date = None
-        if end_day < weekday:
-            # roll into next week
-            end_time = end_date = datetime.now().replace(
-                hour=end_time[0], minute=end_time[1], second=end_time[2]
-            )
-
-            # How many days do we add to the current date to get to the desired end day?
-            day_offset = (7 - weekday) + (end_day - 1)
-            end_date = end_time + timedelta(days=day_offset)
-        elif end_day > weekday:
-            day_offset = end_day - weekday
-
-            end_time = end_date = datetime.now().replace(
-                hour=end_time[0], minute=end_time[1], second=end_time[2]
-            )
-            end_date = end_time + timedelta(days=day_offset)
-        else:
-            end_date = datetime.now().replace(
-                hour=end_time[0], minute=end_time[1], second=end_time[2]
-            )
-
-        # Problem creating the end_date, so we will exit with False
-        if end_date is None:
-            return False
-
-        in_range = start_date <= datetime.now() <= end_date
-
-        # Are we within the range for today?
-        return in_range
+        return self.view_model.charging_allowed
 
     @property
     def unit_id(self) -> int:
         """Return the unit id - used for schedule updates"""
-        return self.pod.unit_id
+        return self.pod_unit_id
 
     @property
     def psl(self) -> str:
@@ -301,43 +277,12 @@ class PodPointEntity(CoordinatorEntity):
     @property
     def connected(self) -> bool:
         """Returns true if pod is connected to a vehicle"""
-        status = self.extra_state_attributes.get(ATTR_STATE, "")
-        return status in (
-            CHARGING_FLAG,
-            ATTR_STATE_CONNECTED_WAITING,
-            ATTR_STATE_SUSPENDED_EV,
-            ATTR_STATE_SUSPENDED_EVSE,
-        )
+        return self.view_model.connected
 
     @staticmethod
     def compare_state(state, pod_state) -> str:
         """Given two states, which one is most important"""
-        ranking = ATTR_STATE_RANKING
-
-        state_sanitized = state.lower().replace("_", "-") if state is not None else None
-        pod_state_sanitized = (
-            pod_state.lower().replace("_", "-") if pod_state is not None else None
-        )
-
-        # If pod state is None, but state is set, return the state
-        if pod_state_sanitized is None and state_sanitized is not None:
-            return state_sanitized
-
-        if state_sanitized is None and pod_state_sanitized is not None:
-            return pod_state_sanitized
-
-        try:
-            state_rank = ranking.index(state_sanitized)
-        except ValueError:
-            state_rank = 100
-
-        try:
-            pod_rank = ranking.index(pod_state_sanitized)
-        except ValueError:
-            pod_rank = 100
-
-        winner = state_sanitized if state_rank >= pod_rank else pod_state_sanitized
-        return winner
+        return compare_state(state, pod_state)
 
     def __pod_image(self, model: str) -> str:
         if model is None:
@@ -0,0 +1,197 @@
+"""Request rate limiting shared by everything that calls Pod Point for an account"""
+
+import asyncio
+from collections import deque
+from functools import wraps
+import logging
+import time
+from typing import Any, Callable, Deque, List
+
+from homeassistant.core import HomeAssistant
+from podpointclient.charge import Charge
+from podpointclient.client import PodPointClient
+from podpointclient.errors import ApiConnectionError
+
+from .call_timeout import CallTimeout
+from .const import (
+    DOMAIN,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_BURST_PER_POD,
+    RATE_LIMIT_HOURLY_BUDGET,
+    RATE_LIMIT_HOURLY_BUDGET_PER_POD,
+    RATE_LIMIT_LOW_BUDGET,
+    RATE_LIMIT_MAX_STRETCH,
+    RATE_LIMIT_PER_SECOND,
+    RATE_LIMIT_SWEEP,
+)
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+DATA_RATE_LIMITERS = f"{DOMAIN}_rate_limiters"
+HOUR = 60 * 60
+
+
+class RequestBudgetExhausted(ApiConnectionError):
+    """The hourly request budget has been used up"""
+
+    def __init__(self, budget: int):
+        super().__init__(f"Hourly budget of {budget} requests used up")
+
+
+class RateLimiter:
+    """A token bucket, refilled at `rate` requests a second up to `burst`, along
+    with a budget of requests over the last hour. Requests wait for a token, but
+    fail once the budget is used up. The limits given are for an account with no
+    pods, `scale` grows them with the pods on the account."""
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_PER_SECOND,
+        burst: int = RATE_LIMIT_BURST,
+        hourly_budget: int = RATE_LIMIT_HOURLY_BUDGET,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = self.base_rate = rate
+        self.burst = self.base_burst = burst
+        self.hourly_budget = self.base_hourly_budget = hourly_budget
+        self.pod_count = 0
+        self._clock = clock
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._requests: Deque[float] = deque()  # When each request in the hour was made
+        self._lock = asyncio.Lock()
+
+        # Requests that had to wait for a token, for how long, and requests refused
+        self.throttle_events = 0
+        self.throttled_seconds = 0.0
+        self.rejected_requests = 0
+
+    @property
+    def remaining_budget(self) -> int:
+        """Requests left in the hourly budget"""
+        self.__expire(self._clock())
+        return max(0, self.hourly_budget - len(self._requests))
+
+    @property
+    def seconds_until_budget(self) -> float:
+        """Seconds until a request can be made within the budget, 0 unless it is
+        used up"""
+        now = self._clock()
+        self.__expire(now)
+        excess = len(self._requests) - self.hourly_budget
+        if excess < 0:
+            return 0.0
+        return max(0.0, self._requests[excess] + HOUR - now)
+
+    @property
+    def budget_stretch(self) -> float:
+        """How much polling should be stretched to make the budget last. Polling is
+        untouched until the budget runs low, then stretched as it runs out."""
+        remaining = self.remaining_budget / self.hourly_budget
+        if remaining >= RATE_LIMIT_LOW_BUDGET:
+            return 1.0
+
+        floor = RATE_LIMIT_LOW_BUDGET / RATE_LIMIT_MAX_STRETCH
+        return RATE_LIMIT_LOW_BUDGET / max(remaining, floor)
+
+    def scale(self, pod_count: int) -> None:
+        """Grow the limits with the pods on the account, so every pod can be polled
+        in one go and often enough without running out of budget"""
+        if pod_count == self.pod_count:
+            return
+
+        burst = self.base_burst + RATE_LIMIT_BURST_PER_POD * pod_count
+        self.__refill(self._clock())
+        self._tokens = min(float(burst), self._tokens + max(0, burst - self.burst))
+
+        self.pod_count = pod_count
+        self.burst = burst
+        self.rate = self.base_rate + pod_count / RATE_LIMIT_SWEEP
+        self.hourly_budget = (
+            self.base_hourly_budget + RATE_LIMIT_HOURLY_BUDGET_PER_POD * pod_count
+        )
+        _LOGGER.debug(
+            "=== RATE LIMIT ===\nPods: %s\nRate: %.2f/s\nBurst: %s\nHourly budget: %s",
+            pod_count,
+            self.rate,
+            self.burst,
+            self.hourly_budget,
+        )
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be made, requests are let through in order"""
+        async with self._lock:
+            now = self._clock()
+            self.__expire(now)
+            if len(self._requests) >= self.hourly_budget:
+                self.rejected_requests += 1
+                raise RequestBudgetExhausted(self.hourly_budget)
+
+            self.__refill(now)
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.throttle_events += 1
+                self.throttled_seconds += wait
+                _LOGGER.debug("Throttling Pod Point request for %.3fs", wait)
+
+                await asyncio.sleep(wait)
+                self.__refill(self._clock())
+
+            self._tokens -= 1
+            self._requests.append(self._clock())
+
+    def __refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._refilled_at = now
+
+    def __expire(self, now: float) -> None:
+        while len(self._requests) > 0 and now - self._requests[0] >= HOUR:
+            self._requests.popleft()
+
+
+class RateLimitedClient:
+    """Stands in for a `PodPointClient`, each of its `async_` calls waits on the
+    limiter first. The wait does not count against the call's timeout. Paginated
+    calls are paged here, so every page is a request against the limiter."""
+
+    def __init__(self, client: PodPointClient, limiter: RateLimiter) -> None:
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.client, name)
+        if not name.startswith("async_") or not callable(attribute):
+            return attribute
+
+        @wraps(attribute)
+        async def limited(*args, **kwargs):
+            call_timeout = CallTimeout.current()
+            if call_timeout is not None:
+                call_timeout.pause()
+            await self.limiter.async_acquire()
+            if call_timeout is not None:
+                call_timeout.resume()
+            return await attribute(*args, **kwargs)
+
+        return limited
+
+    async def async_get_all_charges(self, perpage: int = 50) -> List[Charge]:
+        """Every charge, each page waiting on the limiter as a request of its own"""
+        page = 1
+        charges: List[Charge] = []
+
+        more_charges = True
+        while more_charges:
+            new_charges = await self.async_get_charges(perpage=perpage, page=page)
+            more_charges = len(new_charges) >= perpage
+            charges.extend(new_charges)
+            page += 1
+
+        return charges
+
+
+def get_rate_limiter(hass: HomeAssistant, email: str) -> RateLimiter:
+    """The limiter for an account, shared by its config entry and config flows"""
+    limiters = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    return limiters.setdefault(email.lower(), RateLimiter())
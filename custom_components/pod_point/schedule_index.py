@@ -0,0 +1,127 @@
+"""Weekly index of when a pod's charge schedules allow charging"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from podpointclient.schedule import Schedule
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+
+ScheduleKey = Tuple[Tuple[int, str, int, str, Optional[bool]], ...]
+
+
+def _seconds(time_string: str) -> int:
+    hours, minutes, seconds = (int(part) for part in time_string.split(":"))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def week_seconds(moment: datetime) -> int:
+    """Seconds since the start of the week (Monday 00:00:00) containing `moment`"""
+    return (
+        moment.weekday() * DAY + moment.hour * 3600 + moment.minute * 60 + moment.second
+    )
+
+
+class ScheduleIndex:
+    """Segments of the week, each either allowing or blocking charging. Segment
+    starts are held in order so the segment for a moment is found with a bisect"""
+
+    def __init__(self, starts: List[int], allowed: List[bool]) -> None:
+        self.starts = starts  # Seconds into the week, the first is always 0
+        self.allowed = allowed
+
+    def allowed_at(self, moment: datetime) -> bool:
+        """Do the schedules allow charging at `moment`?"""
+        return self.allowed[bisect_right(self.starts, week_seconds(moment)) - 1]
+
+    def next_transition(self, moment: datetime) -> Optional[datetime]:
+        """When, after `moment`, charging next becomes allowed or blocked. None if
+        it never changes"""
+        if len(self.starts) <= 1:
+            return None
+
+        now = week_seconds(moment)
+        index = bisect_right(self.starts, now)
+
+        # Segments are merged, so the next segment always has the other verdict.
+        # The last segment may share its verdict with the first, across the week.
+        if index < len(self.starts):
+            seconds = self.starts[index] - now
+        elif self.allowed[-1] != self.allowed[0]:
+            seconds = WEEK - now
+        else:
+            seconds = WEEK - now + self.starts[1]
+
+        return moment.replace(microsecond=0) + timedelta(seconds=seconds)
+
+
+def schedule_key(schedules: Iterable[Schedule]) -> ScheduleKey:
+    """The fields of the schedules that decide when charging is allowed"""
+    return tuple(
+        (
+            schedule.start_day,
+            schedule.start_time,
+            schedule.end_day,
+            schedule.end_time,
+            schedule.is_active,
+        )
+        for schedule in schedules
+    )
+
+
+def compile_schedules(schedules: Iterable[Schedule]) -> ScheduleIndex:
+    """Return the index for a pod's schedules, only compiled when they change"""
+    return _compile(schedule_key(schedules))
+
+
+@lru_cache(maxsize=32)
+def _compile(key: ScheduleKey) -> ScheduleIndex:
+    """Each day is decided by the schedule starting on it. A day without one blocks
+    charging, a day whose schedule is inactive allows it, otherwise charging is
+    allowed from the schedule's start until its end or the end of the day"""
+    starts: List[int] = []
+    allowed: List[bool] = []
+
+    def add(start: int, verdict: bool) -> None:
+        if len(allowed) > 0 and allowed[-1] == verdict:
+            return
+        if len(starts) > 0 and starts[-1] == start:
+            starts.pop()
+            allowed.pop()
+            add(start, verdict)
+            return
+        starts.append(start)
+        allowed.append(verdict)
+
+    for weekday in range(1, 8):
+        day_start = (weekday - 1) * DAY
+        schedule = next((entry for entry in key if entry[0] == weekday), None)
+
+        if schedule is None or schedule[4] is None:
+            add(day_start, False)
+            continue
+
+        _, start_time, end_day, end_time, is_active = schedule
+        if is_active is False:
+            add(day_start, True)
+            continue
+
+        start = day_start + _seconds(start_time)
+        # End times are inclusive, ends on a later (or wrapped) day run to midnight
+        end = day_start + _seconds(end_time) + 1 if end_day == weekday else None
+        end = min(end, day_start + DAY) if end is not None else day_start + DAY
+
+        add(day_start, False)
+        if start < end:
+            add(start, True)
+            add(end, False)
+
+    # The week ends where it starts
+    if len(starts) > 1 and starts[-1] == WEEK:
+        starts.pop()
+        allowed.pop()
+
+    return ScheduleIndex(starts, allowed)
@@ -17,7 +17,6 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from podpointclient.charge_mode import ChargeMode
 from podpointclient.charge_override import ChargeOverride
 from podpointclient.connectivity_status import Evse
-from podpointclient.pod import Pod
 from podpointclient.user import User
 
 from .const import (
@@ -39,9 +38,15 @@ from .const import (
     ICON,
     ICON_1C,
     ICON_2C,
+    TIER_CHARGES,
+    TIER_CONNECTIVITY,
+    TIER_PODS,
+    TIER_USER,
 )
 from .coordinator import PodPointDataUpdateCoordinator
-from .entity import PodPointEntity
+from .entity import PodPointEntity, async_track_pods
+from .rate_limiter import RateLimiter
+from .view_model import PodViewModel
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -49,37 +54,33 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 async def async_setup_entry(hass, entry, async_add_devices):
     """Setup sensor platform."""
     coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    # Handle coordinator offline on boot - no data will be populated
-    if coordinator.online is False:
+    # Handle coordinator offline on boot without a snapshot - no data will be populated
+    if coordinator.data is None:
         return
 
-    sensors = []
-
-    for i in range(len(coordinator.data)):
-        pps = PodPointSensor(coordinator, entry, i)
-        ppcts = PodPointChargeTimeSensor(coordinator, entry, i)
-        pptes = PodPointTotalEnergySensor(coordinator, entry, i)
-        ppces = PodPointCurrentEnergySensor(coordinator, entry, i)
-        ppsss = PodPointSignalStrengthSensor(coordinator, entry, i)
-        pplmrs = PodPointLastMessageReceivedSensor(coordinator, entry, i)
-        pptcs = PodPointTotalCostSensor(coordinator, entry, i)
-        pplcccs = PodPointLastCompleteChargeCostSensor(coordinator, entry, i)
-        charge_mode = PodPointChargeModeEntity(coordinator, entry, i)
-        charge_override = PodPointChargeOverrideEntity(coordinator, entry, i)
-        balance = PodPointAccountBalanceEntity(coordinator, entry)
-
-        sensors.append(pps)
-        sensors.append(ppcts)
-        sensors.append(pptes)
-        sensors.append(ppces)
-        sensors.append(ppsss)
-        sensors.append(pplmrs)
-        sensors.append(pptcs)
-        sensors.append(pplcccs)
-        sensors.append(charge_mode)
-        sensors.append(charge_override)
-
-        sensors.append(balance)
+    def create_sensors(unit_id: int):
+        return [
+            PodPointSensor(coordinator, entry, unit_id),
+            PodPointChargeTimeSensor(coordinator, entry, unit_id),
+            PodPointTotalEnergySensor(coordinator, entry, unit_id),
+            PodPointCurrentEnergySensor(coordinator, entry, unit_id),
+            PodPointSignalStrengthSensor(coordinator, entry, unit_id),
+            PodPointLastMessageReceivedSensor(coordinator, entry, unit_id),
+            PodPointTotalCostSensor(coordinator, entry, unit_id),
+            PodPointLastCompleteChargeCostSensor(coordinator, entry, unit_id),
+            PodPointChargeModeEntity(coordinator, entry, unit_id),
+            PodPointChargeOverrideEntity(coordinator, entry, unit_id),
+        ]
+
+    sensors = async_track_pods(hass, entry, async_add_devices, create_sensors)
+
+    # The balance belongs to the account, not any one pod
+    sensors.append(PodPointAccountBalanceEntity(coordinator, entry))
+
+    # The account's request rate limiter, when its calls are limited
+    if coordinator.rate_limiter is not None:
+        sensors.append(PodPointRequestBudgetSensor(coordinator, entry))
+        sensors.append(PodPointThrottledRequestsSensor(coordinator, entry))
 
     async_add_devices(sensors)
 
@@ -144,6 +145,8 @@ class PodPointChargeTimeSensor(
 ):
     """pod_point Sensor class."""
 
+    _data_tiers = frozenset([TIER_CHARGES])
+    _required_tiers = frozenset([TIER_CHARGES])
     _attr_has_entity_name = True
     _attr_name = "Completed Charge Time"
     _attr_device_class = SensorDeviceClass.DURATION
@@ -155,12 +158,17 @@ class PodPointChargeTimeSensor(
     def unique_id(self):
         return f"{super().unique_id}_charge_time"
 
+    def _render_fingerprint(self) -> Any:
+        return self.view_model.total_charge_seconds
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
+        total_charge_seconds = self.view_model.total_charge_seconds
+
         return {
-            "raw": self.pod.total_charge_seconds,
-            "formatted": str(timedelta(seconds=self.pod.total_charge_seconds)),
-            "long": self._td_format(timedelta(seconds=self.pod.total_charge_seconds)),
+            "raw": total_charge_seconds,
+            "formatted": str(timedelta(seconds=total_charge_seconds)),
+            "long": self._td_format(timedelta(seconds=total_charge_seconds)),
         }
 
     @property
@@ -179,31 +187,33 @@ class PodPointSignalStrengthSensor(
 ):
     """pod_point Signal Strength sensor class."""
 
+    _data_tiers = frozenset([TIER_CONNECTIVITY])
+    _required_tiers = frozenset([TIER_CONNECTIVITY])
     _attr_translation_key = "signal_strength"
     _attr_has_entity_name = True
     _attr_name = "Signal Strength"
     _attr_device_class = SensorDeviceClass.SIGNAL_STRENGTH
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    def __init__(self, coordinator, config_entry: ConfigEntry, idx: int):
-        super().__init__(coordinator, config_entry=config_entry, idx=idx)
+    def __init__(self, coordinator, config_entry: ConfigEntry, unit_id: int):
+        super().__init__(coordinator, config_entry=config_entry, unit_id=unit_id)
         self.__update_attrs()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._should_handle_update():
+            return
+
         self.__update_attrs()
         self.async_write_ha_state()
 
     def __update_attrs(self):
-        signal_strength = self.__signal_strength()
-        connection_quality = self.__connection_quality()
-
         attrs = {
             "attribution": ATTRIBUTION,
             "integration": DOMAIN,
-            "signal_strength": signal_strength,
-            "connection_quality": connection_quality,
+            "signal_strength": self.view_model.signal_strength,
+            "connection_quality": self.view_model.connection_quality,
         }
 
         self.extra_attrs = attrs
@@ -212,6 +222,9 @@ class PodPointSignalStrengthSensor(
     def unique_id(self):
         return f"{super().unique_id}_signal_strength"
 
+    def _render_fingerprint(self) -> Any:
+        return (self.view_model.signal_strength, self.view_model.connection_quality)
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         return self.extra_attrs
@@ -230,7 +243,7 @@ class PodPointSignalStrengthSensor(
         """Return the icon of the sensor."""
         icon = "mdi:wifi-strength-1"
 
-        connection_quality = self.__connection_quality()
+        connection_quality = self.view_model.connection_quality
 
         if 0 < connection_quality <= 4:
             icon = f"mdi:wifi-strength-{connection_quality}"
@@ -241,52 +254,6 @@ class PodPointSignalStrengthSensor(
     def entity_picture(self) -> str:
         return None
 
-    def __signal_strength(self) -> int:
-        has_connectivity_status = self.pod.connectivity_status is not None
-        has_evse = (
-            has_connectivity_status
-            and self.pod.connectivity_status.evses[0] is not None
-        )
-        has_connectivity_state = (
-            has_evse
-            and self.pod.connectivity_status.evses[0].connectivity_state is not None
-        )
-        has_signal_strength = (
-            has_connectivity_state
-            and self.pod.connectivity_status.evses[0].connectivity_state.signal_strength
-            is not None
-        )
-
-        return (
-            self.pod.connectivity_status.evses[0].connectivity_state.signal_strength
-            if has_signal_strength
-            else 0
-        )
-
-    def __connection_quality(self) -> int:
-        has_connectivity_status = self.pod.connectivity_status is not None
-        has_evse = (
-            has_connectivity_status
-            and self.pod.connectivity_status.evses[0] is not None
-        )
-        has_connectivity_state = (
-            has_evse
-            and self.pod.connectivity_status.evses[0].connectivity_state is not None
-        )
-        has_connection_quality = (
-            has_connectivity_state
-            and self.pod.connectivity_status.evses[
-                0
-            ].connectivity_state.connection_quality
-            is not None
-        )
-
-        return (
-            self.pod.connectivity_status.evses[0].connectivity_state.connection_quality
-            if has_connection_quality
-            else 0
-        )
-
 
 class PodPointLastMessageReceivedSensor(
     PodPointEntity,
@@ -294,19 +261,24 @@ class PodPointLastMessageReceivedSensor(
 ):
     """pod_point Last Message Received sensor class."""
 
+    _data_tiers = frozenset([TIER_CONNECTIVITY])
+    _required_tiers = frozenset([TIER_CONNECTIVITY])
     _attr_translation_key = "last_message_received"
     _attr_has_entity_name = True
     _attr_name = "Last Message Received"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-    def __init__(self, coordinator, config_entry: ConfigEntry, idx: int):
-        super().__init__(coordinator, config_entry=config_entry, idx=idx)
+    def __init__(self, coordinator, config_entry: ConfigEntry, unit_id: int):
+        super().__init__(coordinator, config_entry=config_entry, unit_id=unit_id)
         self.__update_attrs()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._should_handle_update():
+            return
+
         self.__update_attrs()
         self.async_write_ha_state()
 
@@ -323,6 +295,9 @@ class PodPointLastMessageReceivedSensor(
     def unique_id(self):
         return f"{super().unique_id}_last_message_at"
 
+    def _render_fingerprint(self) -> Any:
+        return self.pod.last_message_at
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         return self.extra_attrs
@@ -345,6 +320,8 @@ class PodPointTotalEnergySensor(PodPointSensor):
     """pod_point total energy Sensor class."""
 
     # Override the options from PodPointSensor, prevents an error as this sensor is an 'energy' type
+    _data_tiers = frozenset([TIER_CHARGES, TIER_CONNECTIVITY])
+    _required_tiers = frozenset([TIER_CHARGES])
     _attr_options = None
     _attr_translation_key = None
     _attr_has_entity_name = True
@@ -353,32 +330,35 @@ class PodPointTotalEnergySensor(PodPointSensor):
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
 
-    def __init__(self, coordinator, config_entry: ConfigEntry, idx: int):
-        super().__init__(coordinator, config_entry=config_entry, idx=idx)
-        self.previous_total = self.pod.total_kwh
+    def __init__(self, coordinator, config_entry: ConfigEntry, unit_id: int):
+        super().__init__(coordinator, config_entry=config_entry, unit_id=unit_id)
+        self.previous_total = self.view_model.total_kwh
         self.total_kwh_diff = self.previous_total
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        if not self._should_handle_update():
+            return
+
         self.__update_attrs()
         self.async_write_ha_state()
 
     def __update_attrs(self):
-        pod: Pod = self.pod
+        view_model: PodViewModel = self.view_model
 
-        new_total = self.pod.total_kwh
+        new_total = view_model.total_kwh
         self.total_kwh_diff = new_total - self.previous_total
         self.previous_total = new_total
 
         attrs = {
             "attribution": ATTRIBUTION,
-            "id": pod.id,
+            "id": self.pod.id,
             "integration": DOMAIN,
             "suggested_area": "Outside",
-            "total_kwh": pod.total_kwh,
+            "total_kwh": view_model.total_kwh,
             "total_kwh_difference": self.total_kwh_diff,
-            "current_kwh": pod.current_kwh,
+            "current_kwh": view_model.current_kwh,
         }
 
         self.extra_attrs = attrs
@@ -392,9 +372,13 @@ class PodPointTotalEnergySensor(PodPointSensor):
     def unique_id(self):
         return f"{super().unique_id}_total_energy"
 
+    def _render_fingerprint(self) -> Any:
+        view_model: PodViewModel = self.view_model
+        return (view_model.total_kwh, view_model.current_kwh, view_model.connected)
+
     @property
     def native_value(self) -> float:
-        return self.pod.total_kwh
+        return self.view_model.total_kwh
 
     @property
     def icon(self):
@@ -426,9 +410,14 @@ class PodPointCurrentEnergySensor(PodPointTotalEnergySensor):
     def unique_id(self):
         return f"{super().unique_id}_current_charge_energy"
 
+    def _render_fingerprint(self) -> Any:
+        # The last reset follows the most recent charge
+        latest_start = self.pod.charges[0].starts_at if self.pod.charges else None
+        return (super()._render_fingerprint(), latest_start)
+
     @property
     def native_value(self) -> float:
-        return self.pod.current_kwh
+        return self.view_model.current_kwh
 
     @property
     def last_reset(self) -> datetime:
@@ -455,6 +444,8 @@ class PodPointChargeModeEntity(
 ):
     """pod_point charge mode sensor class."""
 
+    _data_tiers = frozenset([TIER_PODS, TIER_CONNECTIVITY])
+    _required_tiers = frozenset([TIER_PODS])
     _attr_options = [ChargeMode.MANUAL, ChargeMode.SMART, ChargeMode.OVERRIDE]
     _attr_has_entity_name = True
     _attr_name = "Charge Mode"
@@ -465,13 +456,12 @@ class PodPointChargeModeEntity(
     def unique_id(self):
         return f"{super().unique_id}_charge_mode"
 
+    def _render_fingerprint(self) -> Any:
+        return (self.pod.charge_mode, self.view_model.charge_override)
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        charge_override = None
-        if self.pod.charge_override is not None:
-            charge_override = self.pod.charge_override.dict
-
-        return {"charge_override": charge_override}
+        return {"charge_override": self.view_model.charge_override}
 
     @property
     def native_value(self):
@@ -489,6 +479,8 @@ class PodPointChargeOverrideEntity(
 ):
     """pod_point charge mode sensor class."""
 
+    _data_tiers = frozenset([TIER_PODS, TIER_CONNECTIVITY])
+    _required_tiers = frozenset([TIER_PODS])
     _attr_has_entity_name = True
     _attr_name = "Charge Override End Time"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
@@ -498,13 +490,12 @@ class PodPointChargeOverrideEntity(
     def unique_id(self):
         return f"{super().unique_id}_override_end_time"
 
+    def _render_fingerprint(self) -> Any:
+        return (self.pod.charge_mode, self.view_model.charge_override)
+
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        charge_override = None
-        if self.pod.charge_override is not None:
-            charge_override = self.pod.charge_override.dict
-
-        return {"charge_override": charge_override}
+        return {"charge_override": self.view_model.charge_override}
 
     @property
     def native_value(self):
@@ -528,6 +519,8 @@ class PodPointTotalCostSensor(
 ):
     """pod_point total cost sensor class."""
 
+    _data_tiers = frozenset([TIER_CHARGES])
+    _required_tiers = frozenset([TIER_CHARGES])
     _attr_has_entity_name = True
     _attr_name = "Total Cost"
     _attr_device_class = SensorDeviceClass.MONETARY
@@ -537,6 +530,9 @@ class PodPointTotalCostSensor(
     def unique_id(self):
         return f"{super().unique_id}_total_cost"
 
+    def _render_fingerprint(self) -> Any:
+        return (self.view_model.total_cost, self.currency)
+
     @property
     def currency(self) -> str:
         """Which currency type are we returning?"""
@@ -551,10 +547,11 @@ class PodPointTotalCostSensor(
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
-        cost_as_pounds = self.pod.total_cost / 100
+        total_cost = self.view_model.total_cost
+        cost_as_pounds = total_cost / 100
 
         return {
-            "raw": self.pod.total_cost,
+            "raw": total_cost,
             "amount": cost_as_pounds,
             "currency": self.currency,
             "formatted": f"{cost_as_pounds} {self.currency}",
@@ -581,6 +578,8 @@ class PodPointLastCompleteChargeCostSensor(
 ):
     """pod_point cost of last complete charge sensor class."""
 
+    _data_tiers = frozenset([TIER_CHARGES])
+    _required_tiers = frozenset([TIER_CHARGES])
     _attr_has_entity_name = True
     _attr_name = "Last Completed Charge Cost"
     _attr_device_class = SensorDeviceClass.MONETARY
@@ -590,6 +589,9 @@ class PodPointLastCompleteChargeCostSensor(
     def unique_id(self):
         return f"{super().unique_id}_last_complete_charge_cost"
 
+    def _render_fingerprint(self) -> Any:
+        return (self.view_model.last_charge_cost, self.currency)
+
     @property
     def currency(self) -> str:
         """Which currency type are we returning?"""
@@ -606,8 +608,8 @@ class PodPointLastCompleteChargeCostSensor(
         raw = 0
         cost_as_pounds = 0.0
 
-        if getattr(self.pod, "last_charge_cost", None) is not None:
-            raw = getattr(self.pod, "last_charge_cost", None)
+        if self.view_model.last_charge_cost is not None:
+            raw = self.view_model.last_charge_cost
             cost_as_pounds = raw / 100
 
         return {
@@ -641,6 +643,13 @@ class PodPointAccountBalanceEntity(CoordinatorEntity, SensorEntity):
     _attr_name = "Pod Point Balance"
     _attr_icon = "mdi:account-cash"
     _attr_available = False
+    _data_tiers = frozenset([TIER_USER])
+    _last_available = None
+
+    async def async_added_to_hass(self) -> None:
+        """Register the user data we need with the coordinator"""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_add_tier_demand(self._data_tiers))
 
     @property
     def native_value(self):
@@ -667,7 +676,27 @@ class PodPointAccountBalanceEntity(CoordinatorEntity, SensorEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        available = self.available
+        availability_changed = available != self._last_available
+        self._last_available = available
+
+        typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
+        if not (
+            availability_changed or typed_coordinator.tiers_refreshed(self._data_tiers)
+        ):
+            typed_coordinator.record_state_write(False)
+            return
+
+        # The balance is one of the user attributes, skip the write if none changed
+        previous_attrs = getattr(self, "_attr_extra_state_attributes", None)
         self.__update_attrs()
+        if not availability_changed and self._attr_extra_state_attributes == (
+            previous_attrs
+        ):
+            typed_coordinator.record_state_write(False)
+            return
+
+        typed_coordinator.record_state_write(True)
         self.async_write_ha_state()
 
     @property
@@ -699,4 +728,77 @@ class PodPointAccountBalanceEntity(CoordinatorEntity, SensorEntity):
     @property
     def available(self) -> bool:
         typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
-        return typed_coordinator.online is True
+        return typed_coordinator.data_available
+
+
+class PodPointRateLimitSensor(CoordinatorEntity, SensorEntity):
+    """Diagnostic sensor for the account's request rate limiter"""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _unique_id_suffix: str = None
+
+    def __init__(self, coordinator, config_entry: ConfigEntry):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{config_entry.entry_id}_{self._unique_id_suffix}"
+        self._last_value = None
+
+    @property
+    def limiter(self) -> RateLimiter:
+        """Return the limiter shared by the account's calls"""
+        typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
+        return typed_coordinator.rate_limiter
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state when the value has changed"""
+        typed_coordinator: PodPointDataUpdateCoordinator = self.coordinator
+        value = self.native_value
+        if value == self._last_value:
+            typed_coordinator.record_state_write(False)
+            return
+
+        self._last_value = value
+        typed_coordinator.record_state_write(True)
+        self.async_write_ha_state()
+
+
+class PodPointRequestBudgetSensor(PodPointRateLimitSensor):
+    """Requests left in the account's hourly budget"""
+
+    _attr_name = "Request Budget Remaining"
+    _attr_icon = "mdi:counter"
+    _attr_native_unit_of_measurement = "requests"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unique_id_suffix = "request_budget"
+
+    @property
+    def native_value(self) -> int:
+        return self.limiter.remaining_budget
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        return {
+            "hourly_budget": self.limiter.hourly_budget,
+            "polling_stretch": self.limiter.budget_stretch,
+        }
+
+
+class PodPointThrottledRequestsSensor(PodPointRateLimitSensor):
+    """Requests that had to wait for the rate limiter"""
+
+    _attr_name = "Throttled Requests"
+    _attr_icon = "mdi:speedometer-slow"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _unique_id_suffix = "throttled_requests"
+
+    @property
+    def native_value(self) -> int:
+        return self.limiter.throttle_events
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        return {
+            "throttled_seconds": round(self.limiter.throttled_seconds, 3),
+            "rejected_requests": self.limiter.rejected_requests,
+        }
@@ -1,6 +1,6 @@
 """Services for the Pod Point integration."""
 
-from datetime import datetime
+from functools import partial
 import logging
 from typing import List
 
@@ -8,9 +8,10 @@ from homeassistant.core import HomeAssistant, ServiceCall
 import homeassistant.helpers.config_validation as cv
 from podpointclient.client import PodPointClient
 from podpointclient.pod import Pod
-import pytz
 import voluptuous as vol
 
+from .command_queue import COMMAND_CHARGE_OVERRIDE
+from .commands import set_charge_override
 from .const import (
     ATTR_CONFIG_ENTRY_ID,
     ATTR_HOURS,
@@ -125,12 +126,20 @@ async def handle_charge_now(
             "Please pass an hours, minutes or seconds value. Cannot set 'charge now' with 0 values."
         )
 
-    await api.async_set_charge_override(
-        pod=pod, hours=hours, minutes=minutes, seconds=seconds
+    charge_override = await coordinator.command_queue.async_send(
+        pod.unit_id,
+        COMMAND_CHARGE_OVERRIDE,
+        (hours, minutes, seconds),
+        partial(
+            api.async_set_charge_override,
+            pod=pod,
+            hours=hours,
+            minutes=minutes,
+            seconds=seconds,
+        ),
     )
 
-    coordinator.last_message_at = datetime.now(pytz.UTC)
-    await coordinator.async_request_refresh()
+    coordinator.async_command_sent(pod, set_charge_override(charge_override))
 
 
 async def handle_stop_charge_now(
@@ -147,7 +156,11 @@ async def handle_stop_charge_now(
             f"Service only supports accounts with 1 Pod attached, found {len(pods)} Pods!"
         )
 
-    await api.async_delete_charge_override(pod=pod)
+    await coordinator.command_queue.async_send(
+        pod.unit_id,
+        COMMAND_CHARGE_OVERRIDE,
+        None,
+        partial(api.async_delete_charge_override, pod=pod),
+    )
 
-    coordinator.last_message_at = datetime.now(pytz.UTC)
-    await coordinator.async_request_refresh()
+    coordinator.async_command_sent(pod, set_charge_override(None))
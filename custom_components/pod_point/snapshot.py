@@ -0,0 +1,123 @@
+"""Persistent snapshot of the pods and user, so entities can be created at startup
+before Pod Point has been reached"""
+
+from datetime import datetime
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from podpointclient.helpers.functions import (
+    lazy_convert_to_datetime,
+    lazy_iso_format_datetime,
+)
+from podpointclient.pod import Firmware, Pod
+from podpointclient.user import User
+
+from .const import SNAPSHOT_KEY, SNAPSHOT_SAVE_DELAY, SNAPSHOT_VERSION
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Pod fields that change from poll to poll, or are rebuilt from the charges, are not
+# worth keeping
+_TRANSIENT_POD_FIELDS = (
+    "total_kwh",
+    "total_charge_seconds",
+    "current_kwh",
+    "total_cost",
+    "offering_energy",
+    "last_message_at",
+    "charging_state",
+    "connectivity_status",
+)
+
+
+class _VersionedStore(Store):
+    """Store that discards data written with a different schema version. The
+    snapshot is replaced by the next refresh, so there is nothing to migrate."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict
+    ) -> Dict:
+        _LOGGER.debug(
+            "Discarding snapshot with schema version %s.%s",
+            old_major_version,
+            old_minor_version,
+        )
+        return {}
+
+
+class CoordinatorSnapshot:
+    """Persist the pods, with their firmware, model and price, and the user"""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = _VersionedStore(
+            hass, SNAPSHOT_VERSION, f"{SNAPSHOT_KEY}.{entry_id}"
+        )
+        self._pending: Callable[[], Dict[str, Any]] = None  # Save yet to be written
+
+    async def async_load(self) -> Tuple[datetime, List[Pod], User]:
+        """Load when the snapshot was fetched, its pods and user. No pods and no user
+        if nothing is saved"""
+        data = await self._store.async_load() or {}
+
+        pods: List[Pod] = []
+        for pod_data in data.get("pods", []):
+            pod = Pod(data=pod_data)
+            if pod_data.get("firmware") is not None:
+                pod.firmware = Firmware(data=pod_data["firmware"])
+            pods.append(pod)
+
+        user: User = None
+        if data.get("user") is not None:
+            user = User(data=data["user"])
+
+        return lazy_convert_to_datetime(data.get("fetched_at")), pods, user
+
+    def async_save(self, fetched_at: datetime, pods: Iterable[Pod], user: User) -> None:
+        """Schedule a write of the pods and user, writes are batched. They are read
+        when the write happens"""
+
+        def data() -> Dict[str, Any]:
+            self._pending = None
+            return self.__serialize(fetched_at, pods, user)
+
+        self._pending = data
+        self._store.async_delay_save(data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Write the scheduled save now, if it has not been written yet"""
+        if self._pending is not None:
+            await self._store.async_save(self._pending())
+
+    async def async_remove(self) -> None:
+        """Remove the snapshot from disk"""
+        await self._store.async_remove()
+
+    @staticmethod
+    def __serialize(
+        fetched_at: datetime, pods: Iterable[Pod], user: User
+    ) -> Dict[str, Any]:
+        """Stored in the same shape as the Pod Point API so they can be rebuilt with
+        `Pod(data=...)` and `User(data=...)`. The user's vehicle and unit are left
+        out as they do not read back."""
+        user_data = None
+        if user is not None:
+            user_data = {
+                key: value
+                for key, value in user.dict.items()
+                if key not in ("vehicle", "unit")
+            }
+
+        return {
+            "fetched_at": lazy_iso_format_datetime(fetched_at),
+            "pods": [
+                {
+                    key: value
+                    for key, value in pod.dict.items()
+                    if key not in _TRANSIENT_POD_FIELDS
+                }
+                for pod in pods
+            ],
+            "user": user_data,
+        }
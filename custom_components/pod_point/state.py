@@ -0,0 +1,152 @@
+"""Pod state resolution, shared by the entities and the coordinator"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from homeassistant.util import dt as dt_util
+
+from podpointclient.charge_mode import ChargeMode
+from podpointclient.charge_override import ChargeOverride
+from podpointclient.pod import Pod
+from podpointclient.schedule import Schedule
+
+from .const import (
+    ATTR_STATE_AVAILABLE,
+    ATTR_STATE_CHARGING,
+    ATTR_STATE_CONNECTED_WAITING,
+    ATTR_STATE_IDLE,
+    ATTR_STATE_PENDING,
+    ATTR_STATE_RANKING,
+    ATTR_STATE_SUSPENDED_EV,
+    ATTR_STATE_SUSPENDED_EVSE,
+    ATTR_STATE_WAITING,
+)
+from .schedule_index import compile_schedules
+
+
+def compare_state(state, pod_state) -> str:
+    """Given two states, which one is most important"""
+    ranking = ATTR_STATE_RANKING
+
+    state_sanitized = state.lower().replace("_", "-") if state is not None else None
+    pod_state_sanitized = (
+        pod_state.lower().replace("_", "-") if pod_state is not None else None
+    )
+
+    # If pod state is None, but state is set, return the state
+    if pod_state_sanitized is None and state_sanitized is not None:
+        return state_sanitized
+
+    if state_sanitized is None and pod_state_sanitized is not None:
+        return pod_state_sanitized
+
+    try:
+        state_rank = ranking.index(state_sanitized)
+    except ValueError:
+        state_rank = 100
+
+    try:
+        pod_rank = ranking.index(pod_state_sanitized)
+    except ValueError:
+        pod_rank = 100
+
+    winner = state_sanitized if state_rank >= pod_rank else pod_state_sanitized
+    return winner
+
+
+def charging_allowed(pod: Pod, now: datetime = None) -> bool:
+    """Is charging allowed by schedule?"""
+    schedules: List[Schedule] = pod.charge_schedules
+    override: ChargeOverride = pod.charge_override
+
+    # Are we in 'manual' mode?
+    if pod.charge_mode == ChargeMode.MANUAL:
+        return True
+
+    # No schedules are found, we will assume we can charge
+    if len(schedules) <= 0:
+        return True
+
+    # If there is a charge override in place, we can charge
+    if override is not None and override.active:
+        return True
+
+    return compile_schedules(schedules).allowed_at(now or dt_util.now())
+
+
+def next_charging_transition(pod: Pod, now: datetime = None) -> Optional[datetime]:
+    """When `charging_allowed` for the pod next changes without new data from Pod
+    Point, when a schedule starts or ends or an override runs out. None if never"""
+    if pod.charge_mode == ChargeMode.MANUAL or len(pod.charge_schedules) <= 0:
+        return None
+
+    now = now or dt_util.now()
+    override: ChargeOverride = pod.charge_override
+    if override is not None and override.active:
+        return override.ends_at
+
+    return compile_schedules(pod.charge_schedules).next_transition(now)
+
+
+def resolve_pod_state(
+    pod: Pod, last_message_at: datetime = None, now: datetime = None
+) -> str:
+    """Resolve the state of a pod from its statuses, schedules and charge mode.
+    `last_message_at` is when we last sent the pod a command, if the pod has not
+    been in contact since, it is pending. Schedules are evaluated at `now`."""
+    state = None
+    for status in pod.statuses:
+        state = compare_state(state, status.key_name)
+
+    is_available_state = (state == ATTR_STATE_AVAILABLE) or (state == ATTR_STATE_IDLE)
+    is_charging_state = state == ATTR_STATE_CHARGING
+    is_override_charge_mode = pod.charge_mode == ChargeMode.OVERRIDE
+    is_manual_charge_mode = pod.charge_mode == ChargeMode.MANUAL
+    charging_not_allowed = charging_allowed(pod, now) is False
+    should_be_waiting_state = is_available_state and charging_not_allowed
+    should_be_connected_waiting_state = is_charging_state and charging_not_allowed
+    should_be_available = is_available_state and (
+        is_override_charge_mode or is_manual_charge_mode
+    )
+    should_be_charging = is_charging_state and (
+        is_override_charge_mode or is_manual_charge_mode
+    )
+    should_be_suspended_ev = is_charging_state and (
+        pod.charging_state == ATTR_STATE_SUSPENDED_EV
+    )
+    should_be_suspended_evse = is_charging_state and (
+        pod.charging_state == ATTR_STATE_SUSPENDED_EVSE
+    )
+    should_be_pending = (
+        last_message_at is not None
+        and pod.last_message_at is not None
+        and last_message_at > pod.last_message_at
+    )
+
+    if should_be_waiting_state:
+        state = ATTR_STATE_WAITING
+
+    if should_be_connected_waiting_state:
+        state = ATTR_STATE_CONNECTED_WAITING
+
+    # Pod should be available if pod is available and state is overriden, or manual charge mode
+    if should_be_available:
+        state = ATTR_STATE_AVAILABLE
+
+    # Pod should be charging if pod is charging and state is overriden, or manual charge mode
+    if should_be_charging:
+        state = ATTR_STATE_CHARGING
+
+    # Pod should be suspended evse if pod is charging and connectivity status is suspended evse
+    if should_be_suspended_evse:
+        state = ATTR_STATE_SUSPENDED_EVSE
+
+    # Pod should be suspended ev if pod is charging and connectivity status is suspended ev
+    if should_be_suspended_ev:
+        state = ATTR_STATE_SUSPENDED_EV
+
+    # Should this pod be pending?
+    if should_be_pending:
+        state = ATTR_STATE_PENDING
+
+    return state
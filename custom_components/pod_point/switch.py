@@ -1,16 +1,17 @@
 """Switch platform for pod_point."""
 
-from datetime import datetime
+from functools import partial
 import logging
 
 from homeassistant.components.switch import SwitchEntity
 from podpointclient.charge_mode import ChargeMode
 from podpointclient.client import PodPointClient
-import pytz
 
+from .command_queue import COMMAND_CHARGE_OVERRIDE, COMMAND_SCHEDULE
+from .commands import set_charge_mode_manual, set_charge_override, set_schedules
 from .const import DOMAIN, SWITCH_ICON
 from .coordinator import PodPointDataUpdateCoordinator
-from .entity import PodPointEntity
+from .entity import PodPointEntity, async_track_pods
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -18,19 +19,19 @@ _LOGGER: logging.Logger = logging.getLogger(__package__)
 async def async_setup_entry(hass, entry, async_add_devices):
     """Setup sensor platform."""
     coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    # Handle coordinator offline on boot - no data will be populated
-    if coordinator.online is False:
+    # Handle coordinator offline on boot without a snapshot - no data will be populated
+    if coordinator.data is None:
         return
 
-    switches = []
+    def create_switches(unit_id: int):
+        charging_allowed_switch = PodPointChargingAllowedSwitch(
+            coordinator, entry, unit_id
+        )
+        charge_mode_switch = PodPointChargeModeSwitch(coordinator, entry, unit_id)
 
-    for i in range(len(coordinator.data)):
-        charging_allowed_switch = PodPointChargingAllowedSwitch(coordinator, entry, i)
-        charge_mode_switch = PodPointChargeModeSwitch(coordinator, entry, i)
+        return [charging_allowed_switch, charge_mode_switch]
 
-        switches.append(charging_allowed_switch)
-        switches.append(charge_mode_switch)
-    async_add_devices(switches)
+    async_add_devices(async_track_pods(hass, entry, async_add_devices, create_switches))
 
 
 class PodPointChargingAllowedSwitch(PodPointEntity, SwitchEntity):
@@ -43,10 +44,14 @@ class PodPointChargingAllowedSwitch(PodPointEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Allow charging (clear schedule)"""
         api: PodPointClient = self.coordinator.api
-        await api.async_set_schedule(enabled=False, pod=self.pod)
+        await self.coordinator.command_queue.async_send(
+            self.pod.unit_id,
+            COMMAND_SCHEDULE,
+            False,
+            partial(api.async_set_schedule, enabled=False, pod=self.pod),
+        )
 
-        self.coordinator.last_message_at = datetime.now(pytz.UTC)
-        await self.coordinator.async_request_refresh()
+        self.coordinator.async_command_sent(self.pod, set_schedules(enabled=False))
 
     async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Block charging (turn on schedule). Unless an override or charge mode would prevent this functionality"""
@@ -56,10 +61,14 @@ class PodPointChargingAllowedSwitch(PodPointEntity, SwitchEntity):
         if self._override_to_on():
             return False
 
-        await api.async_set_schedule(enabled=True, pod=self.pod)
+        await self.coordinator.command_queue.async_send(
+            self.pod.unit_id,
+            COMMAND_SCHEDULE,
+            True,
+            partial(api.async_set_schedule, enabled=True, pod=self.pod),
+        )
 
-        self.coordinator.last_message_at = datetime.now(pytz.UTC)
-        await self.coordinator.async_request_refresh()
+        self.coordinator.async_command_sent(self.pod, set_schedules(enabled=True))
 
     @property
     def unique_id(self):
@@ -93,18 +102,26 @@ class PodPointChargeModeSwitch(PodPointEntity, SwitchEntity):
     async def async_turn_on(self, **kwargs):  # pylint: disable=unused-argument
         """Set charge mode to smart"""
         api: PodPointClient = self.coordinator.api
-        await api.async_set_charge_mode_smart(self.pod)
+        await self.coordinator.command_queue.async_send(
+            self.pod.unit_id,
+            COMMAND_CHARGE_OVERRIDE,
+            None,
+            partial(api.async_set_charge_mode_smart, self.pod),
+        )
 
-        self.coordinator.last_message_at = datetime.now(pytz.UTC)
-        await self.coordinator.async_request_refresh()
+        self.coordinator.async_command_sent(self.pod, set_charge_override(None))
 
     async def async_turn_off(self, **kwargs):  # pylint: disable=unused-argument
         """Set charge mode to manual"""
         api: PodPointClient = self.coordinator.api
-        await api.async_set_charge_mode_manual(self.pod)
+        await self.coordinator.command_queue.async_send(
+            self.pod.unit_id,
+            COMMAND_CHARGE_OVERRIDE,
+            "manual",
+            partial(api.async_set_charge_mode_manual, self.pod),
+        )
 
-        self.coordinator.last_message_at = datetime.now(pytz.UTC)
-        await self.coordinator.async_request_refresh()
+        self.coordinator.async_command_sent(self.pod, set_charge_mode_manual)
 
     @property
     def unique_id(self):
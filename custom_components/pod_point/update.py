@@ -12,9 +12,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, TIER_FIRMWARE
 from .coordinator import PodPointDataUpdateCoordinator
-from .entity import PodPointEntity
+from .entity import PodPointEntity, async_track_pods
 
 PARALLEL_UPDATES = 0
 
@@ -30,14 +30,16 @@ async def async_setup_entry(
 ) -> None:
     """Setup update platform."""
     coordinator: PodPointDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    # Handle coordinator offline on boot - no data will be populated
-    if coordinator.online is False:
+    # Handle coordinator offline on boot without a snapshot - no data will be populated
+    if coordinator.data is None:
         return
 
-    for i in range(len(coordinator.data)):
-        async_add_entities(
-            [PodUpdateEntity(coordinator, UPDATE_ENTITY_TYPES, entry, i)]
-        )
+    def create_updates(unit_id: int):
+        return [PodUpdateEntity(coordinator, UPDATE_ENTITY_TYPES, entry, unit_id)]
+
+    async_add_entities(
+        async_track_pods(hass, entry, async_add_entities, create_updates)
+    )
 
 
 class PodUpdateEntity(PodPointEntity, UpdateEntity):
@@ -49,18 +51,19 @@ class PodUpdateEntity(PodPointEntity, UpdateEntity):
     _attr_device_class: UpdateDeviceClass | None = UpdateDeviceClass.FIRMWARE
     _attr_release_summary: str | None = "A new firmware release is available."
     _attr_translation_key: str | None = "firmware_update"
+    _data_tiers = frozenset([TIER_FIRMWARE])
+    _required_tiers = frozenset([TIER_FIRMWARE])
 
     def __init__(
         self,
         coordinator: PodPointDataUpdateCoordinator,
         description: UpdateEntityDescription,
         config_entry: ConfigEntry,
-        idx: int,
+        unit_id: int,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, config_entry, idx)
+        super().__init__(coordinator, config_entry, unit_id)
         self.coordinator = coordinator
-        self.pod_id = idx
         self.config_entry = config_entry
         self.entity_description = description
 
@@ -82,10 +85,6 @@ class PodUpdateEntity(PodPointEntity, UpdateEntity):
             else self.installed_version
         )
 
-    @property
-    def pod(self):
-        return self.coordinator.data[self.pod_id]
-
     def release_notes(self) -> str | None:
         """Return full release notes."""
         return (
@@ -0,0 +1,119 @@
+"""Per-pod view model, built once per refresh and read by every entity of a pod"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Tuple
+
+from homeassistant.util import dt as dt_util
+from podpointclient.pod import Pod
+
+from .const import (
+    ATTR_CONNECTION_STATE_ONLINE,
+    ATTR_STATE,
+    ATTR_STATE_CONNECTED_WAITING,
+    ATTR_STATE_SUSPENDED_EV,
+    ATTR_STATE_SUSPENDED_EVSE,
+    ATTRIBUTION,
+    CHARGING_FLAG,
+    DOMAIN,
+)
+from .state import charging_allowed, resolve_pod_state
+
+CONNECTED_STATES = frozenset(
+    [
+        CHARGING_FLAG,
+        ATTR_STATE_CONNECTED_WAITING,
+        ATTR_STATE_SUSPENDED_EV,
+        ATTR_STATE_SUSPENDED_EVSE,
+    ]
+)
+
+
+@dataclass(frozen=True)
+class PodViewModel:
+    """Everything the entities of a pod display, resolved from the pod. Entities
+    share one instance so must treat it, and its attributes, as read only. View
+    models compare equal when their pod would display the same"""
+
+    unit_id: int
+    state: str
+    connected: bool
+    charging_allowed: bool
+    cloud_connected: bool
+    signal_strength: int
+    connection_quality: int
+    total_kwh: float
+    current_kwh: float
+    total_charge_seconds: int
+    total_cost: int
+    last_charge_cost: int
+    charge_override: Mapping[str, Any]
+    stale_fields: Tuple[str, ...]  # Tiers kept from before, missing the deadline
+    data_age: int  # Seconds old while refreshes are failing, otherwise None
+    attributes: Mapping[str, Any]
+
+
+def build_pod_view_model(
+    pod: Pod,
+    last_message_at: datetime = None,
+    now: datetime = None,
+    stale_fields: Iterable[str] = (),
+    data_age: int = None,
+) -> PodViewModel:
+    """Resolve the state, schedule verdict, signal and totals of a pod at `now`"""
+    now = now or dt_util.now()
+    state = resolve_pod_state(pod, last_message_at, now)
+    stale_fields = tuple(sorted(stale_fields))
+
+    attrs = {
+        "attribution": ATTRIBUTION,
+        "id": pod.id,
+        "integration": DOMAIN,
+        "suggested_area": "Outside",
+        "total_kwh": pod.total_kwh,
+        "total_charge_seconds": pod.total_charge_seconds,
+        "current_kwh": pod.current_kwh,
+        "charge_mode": pod.charge_mode,
+    }
+    attrs.update(pod.dict)
+    attrs[ATTR_STATE] = state
+    if len(stale_fields) > 0:
+        attrs["stale_fields"] = list(stale_fields)
+    if data_age is not None:
+        attrs["data_age"] = data_age
+
+    signal_strength, connection_quality, cloud_connected = 0, 0, False
+    if pod.connectivity_status is not None:
+        cloud_connected = (
+            pod.connectivity_status.connectivity_status == ATTR_CONNECTION_STATE_ONLINE
+        )
+
+        evse = pod.connectivity_status.evses[0]
+        connectivity_state = evse.connectivity_state if evse is not None else None
+        if connectivity_state is not None:
+            signal_strength = connectivity_state.signal_strength or 0
+            connection_quality = connectivity_state.connection_quality or 0
+
+    charge_override = None
+    if pod.charge_override is not None:
+        charge_override = MappingProxyType(pod.charge_override.dict)
+
+    return PodViewModel(
+        unit_id=pod.unit_id,
+        state=state,
+        connected=state in CONNECTED_STATES,
+        charging_allowed=charging_allowed(pod, now),
+        cloud_connected=cloud_connected,
+        signal_strength=signal_strength,
+        connection_quality=connection_quality,
+        total_kwh=pod.total_kwh,
+        current_kwh=pod.current_kwh,
+        total_charge_seconds=pod.total_charge_seconds,
+        total_cost=pod.total_cost,
+        last_charge_cost=getattr(pod, "last_charge_cost", None),
+        charge_override=charge_override,
+        stale_fields=stale_fields,
+        data_age=data_age,
+        attributes=MappingProxyType(attrs),
+    )
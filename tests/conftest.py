@@ -99,7 +99,7 @@ def bypass_get_data_fixture():
     ), patch(
         "podpointclient.client.PodPointClient.async_set_schedule", return_value=True
     ), patch(
-        "podpointclient.client.PodPointClient.async_get_all_charges",
+        "podpointclient.client.PodPointClient.async_get_charges",
         return_value=charges,
     ), patch(
         "podpointclient.client.PodPointClient.async_credentials_verified",
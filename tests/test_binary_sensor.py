@@ -20,7 +20,6 @@ from custom_components.pod_point.binary_sensor import (
 )
 from custom_components.pod_point.const import (
     ATTR_CONNECTION_STATE_ONLINE,
-    ATTR_STATE,
     DOMAIN,
 )
 
@@ -75,12 +74,14 @@ async def test_cloud_connection_sensor(hass, bypass_get_data):
     status.pod.connectivity_status = ConnectivityStatus(
         CONNECTIVITY_STATUS_COMPLETE_FIXTURE
     )
+    status.coordinator.update_view_models()
     assert status.is_on is True
     assert "mdi:cloud-check-variant" == status.icon
 
     status.pod.connectivity_status.evses[0].connectivity_state.connectivity_status = (
         "FOO"
     )
+    status.coordinator.update_view_models()
     assert status.is_on is False
     assert "mdi:cloud-off" == status.icon
 
@@ -96,20 +97,26 @@ async def test_cable_connection_sensor(hass, bypass_get_data):
     assert "pod_point_12234_PSL-123456_cable_status" == status.unique_id
     assert "Cable Status" == status.name
 
-    status.extra_attrs[ATTR_STATE] = "charging"
+    status.pod.statuses[0].key_name = "charging"
+    status.coordinator.update_view_models()
     assert status.is_on is True
 
-    status.extra_attrs[ATTR_STATE] = "available"
+    status.pod.statuses[0].key_name = "available"
+    status.coordinator.update_view_models()
     assert status.is_on is False
 
-    status.extra_attrs[ATTR_STATE] = "connected-waiting-for-schedule"
+    status.pod.statuses[0].key_name = "connected-waiting-for-schedule"
+    status.coordinator.update_view_models()
     assert status.is_on is True
 
-    status.extra_attrs[ATTR_STATE] = "suspended-evse"
+    status.pod.statuses[0].key_name = "suspended-evse"
+    status.coordinator.update_view_models()
     assert status.is_on is True
 
-    status.extra_attrs[ATTR_STATE] = "suspended-ev"
+    status.pod.statuses[0].key_name = "suspended-ev"
+    status.coordinator.update_view_models()
     assert status.is_on is True
 
-    status.extra_attrs[ATTR_STATE] = "foo"
+    status.pod.statuses[0].key_name = "foo"
+    status.coordinator.update_view_models()
     assert status.is_on is False
@@ -0,0 +1,181 @@
+"""Test pod_point charge cache."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+from podpointclient.client import PodPointClient
+from podpointclient.factories import ChargeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.pod_point.charge_cache import ChargeCache
+from custom_components.pod_point.const import (
+    CHARGE_CACHE_KEY,
+    CHARGE_CACHE_SAVE_DELAY,
+    CHARGE_CACHE_VERSION,
+)
+from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+
+from .fixtures import CHARGES_COMPLETE_FIXTURE
+
+
+def build_charges():
+    """Build the fixture charges"""
+    return ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE)
+
+
+async def flush_saves(hass):
+    """Move time on so that delayed saves are written"""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=CHARGE_CACHE_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_charge_cache_round_trip(hass, hass_storage):
+    """Test charges survive being saved and loaded."""
+    charges = build_charges()
+    cache = ChargeCache(hass, "test")
+
+    cache.async_save({123456}, charges)
+    await flush_saves(hass)
+
+    stored = hass_storage[f"{CHARGE_CACHE_KEY}.test"]
+    assert stored["version"] == CHARGE_CACHE_VERSION
+    assert stored["data"]["pod_ids"] == [123456]
+
+    pod_ids, loaded, pull = await ChargeCache(hass, "test").async_load()
+    assert pull is None
+    assert pod_ids == {123456}
+    assert len(loaded) == len(charges)
+
+    for original, restored in zip(charges, loaded):
+        assert restored.id == original.id
+        assert restored.kwh_used == original.kwh_used
+        assert restored.duration == original.duration
+        assert restored.starts_at == original.starts_at
+        assert restored.ends_at == original.ends_at
+        assert restored.energy_cost == original.energy_cost
+        assert restored.location.home == original.location.home
+        assert restored.pod.id == original.pod.id
+
+
+@pytest.mark.asyncio
+async def test_charge_cache_other_version(hass, hass_storage):
+    """Test a cache written with another schema version is discarded."""
+    hass_storage[f"{CHARGE_CACHE_KEY}.test"] = {
+        "version": CHARGE_CACHE_VERSION + 1,
+        "minor_version": 1,
+        "key": f"{CHARGE_CACHE_KEY}.test",
+        "data": {"pod_ids": [123456], "charges": [{"id": 1}]},
+    }
+
+    pod_ids, charges, pull = await ChargeCache(hass, "test").async_load()
+    assert pod_ids == set()
+    assert charges == []
+    assert pull is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_boots_from_cache(hass, hass_storage, bypass_get_data):
+    """Test a coordinator with cached charges only fetches the latest charges."""
+    charges = build_charges()
+    ChargeCache(hass, "test").async_save({123456}, charges[1:])
+    await flush_saves(hass)
+
+    client = PodPointClient(
+        username="test@example.com",
+        password="password",
+        session=async_get_clientsession(hass),
+    )
+    coordinator = PodPointDataUpdateCoordinator(
+        hass, client=client, scan_interval=timedelta(seconds=300), entry_id="test"
+    )
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=charges[:3],
+    ) as get_charges:
+        await coordinator._async_setup()
+        assert len(coordinator.home_charges) == 9
+
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert get_charges.call_count == 1
+    assert get_charges.call_args.kwargs["perpage"] == 3
+    assert sorted(charge.id for charge in coordinator.data[0].charges) == list(
+        range(1, 10)
+    )
+
+
+@pytest.mark.asyncio
+async def test_coordinator_resumes_charges_pull(hass, hass_storage, bypass_get_data):
+    """Test fetching every charge cut short carries on from the pages it has, after
+    a restart too."""
+    charges = build_charges()
+    requested_pages = []
+    timeout_pages = {2}
+
+    async def get_charges(perpage, page):
+        requested_pages.append(page)
+        if page in timeout_pages:
+            timeout_pages.remove(page)
+            raise TimeoutError()
+
+        return charges[(page - 1) * perpage : page * perpage]
+
+    def build_coordinator():
+        client = PodPointClient(
+            username="test@example.com",
+            password="password",
+            session=async_get_clientsession(hass),
+        )
+        coordinator = PodPointDataUpdateCoordinator(
+            hass, client=client, scan_interval=timedelta(seconds=300), entry_id="test"
+        )
+        coordinator.charges_perpage_all = 4
+        return coordinator
+
+    coordinator = build_coordinator()
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        side_effect=get_charges,
+    ):
+        await coordinator._async_setup()
+        await coordinator.async_refresh()
+
+    # The refresh succeeds without the charges, keeping the first page
+    assert coordinator.last_update_success is True
+    assert requested_pages == [1, 2]
+    assert len(coordinator.home_charges) == 0
+    assert coordinator.stale_fields == {123456: {"charges"}}
+    assert coordinator.charges_pull.next_page == 2
+    assert len(coordinator.charges_pull.charges) == 4
+
+    await flush_saves(hass)
+    assert hass_storage[f"{CHARGE_CACHE_KEY}.test"]["data"]["pull"]["next_page"] == 2
+
+    # After a restart the pull carries on from the second page
+    requested_pages.clear()
+    coordinator = build_coordinator()
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        side_effect=get_charges,
+    ):
+        await coordinator._async_setup()
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert requested_pages == [2, 3]
+    assert coordinator.charges_pull is None
+    assert coordinator.stale_fields == {}
+    assert sorted(charge.id for charge in coordinator.data[0].charges) == list(
+        range(1, 10)
+    )
+
+    await flush_saves(hass)
+    assert "pull" not in hass_storage[f"{CHARGE_CACHE_KEY}.test"]["data"]
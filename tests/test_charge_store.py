@@ -0,0 +1,177 @@
+"""Test pod_point charge store."""
+
+from podpointclient.charge import Charge
+from podpointclient.factories import ChargeFactory
+
+from custom_components.pod_point.charge_store import ChargeStore
+
+from .fixtures import CHARGES_COMPLETE_FIXTURE
+
+
+def build_charge(charge_id: int, starts_at: str, kwh_used: float = 1.0) -> Charge:
+    """Build a charge starting at `starts_at`"""
+    return Charge(
+        data={
+            "id": charge_id,
+            "kwh_used": kwh_used,
+            "starts_at": starts_at,
+            "location": {"home": True},
+            "pod": {"id": 123456},
+        }
+    )
+
+
+def test_charge_store_ordering():
+    """Test charges are held by start time, newest first"""
+    charges = ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE)
+    store = ChargeStore(charges)
+
+    assert len(store) == 10
+    assert 1 in store
+    assert 11 not in store
+    assert store.get(2) is charges[1]
+
+    starts = [charge.starts_at for charge in store]
+    assert starts == sorted(starts, reverse=True)
+    assert list(store.oldest_first()) == list(reversed(list(store.newest_first())))
+
+
+def test_charge_store_upsert():
+    """Test upserting new, changed and id-less charges"""
+    store = ChargeStore(
+        [
+            build_charge(1, "2022-01-01T10:00:00Z"),
+            build_charge(2, "2022-01-02T10:00:00Z"),
+        ]
+    )
+
+    # A newer charge is added at the front
+    assert store.upsert(build_charge(3, "2022-01-03T10:00:00Z")) is True
+    assert [charge.id for charge in store] == [3, 2, 1]
+
+    # An older charge is slotted into place
+    assert store.upsert(build_charge(4, "2022-01-01T12:00:00Z")) is True
+    assert [charge.id for charge in store] == [3, 2, 4, 1]
+
+    # An updated charge replaces the one we hold
+    updated = build_charge(3, "2022-01-03T10:00:00Z", kwh_used=5.0)
+    assert store.upsert(updated) is False
+    assert store.get(3) is updated
+    assert len(store) == 4
+
+    # A charge whose start time changed is moved
+    assert store.upsert(build_charge(2, "2021-12-31T10:00:00Z")) is False
+    assert [charge.id for charge in store] == [3, 4, 1, 2]
+
+    # Charges without an id can not be tracked
+    assert store.upsert(build_charge(None, "2022-01-04T10:00:00Z")) is False
+    assert len(store) == 4
+
+    assert store.upsert_many([build_charge(5, "2022-01-05T10:00:00Z"), updated]) == 1
+    assert [charge.id for charge in store] == [5, 3, 4, 1, 2]
+
+    # Older charges arrive newest first, one moves before they are read
+    store.upsert_many(
+        [
+            build_charge(7, "2021-07-01T10:00:00Z"),
+            build_charge(6, "2021-06-01T10:00:00Z"),
+        ]
+    )
+    assert store.upsert(build_charge(7, "2022-01-06T10:00:00Z")) is False
+    assert [charge.id for charge in store] == [7, 5, 3, 4, 1, 2, 6]
+    assert [charge.id for charge in store.pod_charges(123456)] == [7, 5, 3, 4, 1, 2, 6]
+
+
+def test_charge_store_pod_totals():
+    """Test per-pod totals match the charges they are built from"""
+    charges = ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE)
+    store = ChargeStore(charges)
+    pod_charges = store.pod_charges(123456)
+    pod_fixture_charges = [charge for charge in charges if charge.pod.id == 123456]
+
+    assert len(pod_charges) == 9
+    assert pod_charges.total_kwh == round(
+        sum(charge.kwh_used for charge in pod_fixture_charges), 6
+    )
+    assert pod_charges.total_charge_seconds == sum(
+        charge.duration for charge in pod_fixture_charges
+    )
+    assert pod_charges.total_cost == sum(
+        charge.energy_cost or 0 for charge in pod_fixture_charges
+    )
+    assert pod_charges.current_kwh == charges[0].kwh_used
+    assert pod_charges.last_charge_cost == 116
+
+    assert len(store.pod_charges(12234)) == 1
+    assert len(store.pod_charges(999)) == 0
+    assert store.pod_charges(999).last_charge_cost is None
+
+
+def test_charge_store_finalising_charge():
+    """Test totals are corrected as an in-progress charge completes"""
+    store = ChargeStore(
+        [
+            Charge(
+                data={
+                    "id": 1,
+                    "kwh_used": 10.1,
+                    "duration": 100,
+                    "starts_at": "2022-01-01T10:00:00Z",
+                    "ends_at": "2022-01-01T12:00:00Z",
+                    "energy_cost": 150,
+                    "location": {"home": True},
+                    "pod": {"id": 123456},
+                }
+            )
+        ]
+    )
+    pod_charges = store.pod_charges(123456)
+
+    ongoing = {
+        "id": 2,
+        "starts_at": "2022-01-02T10:00:00Z",
+        "ends_at": None,
+        "energy_cost": None,
+        "location": {"home": True},
+        "pod": {"id": 123456},
+    }
+
+    # The in-progress charge grows poll by poll
+    for kwh_used in [0.1, 0.2, 0.3, 1.7]:
+        store.upsert(Charge(data={**ongoing, "kwh_used": kwh_used, "duration": 10}))
+        assert pod_charges.current_kwh == kwh_used
+        assert pod_charges.total_kwh == round(10.1 + kwh_used, 6)
+        assert pod_charges.last_charge_cost == 150
+
+    # It completes with a cost
+    store.upsert(
+        Charge(
+            data={
+                **ongoing,
+                "kwh_used": 2.0,
+                "duration": 20,
+                "ends_at": "2022-01-02T12:00:00Z",
+                "energy_cost": 30,
+            }
+        )
+    )
+    assert len(pod_charges) == 2
+    assert pod_charges.current_kwh == 0.0
+    assert pod_charges.total_kwh == 12.1
+    assert pod_charges.total_charge_seconds == 120
+    assert pod_charges.total_cost == 180
+    assert pod_charges.last_charge_cost == 30
+
+    # Its cost is later removed, so the previous charge is the last with a cost
+    store.upsert(
+        Charge(
+            data={
+                **ongoing,
+                "kwh_used": 2.0,
+                "duration": 20,
+                "ends_at": "2022-01-02T12:00:00Z",
+            }
+        )
+    )
+    assert pod_charges.total_cost == 150
+    assert pod_charges.last_charge_cost == 150
@@ -0,0 +1,252 @@
+"""Test pod_point circuit breaker."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from podpointclient.client import PodPointClient
+from podpointclient.errors import ApiConnectionError, AuthError
+import pytest
+
+from custom_components.pod_point.call_timeout import CallTimeout
+from custom_components.pod_point.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakerClient,
+    CircuitOpenError,
+)
+from custom_components.pod_point.coordinator import (
+    PodPointDataUpdateCoordinator,
+    UpdateFailed,
+)
+from custom_components.pod_point.rate_limiter import RateLimitedClient, RateLimiter
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def fail():
+    raise ApiConnectionError("down")
+
+
+async def succeed():
+    return True
+
+
+def subject(clock: FakeClock) -> CircuitBreaker:
+    """A breaker that always waits the longest jittered delay"""
+    return CircuitBreaker(
+        threshold=2,
+        base_delay=10,
+        max_delay=30,
+        clock=clock,
+        jitter=lambda low, high: high,
+    )
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_backs_off():
+    """Test the breaker opens after failures in a row, for longer each time"""
+    clock = FakeClock()
+    breaker = subject(clock)
+
+    with pytest.raises(ApiConnectionError):
+        await breaker.async_call(fail)
+    assert breaker.state == STATE_CLOSED
+
+    with pytest.raises(ApiConnectionError):
+        await breaker.async_call(fail)
+    assert breaker.state == STATE_OPEN
+    assert breaker.seconds_until_retry == 10
+
+    # Calls fail without being made while open
+    request = AsyncMock()
+    with pytest.raises(CircuitOpenError):
+        await breaker.async_call(request)
+    request.assert_not_called()
+
+    # A failed probe opens it again for twice as long, up to the maximum
+    delays = []
+    for _ in range(3):
+        clock.now = breaker.retry_at
+        assert breaker.state == STATE_HALF_OPEN
+        with pytest.raises(ApiConnectionError):
+            await breaker.async_call(fail)
+        delays.append(breaker.seconds_until_retry)
+    assert delays == [20, 30, 30]
+
+    # A successful probe closes it
+    clock.now = breaker.retry_at
+    assert await breaker.async_call(succeed) is True
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    assert breaker.times_opened == 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_single_probe():
+    """Test only one call is made while half open"""
+    clock = FakeClock()
+    breaker = subject(clock)
+    for _ in range(2):
+        with pytest.raises(ApiConnectionError):
+            await breaker.async_call(fail)
+    clock.now = breaker.retry_at
+
+    release = asyncio.Event()
+
+    async def probe():
+        await release.wait()
+        return True
+
+    probing = asyncio.ensure_future(breaker.async_call(probe))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpenError):
+        await breaker.async_call(succeed)
+
+    release.set()
+    assert await probing is True
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_timeouts():
+    """Test calls abandoned by their timeout count as failures"""
+    clock = FakeClock()
+    breaker = subject(clock)
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            async with CallTimeout(0.01):
+                await breaker.async_call(hang)
+    assert breaker.state == STATE_OPEN
+
+    # A probe that hangs opens the breaker again
+    clock.now = breaker.retry_at
+    with pytest.raises(TimeoutError):
+        async with CallTimeout(0.01):
+            await breaker.async_call(hang)
+    assert breaker.state == STATE_OPEN
+    assert breaker.times_opened == 2
+
+    # Running out of time waiting for the rate limiter is not Pod Point's doing
+    clock.now = breaker.retry_at
+    limiter = RateLimiter(rate=1.0, burst=1, hourly_budget=100)
+    await limiter.async_acquire()
+    client = CircuitBreakerClient(
+        RateLimitedClient(AsyncMock(async_get_user=AsyncMock()), limiter), breaker
+    )
+    with pytest.raises(TimeoutError):
+        loop = asyncio.get_running_loop()
+        async with CallTimeout(0.01, deadline=loop.time() + 0.01):
+            await client.async_get_user()
+    assert breaker.failures == 3
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_other_errors():
+    """Test errors from a reachable Pod Point do not open the breaker"""
+    breaker = subject(FakeClock())
+
+    async def auth_error():
+        raise AuthError(401, "Unauthorised")
+
+    for _ in range(3):
+        with pytest.raises(AuthError):
+            await breaker.async_call(auth_error)
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_coordinator_recovers(hass, bypass_get_data):
+    """Test the first refresh once the breaker is half open succeeds"""
+    clock = FakeClock()
+    breaker = subject(clock)
+    session = async_get_clientsession(hass)
+    client = PodPointClient(
+        username="test@example.com", password="password", session=session
+    )
+    client.async_get_user = AsyncMock(side_effect=ApiConnectionError("down"))
+    client.async_get_all_pods = AsyncMock(side_effect=ApiConnectionError("down"))
+
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=CircuitBreakerClient(client, breaker),
+        scan_interval=timedelta(seconds=300),
+        circuit_breaker=breaker,
+    )
+
+    for _ in range(2):
+        await coordinator.async_refresh()
+    assert breaker.state == STATE_OPEN
+    failures = coordinator.consecutive_failures
+
+    # Pod Point is back, answering after a moment. The probe is made alone and
+    # the rest follow it.
+    def answer_later(request):
+        async def answer(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return await request(*args, **kwargs)
+
+        return answer
+
+    client.async_get_user = answer_later(PodPointClient.async_get_user)
+    client.async_get_all_pods = answer_later(PodPointClient.async_get_all_pods)
+    client.async_get_charges = answer_later(PodPointClient.async_get_charges)
+    clock.now = breaker.retry_at
+    assert breaker.state == STATE_HALF_OPEN
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert breaker.state == STATE_CLOSED
+    assert coordinator.consecutive_failures == 0
+    assert failures > 0
+    assert len(coordinator.data) == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_coordinator(hass, caplog):
+    """Test the coordinator reports the breaker and retries when it allows"""
+    clock = FakeClock()
+    breaker = subject(clock)
+    session = async_get_clientsession(hass)
+    client = PodPointClient(
+        username="test@example.com", password="password", session=session
+    )
+    client.async_get_pods = AsyncMock(side_effect=ApiConnectionError("down"))
+    client.async_get_user = AsyncMock(side_effect=ApiConnectionError("down"))
+    client.async_get_charges = AsyncMock(side_effect=ApiConnectionError("down"))
+
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=CircuitBreakerClient(client, breaker),
+        scan_interval=timedelta(seconds=300),
+        circuit_breaker=breaker,
+    )
+
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    assert coordinator.online is False
+    assert breaker.state == STATE_OPEN
+    assert coordinator.update_interval == timedelta(seconds=10)
+    assert "Pausing requests to Pod Point for 10s" in caplog.text
+
+    # Nothing is called until the breaker allows a probe
+    client.async_get_pods.reset_mock()
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    client.async_get_pods.assert_not_called()
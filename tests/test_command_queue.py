@@ -0,0 +1,131 @@
+"""Test pod_point command queue."""
+
+import asyncio
+
+import pytest
+
+from custom_components.pod_point.command_queue import (
+    COMMAND_CHARGE_OVERRIDE,
+    COMMAND_SCHEDULE,
+    CommandQueue,
+)
+
+
+async def settle():
+    """Let the queued sends and workers run up to their next wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class FakeApi:
+    """Records the commands sent, each held until released"""
+
+    def __init__(self) -> None:
+        self.sent = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = asyncio.Event()
+
+    def command(self, name):
+        async def request():
+            self.sent.append(name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await self.release.wait()
+            self.in_flight -= 1
+            return name
+
+        return request
+
+
+@pytest.mark.asyncio
+async def test_command_queue_supersedes_queued_commands(hass):
+    """Test queued commands of the same kind are replaced by the latest"""
+    queue = CommandQueue(hass)
+    api = FakeApi()
+
+    first = asyncio.ensure_future(
+        queue.async_send(1, COMMAND_SCHEDULE, True, api.command("schedule on"))
+    )
+    await settle()
+    waiting = [
+        asyncio.ensure_future(queue.async_send(1, kind, key, api.command(name)))
+        for kind, key, name in [
+            (COMMAND_SCHEDULE, False, "schedule off"),
+            (COMMAND_CHARGE_OVERRIDE, None, "smart"),
+            (COMMAND_SCHEDULE, True, "schedule on again"),
+        ]
+    ]
+    await settle()
+    assert queue.depth(1) == 3
+
+    api.release.set()
+    results = await asyncio.gather(first, *waiting)
+
+    # One at a time, in order, with the superseded command never sent
+    assert api.sent == ["schedule on", "smart", "schedule on again"]
+    assert api.max_in_flight == 1
+    assert results == ["schedule on", "schedule on again", "smart", "schedule on again"]
+    assert queue.commands_sent == 3
+    assert queue.commands_superseded == 1
+    assert queue.depth() == 0
+    assert len(queue.latencies) == 3
+
+
+@pytest.mark.asyncio
+async def test_command_queue_joins_identical_command(hass):
+    """Test a command identical to the one being sent is not sent again"""
+    queue = CommandQueue(hass)
+    api = FakeApi()
+
+    first = asyncio.ensure_future(
+        queue.async_send(1, COMMAND_SCHEDULE, True, api.command("schedule on"))
+    )
+    await settle()
+    second = asyncio.ensure_future(
+        queue.async_send(1, COMMAND_SCHEDULE, True, api.command("schedule on"))
+    )
+    await settle()
+
+    api.release.set()
+    assert await asyncio.gather(first, second) == ["schedule on", "schedule on"]
+    assert api.sent == ["schedule on"]
+    assert queue.commands_joined == 1
+
+
+@pytest.mark.asyncio
+async def test_command_queue_pods_in_parallel(hass):
+    """Test commands for different pods are sent side by side"""
+    queue = CommandQueue(hass)
+    api = FakeApi()
+
+    sends = [
+        asyncio.ensure_future(
+            queue.async_send(unit_id, COMMAND_SCHEDULE, True, api.command(unit_id))
+        )
+        for unit_id in [1, 2, 3]
+    ]
+    await settle()
+    assert api.max_in_flight == 3
+    assert queue.depth() == 3
+
+    api.release.set()
+    assert await asyncio.gather(*sends) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_command_queue_errors(hass):
+    """Test a failed command raises for its caller and later commands still run"""
+    queue = CommandQueue(hass)
+
+    async def fail():
+        raise RuntimeError("failed")
+
+    async def succeed():
+        return True
+
+    with pytest.raises(RuntimeError):
+        await queue.async_send(1, COMMAND_SCHEDULE, True, fail)
+
+    assert await queue.async_send(1, COMMAND_SCHEDULE, True, succeed) is True
+    assert queue.commands_sent == 2
@@ -8,13 +8,26 @@ from homeassistant.components import dhcp
 from homeassistant.core import HomeAssistant
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
 
 from custom_components.pod_point.const import (
     BINARY_SENSOR,
+    CONF_ADAPTIVE_POLLING,
+    CONF_API_CONCURRENCY,
+    CONF_CHARGES_SCAN_INTERVAL,
     CONF_CURRENCY,
+    CONF_FIRMWARE_SCAN_INTERVAL,
     CONF_HTTP_DEBUG,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_DATA_AGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
     CONF_PASSWORD,
+    CONF_POD_SCAN_INTERVAL,
+    CONF_REFRESH_WINDOW,
     CONF_SCAN_INTERVAL,
+    CONF_STALE_FAILURES,
+    CONF_USER_SCAN_INTERVAL,
     DOMAIN,
     PLATFORMS,
     SENSOR,
@@ -177,10 +190,58 @@ async def test_options_flow(hass, bypass_get_data):
             CONF_SCAN_INTERVAL: 300,
             CONF_HTTP_DEBUG: False,
             CONF_CURRENCY: "GBP",
+            CONF_IMPORT_STATISTICS: True,
+            CONF_API_CONCURRENCY: 4,
+            CONF_ADAPTIVE_POLLING: True,
+            CONF_MIN_SCAN_INTERVAL: 60,
+            CONF_MAX_SCAN_INTERVAL: 1800,
+            CONF_REFRESH_WINDOW: 5,
+            CONF_STALE_FAILURES: 3,
+            CONF_MAX_DATA_AGE: 3600,
+            CONF_USER_SCAN_INTERVAL: 3600,
+            CONF_POD_SCAN_INTERVAL: 3600,
+            CONF_CHARGES_SCAN_INTERVAL: 300,
+            CONF_FIRMWARE_SCAN_INTERVAL: 1500,
         }
     )
 
 
+@pytest.mark.asyncio
+async def test_options_flow_rejects_zero_tier_interval(hass, bypass_get_data):
+    """Test a tier interval below one second is rejected, it would make the tier
+    due on every refresh."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    for interval in (0, -60):
+        with pytest.raises(vol.Invalid):
+            await hass.config_entries.options.async_configure(
+                result["flow_id"], user_input={CONF_POD_SCAN_INTERVAL: interval}
+            )
+
+
+@pytest.mark.asyncio
+async def test_options_flow_validates_currency(hass, bypass_get_data):
+    """Test the currency must be a three letter code, it names the cost
+    statistics"""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    for currency in ("€", "US$", "POUNDS", ""):
+        with pytest.raises(vol.Invalid):
+            await hass.config_entries.options.async_configure(
+                result["flow_id"], user_input={CONF_CURRENCY: currency}
+            )
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_CURRENCY: " eur "}
+    )
+    assert result["type"] == data_entry_flow.RESULT_TYPE_CREATE_ENTRY
+    assert entry.options[CONF_CURRENCY] == "EUR"
+
+
 # Our config flow also has an DHCP flow, so we must test it as well.
 @pytest.mark.asyncio
 async def test_dhcp_flow(hass: HomeAssistant, bypass_get_data) -> None:
@@ -1,29 +1,57 @@
 """Test pod_point setup process."""
 
 # from unittest import mock
+import asyncio
+import copy
 from datetime import timedelta
+import time
 from email.headerregistry import ContentTransferEncodingHeader
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 from podpointclient.client import PodPointClient
 from podpointclient.errors import ApiConnectionError, AuthError, SessionError
-from podpointclient.factories import FirmwareFactory, PodFactory, UserFactory
+from podpointclient.factories import (
+    ChargeFactory,
+    ConnectivityStatusFactory,
+    FirmwareFactory,
+    PodFactory,
+    UserFactory,
+)
 from podpointclient.pod import Pod
+from podpointclient.schedule import Schedule, ScheduleStatus
 from podpointclient.user import User
 import pytest
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 
 from custom_components.pod_point import async_setup_entry
-from custom_components.pod_point.const import DOMAIN
+from custom_components.pod_point.commands import set_charge_override
+from custom_components.pod_point.const import (
+    COMMAND_CONFIRM_ATTEMPTS,
+    DOMAIN,
+    LIMITED_POD_INCLUDES,
+    POD_RETIRE_AFTER,
+    TIER_CHARGES,
+    TIER_CONNECTIVITY,
+    TIER_PODS,
+    TIER_USER,
+    TIERS,
+)
 from custom_components.pod_point.coordinator import (
     PodPointDataUpdateCoordinator,
     UpdateFailed,
 )
+from custom_components.pod_point.rate_limiter import RateLimitedClient, RateLimiter
 
 from .const import MOCK_CONFIG
 from .fixtures import (
+    CHARGES_COMPLETE_FIXTURE,
+    CONNECTIVITY_STATUS_COMPLETE_FIXTURE,
     FIRMWARE_COMPLETE_FIXTURE,
     POD_COMPLETE_FIXTURE,
     USER_COMPLETE_FIXTURE,
@@ -55,6 +83,7 @@ async def subject_with_data(hass) -> PodPointDataUpdateCoordinator:
     coordinator: PodPointDataUpdateCoordinator = await subject(hass)
     coordinator.pods = pods
     coordinator.data = pods
+    coordinator.update_view_models()
     coordinator.user = user
     coordinator.online = True
     return coordinator
@@ -171,4 +200,685 @@ async def test_coordinator_refresh_unexpected_exception(hass, error_on_get_data)
         await coordinator._async_update_data()
 
 
+def build_pods(count: int) -> list[Pod]:
+    """Build `count` distinct pods from the complete pod fixture"""
+    pods_data = []
+    for i in range(count):
+        pod_data = dict(POD_COMPLETE_FIXTURE)
+        pod_data["id"] = POD_COMPLETE_FIXTURE["id"] + i
+        pod_data["unit_id"] = POD_COMPLETE_FIXTURE["unit_id"] + i
+        pod_data["ppid"] = f"PSL-{100000 + i}"
+        pods_data.append(pod_data)
+
+    return PodFactory().build_pods({"pods": pods_data})
+
+
+# Test that connectivity status is fetched concurrently, within the concurrency cap
+@pytest.mark.asyncio
+async def test_coordinator_connectivity_concurrency(hass, bypass_get_data):
+    """Test connectivity status calls are bounded by api_concurrency."""
+    pods = build_pods(6)
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(
+        CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+    )
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_connectivity_status(pod):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return connectivity_status
+
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+    coordinator.api_concurrency = 2
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_connectivity_status",
+        side_effect=get_connectivity_status,
+    ):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert max_in_flight == 2
+    assert all(pod.connectivity_status is not None for pod in coordinator.data)
+
+
+# Test that one failing connectivity call does not fail the refresh
+@pytest.mark.asyncio
+async def test_coordinator_connectivity_partial_failure(hass, bypass_get_data):
+    """Test a failed connectivity call keeps the previous result for that pod."""
+    pods = build_pods(2)
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(
+        CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+    )
+
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ):
+        await coordinator.async_refresh()
+
+    async def get_connectivity_status(pod):
+        if pod.unit_id == pods[1].unit_id:
+            raise ApiConnectionError("CONNECTION_ERROR_MESSAGE")
+        return connectivity_status
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=build_pods(2),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_connectivity_status",
+        side_effect=get_connectivity_status,
+    ):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert len(coordinator.data) == 2
+    for pod in coordinator.data:
+        assert pod.connectivity_status is not None
+        assert pod.last_message_at == connectivity_status.last_message_at
+
+
+# Test that a slow connectivity call misses the deadline without failing the refresh
+@pytest.mark.asyncio
+async def test_coordinator_refresh_deadline(hass, bypass_get_data):
+    """Test pods keep their previous connectivity when it misses the deadline."""
+    pods = build_pods(2)
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(
+        CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+    )
+
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ):
+        await coordinator.async_refresh()
+
+    async def get_connectivity_status(pod):
+        if pod.unit_id == pods[1].unit_id:
+            await asyncio.sleep(10)
+        return connectivity_status
+
+    coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+    with patch("custom_components.pod_point.coordinator.REFRESH_DEADLINE", 0.05), patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=build_pods(2),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_connectivity_status",
+        side_effect=get_connectivity_status,
+    ):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert coordinator.stale_fields == {pods[1].unit_id: {TIER_CONNECTIVITY}}
+    assert coordinator.data[1].connectivity_status is not None
+    assert coordinator.view_models[pods[0].unit_id].stale_fields == ()
+    assert coordinator.view_models[pods[1].unit_id].stale_fields == (TIER_CONNECTIVITY,)
+    assert coordinator.view_models[pods[1].unit_id].attributes["stale_fields"] == [
+        TIER_CONNECTIVITY
+    ]
+    # Connectivity is due again on the next refresh
+    assert TIER_CONNECTIVITY not in coordinator.tier_refreshed_at
+
+
+# Test an account with many pods is polled in full through the rate limiter
+@pytest.mark.asyncio
+async def test_coordinator_many_pods_converge(hass, bypass_get_data):
+    """Test every pod is refreshed within the deadline, through a shared limiter."""
+    pods = build_pods(100)
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(
+        CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+    )
+
+    async def get_connectivity_status(pod):
+        await asyncio.sleep(0.001)
+        return connectivity_status
+
+    # Polls are a scan interval apart, the limiter refills in between
+    polled_at = 0.0
+    limiter = RateLimiter(clock=lambda: time.monotonic() + polled_at)
+    session = async_get_clientsession(hass)
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=RateLimitedClient(
+            PodPointClient(username="test", password="test", session=session),
+            limiter,
+        ),
+        scan_interval=timedelta(seconds=300),
+        rate_limiter=limiter,
+    )
+
+    with patch("custom_components.pod_point.coordinator.REFRESH_DEADLINE", 2), patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        side_effect=lambda **kwargs: build_pods(100),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_connectivity_status",
+        side_effect=get_connectivity_status,
+    ):
+        for _ in range(3):
+            coordinator.async_mark_tiers_due(*TIERS)
+            await coordinator.async_refresh()
+            polled_at += 300
+
+            assert coordinator.last_update_success is True
+            assert coordinator.stale_fields == {}
+            assert len(coordinator.data) == 100
+            assert all(pod.connectivity_status is not None for pod in coordinator.data)
+
+    assert limiter.burst >= 2 * len(pods)
+    assert limiter.rejected_requests == 0
+
+
+# Test pods are kept by unit id, whatever order Pod Point returns them in
+@pytest.mark.asyncio
+async def test_coordinator_pod_registry(hass, bypass_get_data):
+    """Test the registry is updated in place as pods are reordered and removed."""
+    pods = build_pods(3)
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ):
+        await coordinator.async_refresh()
+
+    registry = coordinator.pod_registry
+    assert list(registry.keys()) == [pod.unit_id for pod in pods]
+
+    reordered = build_pods(3)[::-1]
+    reordered[0].ppid = "PSL-REORDERED"
+    coordinator.async_mark_tiers_due(TIER_PODS)
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=reordered,
+    ):
+        await coordinator.async_refresh()
+
+    assert coordinator.pod_registry is registry
+    assert registry[pods[2].unit_id].ppid == "PSL-REORDERED"
+    assert coordinator.view_models[pods[2].unit_id].unit_id == pods[2].unit_id
+
+    # A pod removed from the account is missing until it has been missed enough
+    # times in a row, then dropped. The others are kept.
+    for missed in range(1, POD_RETIRE_AFTER + 1):
+        coordinator.async_mark_tiers_due(TIER_PODS)
+        with patch(
+            "podpointclient.client.PodPointClient.async_get_all_pods",
+            return_value=build_pods(2),
+        ):
+            await coordinator.async_refresh()
+
+        assert coordinator.last_update_success is True
+        if missed < POD_RETIRE_AFTER:
+            assert coordinator.missing_pods == {pods[2].unit_id: missed}
+            assert pods[2].unit_id in registry
+
+        # Refreshes that do not fetch the pods do not count
+        await coordinator.async_refresh()
+
+    assert coordinator.missing_pods == {}
+    assert pods[2].unit_id not in registry
+    assert set(coordinator.view_models.keys()) == set(registry.keys())
+
+    # A pod that comes back before it is dropped is no longer missing
+    coordinator.async_mark_tiers_due(TIER_PODS)
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=build_pods(1),
+    ):
+        await coordinator.async_refresh()
+    assert coordinator.missing_pods == {pods[1].unit_id: 1}
+
+    coordinator.async_mark_tiers_due(TIER_PODS)
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=build_pods(2),
+    ):
+        await coordinator.async_refresh()
+    assert coordinator.missing_pods == {}
+    assert len(registry) == 2
+
+    await coordinator.async_shutdown()
+
+
+# Test tiers that nothing reads are not fetched
+@pytest.mark.asyncio
+async def test_coordinator_demanded_tiers(hass, bypass_get_data):
+    """Test only the tiers registered by consumers are fetched, and that charges
+    are caught up on in full once something reads them again."""
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    # Before anything registers, every tier is fetched
+    assert coordinator.demanded_tiers == set(TIERS)
+    await coordinator.async_refresh()
+
+    remove_demand = coordinator.async_add_tier_demand({TIER_CONNECTIVITY})
+    assert coordinator.demanded_tiers == {TIER_PODS, TIER_CONNECTIVITY}
+
+    firmwares = FirmwareFactory().build_firmwares(FIRMWARE_COMPLETE_FIXTURE)
+    charges = ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE)
+    coordinator.async_mark_tiers_due(*TIERS)
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_firmware",
+        return_value=firmwares,
+    ) as firmware_mock, patch(
+        "podpointclient.client.PodPointClient.async_get_user"
+    ) as user_mock, patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=charges,
+    ) as charges_mock:
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success is True
+        assert coordinator.refreshed_tiers == {TIER_PODS, TIER_CONNECTIVITY}
+        firmware_mock.assert_not_called()
+        user_mock.assert_not_called()
+        charges_mock.assert_not_called()
+
+        # Charges were missed while nothing read them, they are all fetched again
+        remove_charges_demand = coordinator.async_add_tier_demand({TIER_CHARGES})
+        await coordinator.async_refresh()
+        charges_mock.assert_called_once()
+        assert charges_mock.call_args.kwargs["perpage"] == 50
+
+        coordinator.async_mark_tiers_due(TIER_CHARGES)
+        await coordinator.async_refresh()
+        assert charges_mock.call_count == 2
+        assert charges_mock.call_args.kwargs["perpage"] == 3
+
+    remove_charges_demand()
+    remove_demand()
+    assert coordinator.demanded_tiers == set(TIERS)
+
+    await coordinator.async_shutdown()
+
+
+# Test the last good data is served through failed refreshes, for a while
+@pytest.mark.asyncio
+async def test_coordinator_serves_stale_data(hass, bypass_get_data):
+    """Test data stays available until too many refreshes fail in a row."""
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+    coordinator.stale_failures = 2
+    await coordinator.async_refresh()
+    assert coordinator.data_available is True
+    assert coordinator.data_age is None
+
+    coordinator.async_update_listeners = MagicMock()
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        side_effect=ApiConnectionError("down"),
+    ):
+        coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+        await coordinator.async_refresh()
+
+        # Still shown, with its age, and listeners told about every failure
+        assert coordinator.online is False
+        assert coordinator.data_available is True
+        assert coordinator.data_age is not None
+        assert coordinator.view_models[coordinator.pods[0].unit_id].attributes[
+            "data_age"
+        ] == (coordinator.data_age)
+        coordinator.async_update_listeners.assert_called()
+
+        coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+        await coordinator.async_refresh()
+        assert coordinator.consecutive_failures == 2
+        assert coordinator.data_available is False
+
+    # Too old to show, however few refreshes failed
+    coordinator.consecutive_failures = 1
+    coordinator.last_success_at = dt_util.utcnow() - timedelta(hours=2)
+    assert coordinator.data_available is False
+
+    # A successful refresh clears the age
+    coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+    await coordinator.async_refresh()
+    assert coordinator.data_available is True
+    assert coordinator.consecutive_failures == 0
+    assert (
+        "data_age"
+        not in coordinator.view_models[coordinator.pods[0].unit_id].attributes
+    )
+
+    await coordinator.async_shutdown()
+
+
+# Test that firmware is fetched concurrently, within the concurrency cap
+@pytest.mark.asyncio
+async def test_coordinator_firmware_concurrency(hass, bypass_get_data):
+    """Test firmware calls are bounded by api_concurrency."""
+    pods = build_pods(5)
+    firmware = FirmwareFactory().build_firmwares(FIRMWARE_COMPLETE_FIXTURE)
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get_firmware(pod):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return firmware
+
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+    coordinator.api_concurrency = 3
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_firmware",
+        side_effect=get_firmware,
+    ):
+        await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert max_in_flight == 3
+    assert all(pod.firmware is not None for pod in coordinator.data)
+
+
+# Test that independent refresh stages overlap
+@pytest.mark.asyncio
+async def test_coordinator_refresh_stages_overlap(hass, bypass_get_data):
+    """Test user, pods and charges are fetched concurrently and timed."""
+    pods = build_pods(1)
+    user = UserFactory().build_user(USER_COMPLETE_FIXTURE)
+    charges = ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE)
+
+    def delayed(result):
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return result
+
+        return call
+
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_user",
+        side_effect=delayed(user),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        side_effect=delayed(pods),
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        side_effect=delayed(charges),
+    ):
+        started = time.monotonic()
+        await coordinator.async_refresh()
+        elapsed = time.monotonic() - started
+
+    assert coordinator.last_update_success is True
+    assert {"user", "pods", "charges", "connectivity", "firmware"} <= set(
+        coordinator.stage_timings
+    )
+    assert coordinator.critical_path in ("user", "pods", "charges")
+
+    # The three independent stages ran side by side, not one after another
+    timings = coordinator.stage_timings
+    assert timings["user"] + timings["pods"] + timings["charges"] >= 0.15
+    assert elapsed < 0.15
+
+
+# Test that each tier is only refreshed when it is due
+@pytest.mark.asyncio
+async def test_coordinator_tiered_refresh(hass, bypass_get_data):
+    """Test tiers refresh on their own intervals."""
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_user",
+        return_value=UserFactory().build_user(USER_COMPLETE_FIXTURE),
+    ) as get_user, patch(
+        "podpointclient.client.PodPointClient.async_get_firmware",
+        return_value=FirmwareFactory().build_firmwares(FIRMWARE_COMPLETE_FIXTURE),
+    ) as get_firmware, patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        side_effect=lambda *args, **kwargs: build_pods(1),
+    ) as get_all_pods, patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=ChargeFactory().build_charges(CHARGES_COMPLETE_FIXTURE),
+    ) as get_charges:
+        # The first refresh pulls every tier, every charge fits on one page
+        await coordinator.async_refresh()
+        assert coordinator.refreshed_tiers == set(TIERS)
+        assert get_user.call_count == 1
+        assert get_firmware.call_count == 1
+        assert get_charges.call_count == 1
+        assert get_charges.call_args.kwargs["perpage"] == 50
+
+        # Nothing is due straight after, so nothing is fetched
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success is True
+        assert coordinator.refreshed_tiers == set()
+        assert get_user.call_count == 1
+        assert get_all_pods.call_count == 1
+        assert get_charges.call_count == 1
+
+        # Charge totals are rebuilt, not added to, when pods are reused
+        pod = coordinator.data[0]
+        assert len(pod.charges) == 9
+        assert pod.last_charge_cost == 116
+
+        # Only the connectivity tier is due
+        coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+        await coordinator.async_refresh()
+        assert coordinator.refreshed_tiers == {TIER_CONNECTIVITY}
+        assert get_all_pods.call_count == 2
+        assert get_all_pods.call_args.kwargs["includes"] == LIMITED_POD_INCLUDES
+        assert get_user.call_count == 1
+        assert get_firmware.call_count == 1
+        assert get_charges.call_count == 1
+
+        # Only the charges tier is due
+        coordinator.async_mark_tiers_due(TIER_CHARGES)
+        await coordinator.async_refresh()
+        assert coordinator.refreshed_tiers == {TIER_CHARGES}
+        assert get_all_pods.call_count == 2
+        assert get_charges.call_count == 2
+        assert get_charges.call_args.kwargs["perpage"] == 3
+        assert len(coordinator.data[0].charges) == 9
+
+    # The next refresh is scheduled for whichever tier is due soonest
+    assert coordinator.update_interval <= min(
+        coordinator.tier_interval(tier) for tier in TIERS
+    )
+
+
+@pytest.mark.asyncio
+async def test_coordinator_adaptive_polling(hass, bypass_get_data):
+    """Test polling speeds up while pods are active and backs off while idle."""
+    coordinator: PodPointDataUpdateCoordinator = await subject(hass)
+    state = "available"
+
+    with patch(
+        "custom_components.pod_point.view_model.resolve_pod_state",
+        side_effect=lambda *args: state,
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        return_value=[],
+    ):
+        await coordinator.async_refresh()
+        assert coordinator.pods_active is False
+        assert coordinator.tier_interval(TIER_CHARGES) == timedelta(seconds=300)
+
+        # Each idle refresh doubles the interval, up to the maximum
+        intervals = []
+        for _ in range(4):
+            coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+            await coordinator.async_refresh()
+            intervals.append(coordinator.tier_interval(TIER_CHARGES).total_seconds())
+        assert intervals == [600, 1200, 1800, 1800]
+
+        # Tiers that are not adaptive keep their interval
+        assert coordinator.tier_interval(TIER_USER) == timedelta(seconds=3600)
+
+        # A charging pod drops to the minimum interval
+        state = "charging"
+        coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+        await coordinator.async_refresh()
+        assert coordinator.pods_active is True
+        assert coordinator.idle_polls == 0
+        assert coordinator.tier_interval(TIER_CONNECTIVITY) == timedelta(seconds=60)
+        assert coordinator.update_interval <= timedelta(seconds=60)
+
+    coordinator.adaptive_polling = False
+    assert coordinator.tier_interval(TIER_CONNECTIVITY) == timedelta(seconds=3000)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_charging_transition(hass, freezer):
+    """Test pods are re-resolved when a schedule starts, without a refresh."""
+    freezer.move_to(dt_util.as_local(dt_util.parse_datetime("2022-01-03T01:00:00")))
+    coordinator: PodPointDataUpdateCoordinator = await subject_with_data(hass)
+    coordinator.pods[0].charge_schedules = [
+        Schedule(day, "02:00:00", day, "07:00:00", ScheduleStatus(is_active=True))
+        for day in range(1, 8)
+    ]
+    coordinator.update_view_models()
+    coordinator._PodPointDataUpdateCoordinator__schedule_charging_transition()
+
+    assert (
+        coordinator.view_models[coordinator.pods[0].unit_id].charging_allowed is False
+    )
+    assert coordinator.next_charging_transition == dt_util.as_local(
+        dt_util.parse_datetime("2022-01-03T02:00:00")
+    )
+
+    coordinator.async_update_listeners = MagicMock()
+
+    freezer.tick(timedelta(hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert coordinator.view_models[coordinator.pods[0].unit_id].charging_allowed is True
+    assert coordinator.changed_unit_ids == {coordinator.pods[0].unit_id}
+    assert coordinator.refreshed_tiers == {TIER_PODS}
+    coordinator.async_update_listeners.assert_called_once()
+
+    # The next transition is when the schedule ends
+    assert coordinator.next_charging_transition == dt_util.as_local(
+        dt_util.parse_datetime("2022-01-03T07:00:01")
+    )
+    await coordinator.async_shutdown()
+    assert coordinator.next_charging_transition is None
+
+
+@pytest.mark.asyncio
+async def test_coordinator_command_sent(hass):
+    """Test commands are shown straight away and confirmed by refreshing the pod."""
+    coordinator: PodPointDataUpdateCoordinator = await subject_with_data(hass)
+    coordinator.async_update_listeners = MagicMock()
+    pod = coordinator.pods[0]
+
+    fixture = copy.deepcopy(CONNECTIVITY_STATUS_COMPLETE_FIXTURE)
+    fixture["evses"][0]["connectivityState"]["lastMessageAt"] = "2099-01-01T00:00:00Z"
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(fixture)
+
+    with patch.object(
+        coordinator.api,
+        "async_get_connectivity_status",
+        return_value=connectivity_status,
+    ) as connectivity_mock, patch.object(
+        coordinator.api, "async_get_charge_override", return_value=None
+    ), patch.object(
+        coordinator, "async_request_tier_refresh"
+    ) as refresh_mock:
+        coordinator.async_command_sent(pod, set_charge_override(None))
+
+        assert pod.charge_override is None
+        assert coordinator.view_models[pod.unit_id].charge_override is None
+        assert coordinator.refreshed_tiers == {TIER_PODS, TIER_CONNECTIVITY}
+        coordinator.async_update_listeners.assert_called_once()
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    # Confirmed on the first refresh, without a full refresh
+    connectivity_mock.assert_called_once_with(pod=pod)
+    refresh_mock.assert_not_called()
+    assert pod.last_message_at == connectivity_status.last_message_at
+    assert coordinator.refreshed_tiers == {TIER_CONNECTIVITY}
+    assert coordinator._unconfirmed == {}
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_command_unconfirmed(hass):
+    """Test a full refresh is requested when the pod does not report in."""
+    coordinator: PodPointDataUpdateCoordinator = await subject_with_data(hass)
+    coordinator.async_update_listeners = MagicMock()
+    pod = coordinator.pods[0]
+
+    connectivity_status = ConnectivityStatusFactory().build_connectivity_status(
+        CONNECTIVITY_STATUS_COMPLETE_FIXTURE
+    )
+
+    with patch.object(
+        coordinator.api,
+        "async_get_connectivity_status",
+        return_value=connectivity_status,
+    ) as connectivity_mock, patch.object(
+        coordinator.api, "async_get_charge_override", return_value=None
+    ), patch.object(
+        coordinator, "async_request_tier_refresh"
+    ) as refresh_mock:
+        coordinator.async_command_sent(pod)
+        for attempt in range(1, COMMAND_CONFIRM_ATTEMPTS + 1):
+            async_fire_time_changed(
+                hass, dt_util.utcnow() + timedelta(seconds=10 * attempt)
+            )
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert connectivity_mock.call_count == COMMAND_CONFIRM_ATTEMPTS
+    refresh_mock.assert_called_once_with(TIER_PODS, TIER_CONNECTIVITY)
+    assert coordinator._unconfirmed == {}
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_pod_refresh_coalesced(hass):
+    """Test pod refreshes requested within the window share one refresh."""
+    coordinator: PodPointDataUpdateCoordinator = await subject_with_data(hass)
+    coordinator.async_update_listeners = MagicMock()
+    pods = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE] * 3})
+    for unit_id, pod in enumerate(pods):
+        pod.unit_id = unit_id
+    coordinator.pods = pods
+    coordinator.update_view_models()
+
+    with patch.object(
+        coordinator.api, "async_get_connectivity_status", return_value=None
+    ) as connectivity_mock, patch.object(
+        coordinator.api, "async_get_charge_override", return_value=None
+    ) as override_mock:
+        coordinator.async_request_pod_refresh(0)
+        coordinator.async_request_pod_refresh(1)
+        coordinator.async_request_pod_refresh(0)
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    # Only the requested pods, once each
+    assert [call.kwargs["pod"] for call in connectivity_mock.call_args_list] == pods[:2]
+    assert override_mock.call_count == 2
+    assert coordinator.pod_refresh_requests == 3
+    assert coordinator.pod_refreshes == 1
+    assert coordinator.coalesced_pod_refreshes == 2
+    await coordinator.async_shutdown()
+
+
 # TODO: Add a test for repair flow creation and cleanup
@@ -0,0 +1,49 @@
+"""Test pod_point diagnostics."""
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.pod_point.const import DOMAIN, TIER_CONNECTIVITY, TIERS
+from custom_components.pod_point.diagnostics import async_get_config_entry_diagnostics
+
+from .const import MOCK_CONFIG
+
+
+@pytest.mark.asyncio
+async def test_config_entry_diagnostics(hass, bypass_get_data):
+    """Test diagnostics report state writes without credentials"""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(config_entry.entry_id)
+
+    # The first update after being added is written, later ones only on change
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    await coordinator.async_refresh()
+    written = coordinator.state_writes
+    coordinator.async_mark_tiers_due(TIER_CONNECTIVITY)
+    await coordinator.async_refresh()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["entry"]["data"]["password"] == "**REDACTED**"
+    assert diagnostics["entry"]["data"]["email"] == "**REDACTED**"
+    assert diagnostics["coordinator"]["online"] is True
+    assert diagnostics["coordinator"]["pods"] == 1
+    assert diagnostics["coordinator"]["consecutive_failures"] == 0
+    assert diagnostics["coordinator"]["data_age"] is None
+    # Every entity is enabled, between them they read every tier
+    assert diagnostics["coordinator"]["demanded_tiers"] == sorted(TIERS)
+
+    state_writes = diagnostics["state_writes"]
+    # Only the remaining request budget changed
+    assert state_writes["written"] == written + 1
+    assert state_writes["suppressed"] > 0
+    assert state_writes["changed_pods"] == []
+    assert diagnostics["pod_refreshes"]["requested"] == 0
+    assert diagnostics["commands"]["queued"] == 0
+    rate_limit = diagnostics["rate_limit"]
+    assert rate_limit["remaining_budget"] < rate_limit["hourly_budget"]
+    assert rate_limit["burst"] > 10
+    assert diagnostics["commands"]["latency"]["mean"] is None
+
+    await hass.config_entries.async_unload(config_entry.entry_id)
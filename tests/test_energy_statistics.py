@@ -0,0 +1,162 @@
+"""Test pod_point energy statistics import."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from homeassistant.components.recorder.statistics import valid_statistic_id
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from podpointclient.charge import Charge
+from podpointclient.client import PodPointClient
+from podpointclient.factories import PodFactory
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.pod_point.charge_store import ChargeStore
+from custom_components.pod_point.const import CONF_CURRENCY, DOMAIN
+from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+from custom_components.pod_point.energy_statistics import (
+    EnergyStatisticsImporter,
+    hourly_usage,
+)
+
+from .fixtures import POD_COMPLETE_FIXTURE
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def build_charge(charge_id, starts_at, ends_at, kwh_used, energy_cost):
+    """Build a home charge on the fixture pod"""
+    return Charge(
+        data={
+            "id": charge_id,
+            "kwh_used": kwh_used,
+            "starts_at": starts_at,
+            "ends_at": ends_at,
+            "energy_cost": energy_cost,
+            "location": {"home": True},
+            "pod": {"id": 123456},
+        }
+    )
+
+
+CHARGES = [
+    build_charge(3, "2022-01-02T09:00:00Z", None, 1.0, None),
+    build_charge(2, "2022-01-01T18:00:00Z", "2022-01-01T18:00:00Z", 0.5, 10),
+    build_charge(1, "2022-01-01T10:30:00Z", "2022-01-01T12:30:00Z", 4.0, 200),
+]
+
+
+def hour(day, hour_of_day):
+    """An hour on a day in January 2022"""
+    return datetime(2022, 1, day, hour_of_day, tzinfo=timezone.utc)
+
+
+def test_hourly_usage():
+    """Test charges are spread over the hours they ran for"""
+    usage = hourly_usage(CHARGES, EPOCH, hour(3, 0))
+
+    assert sorted(usage) == [hour(1, 10), hour(1, 11), hour(1, 12), hour(1, 18)]
+    assert usage[hour(1, 10)].kwh == 1.0
+    assert usage[hour(1, 11)].kwh == 2.0
+    assert usage[hour(1, 12)].kwh == 1.0
+    assert usage[hour(1, 11)].cost == 100
+    assert usage[hour(1, 18)].kwh == 0.5
+
+    # Only hours in the window are returned
+    usage = hourly_usage(CHARGES, hour(1, 11), hour(1, 12))
+    assert sorted(usage) == [hour(1, 11)]
+
+
+@pytest.mark.asyncio
+async def test_statistics_import(hass):
+    """Test statistics are imported, and continue from the last imported hour"""
+    client = PodPointClient(
+        username="test@example.com",
+        password="password",
+        session=async_get_clientsession(hass),
+    )
+    coordinator = PodPointDataUpdateCoordinator(
+        hass, client=client, scan_interval=timedelta(seconds=300)
+    )
+    coordinator.pods = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE]})
+    coordinator.home_charges = ChargeStore(CHARGES)
+
+    importer = EnergyStatisticsImporter(hass, coordinator, "GBP")
+    recorder = MagicMock()
+    last_stats = {}
+
+    async def async_add_executor_job(func, *args):
+        return last_stats
+
+    recorder.async_add_executor_job = async_add_executor_job
+
+    with patch(
+        "custom_components.pod_point.energy_statistics.get_instance",
+        return_value=recorder,
+    ), patch(
+        "custom_components.pod_point.energy_statistics.async_add_external_statistics"
+    ) as add_statistics, patch(
+        "custom_components.pod_point.energy_statistics.dt_util.utcnow",
+        return_value=hour(3, 0),
+    ):
+        await importer.async_import()
+
+        # The ongoing charge holds back hours from when it started
+        assert add_statistics.call_count == 2
+        energy_meta, energy_stats = add_statistics.call_args_list[0].args[1:]
+        cost_meta, cost_stats = add_statistics.call_args_list[1].args[1:]
+        assert energy_meta["statistic_id"] == "pod_point:123456_energy"
+        assert energy_meta["unit_of_measurement"] == "kWh"
+        assert cost_meta["statistic_id"] == "pod_point:123456_cost_gbp"
+        assert cost_meta["unit_of_measurement"] == "GBP"
+        assert [stat["sum"] for stat in energy_stats] == [1.0, 3.0, 4.0, 4.5]
+        assert [stat["sum"] for stat in cost_stats] == [0.5, 1.5, 2.0, 2.1]
+
+        # Once the last hour is imported, only later hours are
+        last_stats = {
+            "pod_point:123456_energy": [{"start": hour(1, 12).timestamp(), "sum": 4.0}],
+            "pod_point:123456_cost_gbp": [
+                {"start": hour(1, 12).timestamp(), "sum": 2.0}
+            ],
+        }
+        add_statistics.reset_mock()
+        await importer.async_import()
+
+        energy_stats = add_statistics.call_args_list[0].args[2]
+        assert [stat["start"] for stat in energy_stats] == [hour(1, 18)]
+        assert [stat["sum"] for stat in energy_stats] == [4.5]
+
+        # Costs in a new currency go to a new statistic, backfilled from the start
+        coordinator.data = {}
+        add_statistics.reset_mock()
+        await importer.async_update_options(
+            hass, MockConfigEntry(domain=DOMAIN, options={CONF_CURRENCY: "EUR"})
+        )
+        await hass.async_block_till_done()
+
+        assert add_statistics.call_count == 2
+        energy_stats = add_statistics.call_args_list[0].args[2]
+        cost_meta, cost_stats = add_statistics.call_args_list[1].args[1:]
+        assert [stat["start"] for stat in energy_stats] == [hour(1, 18)]
+        assert cost_meta["statistic_id"] == "pod_point:123456_cost_eur"
+        assert cost_meta["unit_of_measurement"] == "EUR"
+        assert [stat["sum"] for stat in cost_stats] == [0.5, 1.5, 2.0, 2.1]
+
+        # Saving the options again without changing the currency imports nothing
+        add_statistics.reset_mock()
+        await importer.async_update_options(
+            hass, MockConfigEntry(domain=DOMAIN, options={CONF_CURRENCY: "EUR"})
+        )
+        await hass.async_block_till_done()
+        assert add_statistics.call_count == 0
+
+        # A currency saved before they were validated still gives a valid id
+        add_statistics.reset_mock()
+        await importer.async_update_options(
+            hass, MockConfigEntry(domain=DOMAIN, options={CONF_CURRENCY: "US$ "})
+        )
+        await hass.async_block_till_done()
+
+        cost_meta = add_statistics.call_args_list[1].args[1]
+        assert cost_meta["statistic_id"] == "pod_point:123456_cost_us"
+        assert valid_statistic_id(cost_meta["statistic_id"])
@@ -17,9 +17,14 @@ from homeassistant.const import (
     ATTR_ENTITY_ID,
     DEVICE_CLASS_ENERGY,
     ENERGY_KILO_WATT_HOUR,
+    STATE_UNAVAILABLE,
 )
 import homeassistant.helpers.aiohttp_client as client
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 from podpointclient.charge_mode import ChargeMode
+from podpointclient.factories import FirmwareFactory, PodFactory
 from podpointclient.pod import Pod
 from podpointclient.schedule import Schedule, ScheduleStatus
 import pytest
@@ -34,10 +39,15 @@ from custom_components.pod_point.const import (
     ATTR_STATE_UNAVAILABLE,
     DEFAULT_NAME,
     DOMAIN,
+    POD_RETIRE_AFTER,
     SENSOR,
     SWITCH,
+    TIER_CONNECTIVITY,
+    TIER_PODS,
+    TIER_USER,
 )
 from custom_components.pod_point.entity import PodPointEntity
+from custom_components.pod_point.state import charging_allowed
 from custom_components.pod_point.sensor import (
     PodPointSensor,
     PodPointTotalEnergySensor,
@@ -45,7 +55,7 @@ from custom_components.pod_point.sensor import (
 )
 
 from .const import MOCK_CONFIG
-from .fixtures import POD_COMPLETE_FIXTURE
+from .fixtures import FIRMWARE_COMPLETE_FIXTURE, POD_COMPLETE_FIXTURE
 from .test_coordinator import subject_with_data as coordinator_with_data
 
 
@@ -56,7 +66,7 @@ async def setup_entity(hass) -> Pod:
     # Create a mock entry so we don't have to go through config flow
     config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
 
-    return PodPointEntity(coordinator, config_entry, 0)
+    return PodPointEntity(coordinator, config_entry, coordinator.pods[0].unit_id)
 
 
 @pytest.mark.asyncio
@@ -64,7 +74,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
     """Test attributes of a PodPointEntity"""
     entity: PodPointEntity = await setup_entity(hass)
 
-    assert 0 == entity.pod_id
+    assert 123456 == entity.pod_unit_id
 
     assert Pod == type(entity.pod)
     assert "pod_point_12234_PSL-123456" == entity.unique_id
@@ -73,6 +83,16 @@ async def test_pod_point_entity(hass, bypass_get_data):
     entity.coordinator.online = False
     assert False is entity.available
 
+    # Failed refreshes keep showing data fetched recently enough
+    entity.coordinator.last_success_at = dt_util.utcnow()
+    entity.coordinator.consecutive_failures = 1
+    assert True is entity.available
+
+    entity.coordinator.consecutive_failures = 3
+    assert False is entity.available
+
+    entity.coordinator.last_success_at = None
+    entity.coordinator.consecutive_failures = 0
     entity.coordinator.online = True
 
     assert {
@@ -224,13 +244,13 @@ async def test_pod_point_entity(hass, bypass_get_data):
     # With no schedules
     schedules = entity.pod.charge_schedules
     entity.pod.charge_schedules = []
-    assert True is entity.charging_allowed
+    assert True is charging_allowed(entity.pod)
 
     # With no schedule for the current day
     entity.pod.charge_schedules = [
         Schedule(9, "00:00:00", 9, "00:00:01", ScheduleStatus(is_active=True))
     ]
-    assert False is entity.charging_allowed
+    assert False is charging_allowed(entity.pod)
 
     # With is_active as None
     entity.pod.charge_schedules = [
@@ -242,7 +262,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 1, "00:00:01", ScheduleStatus(is_active=None)),
         Schedule(7, "00:00:00", 1, "00:00:01", ScheduleStatus(is_active=None)),
     ]
-    assert False is entity.charging_allowed
+    assert False is charging_allowed(entity.pod)
 
     # With is_active as False
     entity.pod.charge_schedules = [
@@ -254,7 +274,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 1, "00:00:01", ScheduleStatus(is_active=False)),
         Schedule(7, "00:00:00", 1, "00:00:01", ScheduleStatus(is_active=False)),
     ]
-    assert True is entity.charging_allowed
+    assert True is charging_allowed(entity.pod)
 
     # With is_active as True, and within the charge time
     entity.pod.charge_schedules = [
@@ -266,7 +286,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 1, "23:59:59", ScheduleStatus(is_active=True)),
         Schedule(7, "00:00:00", 1, "23:59:59", ScheduleStatus(is_active=True)),
     ]
-    assert True is entity.charging_allowed
+    assert True is charging_allowed(entity.pod)
 
     # With is_active as True, and outside the charge time
     entity.pod.charge_schedules = [
@@ -278,7 +298,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 6, "00:00:00", ScheduleStatus(is_active=True)),
         Schedule(7, "00:00:00", 7, "00:00:00", ScheduleStatus(is_active=True)),
     ]
-    assert False is entity.charging_allowed
+    assert False is charging_allowed(entity.pod)
 
     # With end_day wrapping round
     entity.pod.charge_schedules = [
@@ -290,7 +310,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 5, "00:00:00", ScheduleStatus(is_active=True)),
         Schedule(7, "00:00:00", 6, "00:00:00", ScheduleStatus(is_active=True)),
     ]
-    assert True is entity.charging_allowed
+    assert True is charging_allowed(entity.pod)
 
     # With end_day rolling forward
     entity.pod.charge_schedules = [
@@ -302,7 +322,7 @@ async def test_pod_point_entity(hass, bypass_get_data):
         Schedule(6, "00:00:00", 7, "00:00:00", ScheduleStatus(is_active=True)),
         Schedule(7, "00:00:00", 8, "00:00:00", ScheduleStatus(is_active=True)),
     ]
-    assert True is entity.charging_allowed
+    assert True is charging_allowed(entity.pod)
 
     # Reset schedules
     entity.pod.charge_schedules = schedules
@@ -330,26 +350,31 @@ async def test_pod_point_entity(hass, bypass_get_data):
     # Test states for ev and evse suspended
     assert "charging" == entity.state
     entity.pod.charging_state = "suspended-ev"
+    entity.coordinator.update_view_models()
     entity._PodPointEntity__update_attrs()
     assert entity.state == "suspended-ev"
 
     entity.pod.charging_state = "suspended-evse"
+    entity.coordinator.update_view_models()
     entity._PodPointEntity__update_attrs()
     assert entity.state == "suspended-evse"
 
     entity.pod.statuses[0].key_name = "available"
     entity.pod.charging_state = "suspended-evse"
+    entity.coordinator.update_view_models()
     entity._PodPointEntity__update_attrs()
     assert entity.state == "available"
 
     entity.pod.statuses[0].key_name = "out-of-service"
     entity.pod.charging_state = "suspended-evse"
+    entity.coordinator.update_view_models()
     entity._PodPointEntity__update_attrs()
     assert entity.state == "out-of-service"
 
     # Test pending status
     entity.coordinator.last_message_at = datetime.now(tz=pytz.utc)
     entity.pod.last_message_at = datetime.now(tz=pytz.utc) - timedelta(minutes=5)
+    entity.coordinator.update_view_models()
     entity._PodPointEntity__update_attrs()
     assert entity.state == "pending"
 
@@ -379,3 +404,122 @@ async def test_compare_state(hass, bypass_get_data):
     assert ATTR_STATE_OUT_OF_SERVICE == entity.compare_state(
         ATTR_STATE_OUT_OF_SERVICE, ATTR_STATE_AVAILABLE
     )
+
+
+@pytest.mark.asyncio
+async def test_should_handle_update(hass, bypass_get_data):
+    """Test entities only update when a tier they read from is refreshed"""
+    entity: PodPointEntity = await setup_entity(hass)
+    entity.coordinator.refreshed_tiers = set()
+
+    # Availability has not been seen yet, so the first update is always handled
+    assert True is entity._should_handle_update()
+    assert False is entity._should_handle_update()
+
+    entity.coordinator.refreshed_tiers = {TIER_USER}
+    assert False is entity._should_handle_update()
+
+    # Nothing it renders has changed since it was written
+    entity.coordinator.refreshed_tiers = {TIER_CONNECTIVITY}
+    assert False is entity._should_handle_update()
+
+    # A refresh that leaves the pod unchanged is not written
+    entity.coordinator.update_view_models()
+    assert set() == entity.coordinator.changed_unit_ids
+    assert False is entity._should_handle_update()
+
+    entity.pod.charging_state = "suspended-ev"
+    entity.coordinator.update_view_models()
+    assert {123456} == entity.coordinator.changed_unit_ids
+    assert True is entity._should_handle_update()
+
+    # A change in availability is always handled
+    entity.coordinator.refreshed_tiers = set()
+    entity.coordinator.online = False
+    assert True is entity._should_handle_update()
+
+    assert 3 == entity.coordinator.state_writes
+    assert 4 == entity.coordinator.suppressed_state_writes
+
+
+@pytest.mark.asyncio
+async def test_pods_added_and_removed(hass, bypass_get_data):
+    """Test entities are added for pods that appear on the account, and retired for
+    those that leave it along with their device, without touching the entities of
+    other pods."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    registry = er.async_get(hass)
+    first_status = registry.async_get("sensor.psl_123456_status")
+    assert first_status is not None
+    assert hass.states.get("sensor.psl_654321_status") is None
+
+    second_pod = dict(POD_COMPLETE_FIXTURE)
+    second_pod.update({"id": 54321, "ppid": "PSL-654321", "unit_id": 654321})
+    pods = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE, second_pod]})
+
+    def firmware_for(pod):
+        firmware = dict(FIRMWARE_COMPLETE_FIXTURE["data"][0])
+        firmware["serial_number"] = str(pod.unit_id)
+        return FirmwareFactory().build_firmwares({"data": [firmware]})
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods", return_value=pods
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_firmware",
+        side_effect=firmware_for,
+    ):
+        coordinator.async_mark_tiers_due(TIER_PODS)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.psl_654321_status") is not None
+    assert hass.states.get("switch.psl_654321_charging_allowed") is not None
+    assert hass.states.get("binary_sensor.psl_654321_cable_status") is not None
+    assert hass.states.get("update.psl_654321_firmware_update") is not None
+    # The first pod's entities were left alone, and the balance is not duplicated
+    assert registry.async_get("sensor.psl_123456_status") == first_status
+    assert hass.states.get("sensor.pod_point_balance_2") is None
+
+    device_registry = dr.async_get(hass)
+    first_device_id = first_status.device_id
+    assert device_registry.async_get(first_device_id) is not None
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        return_value=pods[1:],
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_firmware",
+        side_effect=firmware_for,
+    ):
+        # A pod missing from the account is unavailable, until it has been missed
+        # enough times to be retired
+        for _ in range(POD_RETIRE_AFTER - 1):
+            coordinator.async_mark_tiers_due(TIER_PODS)
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+
+            assert hass.states.get("sensor.psl_123456_status").state == (
+                STATE_UNAVAILABLE
+            )
+            assert registry.async_get("sensor.psl_123456_status") is not None
+            assert hass.states.get("sensor.psl_654321_status").state != (
+                STATE_UNAVAILABLE
+            )
+
+        coordinator.async_mark_tiers_due(TIER_PODS)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.psl_123456_status") is None
+    assert registry.async_get("sensor.psl_123456_status") is None
+    assert device_registry.async_get(first_device_id) is None
+    assert registry.async_get("switch.psl_123456_charging_allowed") is None
+    assert hass.states.get("sensor.psl_654321_status") is not None
+    assert hass.states.get("sensor.pod_point_balance") is not None
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
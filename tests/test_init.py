@@ -1,6 +1,10 @@
 """Test pod_point setup process."""
 
+from datetime import timedelta
+from unittest.mock import patch
+
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
@@ -10,7 +14,19 @@ from custom_components.pod_point import (
     async_setup_entry,
     async_unload_entry,
 )
-from custom_components.pod_point.const import DOMAIN
+from custom_components.pod_point.const import (
+    CHARGE_CACHE_KEY,
+    CONF_CURRENCY,
+    CONF_HTTP_DEBUG,
+    CONF_SCAN_INTERVAL,
+    DOMAIN,
+    SENSOR,
+    SNAPSHOT_KEY,
+    SWITCH,
+    TIER_CHARGES,
+    TIER_CONNECTIVITY,
+    TIERS,
+)
 
 from .const import MOCK_CONFIG
 
@@ -60,3 +76,126 @@ async def test_setup_entry_exception(hass, error_on_get_data):
     # an error.
     with pytest.raises(ConfigEntryNotReady):
         assert await async_setup_entry(hass, config_entry)
+
+
+@pytest.mark.asyncio
+async def test_options_applied_without_reload(hass, bypass_get_data):
+    """Test options are applied to the running coordinator, and only platform
+    changes reload the entry."""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    client = coordinator.api
+    assert (
+        hass.states.get("sensor.psl_123456_total_cost").attributes[
+            "unit_of_measurement"
+        ]
+        == "GBP"
+    )
+
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_SCAN_INTERVAL: 120, CONF_CURRENCY: "EUR"},
+    )
+    await hass.async_block_till_done()
+
+    # The same coordinator and client carry on with the new options
+    assert hass.data[DOMAIN][config_entry.entry_id] is coordinator
+    assert coordinator.api is client
+    assert coordinator.tier_intervals[TIER_CONNECTIVITY] == timedelta(seconds=120)
+    assert coordinator.update_interval <= timedelta(seconds=120)
+    assert (
+        hass.states.get("sensor.psl_123456_total_cost").attributes[
+            "unit_of_measurement"
+        ]
+        == "EUR"
+    )
+
+    # Turning on http debug replaces the client, keeping the breaker and limiter
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_SCAN_INTERVAL: 120, CONF_CURRENCY: "EUR", CONF_HTTP_DEBUG: True},
+    )
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][config_entry.entry_id] is coordinator
+    assert coordinator.api is not client
+    assert coordinator.api.breaker is coordinator.circuit_breaker
+    assert coordinator.api.client.limiter is coordinator.rate_limiter
+
+    # Disabling a platform needs the entry reloaded
+    hass.config_entries.async_update_entry(
+        config_entry,
+        options={CONF_SCAN_INTERVAL: 120, CONF_CURRENCY: "EUR", SWITCH: False},
+    )
+    await hass.async_block_till_done()
+    assert hass.data[DOMAIN][config_entry.entry_id] is not coordinator
+    assert SWITCH not in hass.data[DOMAIN][config_entry.entry_id].platforms
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_unload_persists_charges(hass, hass_storage, bypass_get_data):
+    """Test saves still waiting on their delay are written when unloading"""
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert f"{CHARGE_CACHE_KEY}.test" not in hass_storage
+    assert f"{SNAPSHOT_KEY}.test" not in hass_storage
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+    cached = hass_storage[f"{CHARGE_CACHE_KEY}.test"]["data"]
+    assert len(cached["charges"]) == len(coordinator.home_charges) > 0
+    assert len(hass_storage[f"{SNAPSHOT_KEY}.test"]["data"]["pods"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_charges_not_fetched_without_readers(hass, bypass_get_data):
+    """Test charges are not fetched while the entities reading them are disabled,
+    even with statistics being imported"""
+    hass.config.components.add("recorder")
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    registry = er.async_get(hass)
+    for suffix in (
+        "charge_time",
+        "status_total_energy",
+        "status_total_energy_current_charge_energy",
+        "total_cost",
+        "last_complete_charge_cost",
+    ):
+        registry.async_get_or_create(
+            SENSOR,
+            DOMAIN,
+            f"{DOMAIN}_12234_PSL-123456_{suffix}",
+            config_entry=config_entry,
+            disabled_by=er.RegistryEntryDisabler.USER,
+        )
+
+    with patch(
+        "custom_components.pod_point.energy_statistics.EnergyStatisticsImporter.async_import"
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        coordinator = hass.data[DOMAIN][config_entry.entry_id]
+        assert TIER_CHARGES not in coordinator.demanded_tiers
+
+        with patch(
+            "podpointclient.client.PodPointClient.async_get_charges"
+        ) as get_charges:
+            coordinator.async_mark_tiers_due(*TIERS)
+            await coordinator.async_refresh()
+
+        assert coordinator.last_update_success is True
+        get_charges.assert_not_called()
+
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,220 @@
+"""Test pod_point rate limiter."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from podpointclient.client import PodPointClient
+import pytest
+
+from custom_components.pod_point.call_timeout import CallTimeout
+from custom_components.pod_point.const import (
+    TIER_CHARGES,
+    TIER_CONNECTIVITY,
+    TIER_FIRMWARE,
+)
+from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+from custom_components.pod_point.rate_limiter import (
+    RateLimitedClient,
+    RateLimiter,
+    RequestBudgetExhausted,
+    get_rate_limiter,
+)
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_throttles_bursts():
+    """Test requests beyond the burst wait for the bucket to refill"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=3, hourly_budget=100, clock=clock)
+
+    async def sleep(seconds):
+        clock.now += seconds
+
+    with patch("asyncio.sleep", side_effect=sleep) as sleep_mock:
+        for _ in range(3):
+            await limiter.async_acquire()
+        sleep_mock.assert_not_called()
+
+        await limiter.async_acquire()
+        sleep_mock.assert_called_once_with(0.5)
+
+    assert limiter.throttle_events == 1
+    assert limiter.throttled_seconds == 0.5
+    assert limiter.remaining_budget == 96
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_hourly_budget():
+    """Test requests fail once the budget is used, until the hour has passed"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=100.0, burst=100, hourly_budget=8, clock=clock)
+
+    for _ in range(6):
+        await limiter.async_acquire()
+    assert limiter.remaining_budget == 2
+    assert limiter.budget_stretch == 1.0
+
+    await limiter.async_acquire()
+    # An eighth of the budget left, stretched to last
+    assert limiter.budget_stretch == 2.0
+
+    await limiter.async_acquire()
+    with pytest.raises(RequestBudgetExhausted):
+        await limiter.async_acquire()
+    assert limiter.rejected_requests == 1
+    assert limiter.budget_stretch == 8.0
+    assert limiter.seconds_until_budget == 60 * 60
+
+    clock.now += 60 * 60
+    assert limiter.remaining_budget == 8
+    assert limiter.seconds_until_budget == 0
+    await limiter.async_acquire()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_scales_with_pods():
+    """Test the limits grow with the pods on the account"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=10, hourly_budget=1000, clock=clock)
+
+    limiter.scale(100)
+    assert limiter.rate == 6.0
+    assert limiter.burst == 210
+    assert limiter.hourly_budget == 7000
+
+    # The extra burst is available straight away, to poll every pod
+    with patch("asyncio.sleep") as sleep_mock:
+        for _ in range(210):
+            await limiter.async_acquire()
+        sleep_mock.assert_not_called()
+
+    limiter.scale(0)
+    assert (limiter.rate, limiter.burst, limiter.hourly_budget) == (1.0, 10, 1000)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_client_timeout():
+    """Test only the request counts against a call's timeout, not the wait"""
+    limiter = RateLimiter(rate=10.0, burst=1, hourly_budget=100)
+    client = RateLimitedClient(
+        MagicMock(async_get_user=AsyncMock(return_value="user")), limiter
+    )
+
+    # Each call waits 0.1s for the limiter, longer than the call is given
+    await limiter.async_acquire()
+    async with CallTimeout(0.05):
+        assert await client.async_get_user() == "user"
+
+    # Waiting for the limiter still counts against the deadline
+    loop = asyncio.get_running_loop()
+    with pytest.raises(TimeoutError):
+        async with CallTimeout(0.05, deadline=loop.time() + 0.02) as call_timeout:
+            await client.async_get_user()
+    assert call_timeout.expired
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_client_pages(hass):
+    """Test every page of charges takes a token and a request from the budget"""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=10, hourly_budget=100, clock=clock)
+    session = async_get_clientsession(hass)
+    client = RateLimitedClient(
+        PodPointClient(username="test", password="test", session=session), limiter
+    )
+
+    pages = [[1, 2], [3, 4], [5]]
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        AsyncMock(side_effect=pages),
+    ) as charges_mock:
+        assert await client.async_get_all_charges(perpage=2) == [1, 2, 3, 4, 5]
+
+    assert charges_mock.await_count == 3
+    assert limiter.remaining_budget == 97
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_client(hass):
+    """Test client calls wait on the limiter shared by the account"""
+    limiter = get_rate_limiter(hass, "Test@Example.com")
+    assert get_rate_limiter(hass, "test@example.com") is limiter
+
+    session = async_get_clientsession(hass)
+    client = RateLimitedClient(
+        PodPointClient(username="test@example.com", password="pass", session=session),
+        limiter,
+    )
+    assert client.email == "test@example.com"
+
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_user", return_value="user"
+    ), patch.object(limiter, "async_acquire", AsyncMock()) as acquire_mock:
+        assert await client.async_get_user() == "user"
+        acquire_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_stretches_polling(hass):
+    """Test adaptive polling is stretched when the budget runs low"""
+    limiter = RateLimiter(rate=100.0, burst=100, hourly_budget=8)
+    session = async_get_clientsession(hass)
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=PodPointClient(username="test", password="test", session=session),
+        scan_interval=timedelta(seconds=300),
+        rate_limiter=limiter,
+    )
+    assert coordinator.tier_interval(TIER_CONNECTIVITY) == timedelta(seconds=300)
+
+    for _ in range(7):
+        await limiter.async_acquire()
+    assert coordinator.tier_interval(TIER_CONNECTIVITY) == timedelta(seconds=600)
+
+    # Whether or not polling adapts, every tier is stretched
+    coordinator.adaptive_polling = False
+    assert coordinator.tier_interval(TIER_CONNECTIVITY) == timedelta(seconds=600)
+    assert coordinator.tier_interval(TIER_FIRMWARE) == 2 * timedelta(seconds=1500)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_defers_refresh(hass, bypass_get_data):
+    """Test refreshes wait for the budget once it is used up, rather than fail"""
+    limiter = RateLimiter(rate=1000.0, burst=1000, hourly_budget=5)
+    session = async_get_clientsession(hass)
+    coordinator = PodPointDataUpdateCoordinator(
+        hass,
+        client=RateLimitedClient(
+            PodPointClient(username="test", password="test", session=session),
+            limiter,
+        ),
+        scan_interval=timedelta(seconds=300),
+        rate_limiter=limiter,
+    )
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success is True
+    pods = coordinator.data
+
+    while limiter.remaining_budget > 0:
+        await limiter.async_acquire()
+
+    coordinator.async_mark_tiers_due(TIER_CONNECTIVITY, TIER_CHARGES)
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success is True
+    assert coordinator.data is pods
+    assert coordinator.refreshed_tiers == set()
+    assert coordinator.update_interval > timedelta(minutes=59)
+    assert limiter.rejected_requests == 0
@@ -0,0 +1,77 @@
+"""Test pod_point schedule index."""
+
+from datetime import datetime
+
+from podpointclient.schedule import Schedule, ScheduleStatus
+
+from custom_components.pod_point.schedule_index import compile_schedules
+
+
+def week(*overnight_days: int):
+    """Schedules running 02:00 to 07:00 on the given days, inactive on the rest"""
+    return [
+        Schedule(
+            day,
+            "02:00:00",
+            day,
+            "07:00:00",
+            ScheduleStatus(is_active=day in overnight_days),
+        )
+        for day in range(1, 8)
+    ]
+
+
+def moment(day: int, time: str) -> datetime:
+    """A time on a day in the week of Monday 3rd January 2022"""
+    hour, minute, second = (int(part) for part in time.split(":"))
+    return datetime(2022, 1, 2 + day, hour, minute, second)
+
+
+def test_schedule_index_allowed_at():
+    """Test charging is allowed within each day's schedule"""
+    index = compile_schedules(week(1, 2))
+
+    assert index.allowed_at(moment(1, "01:59:59")) is False
+    assert index.allowed_at(moment(1, "02:00:00")) is True
+    assert index.allowed_at(moment(1, "07:00:00")) is True
+    assert index.allowed_at(moment(1, "07:00:01")) is False
+    assert index.allowed_at(moment(2, "03:00:00")) is True
+    # Inactive schedules allow charging all day
+    assert index.allowed_at(moment(3, "01:00:00")) is True
+    assert index.allowed_at(moment(7, "23:59:59")) is True
+
+    # Days without a schedule block charging
+    index = compile_schedules(week(1)[1:])
+    assert index.allowed_at(moment(1, "03:00:00")) is False
+    assert index.allowed_at(moment(2, "03:00:00")) is True
+
+
+def test_schedule_index_overnight():
+    """Test schedules ending on a later day run until midnight"""
+    schedules = week()
+    schedules[6] = Schedule(7, "22:00:00", 1, "06:00:00", ScheduleStatus(True))
+    index = compile_schedules(schedules)
+
+    assert index.allowed_at(moment(7, "21:59:59")) is False
+    assert index.allowed_at(moment(7, "23:00:00")) is True
+    # Monday is decided by Monday's schedule
+    assert index.allowed_at(moment(1, "01:00:00")) is True
+
+
+def test_schedule_index_next_transition():
+    """Test the next moment charging becomes allowed or blocked"""
+    index = compile_schedules(week(1, 7))
+
+    assert index.next_transition(moment(1, "01:00:00")) == moment(1, "02:00:00")
+    assert index.next_transition(moment(1, "03:00:00")) == moment(1, "07:00:01")
+    assert index.next_transition(moment(5, "12:00:00")) == moment(7, "00:00:00")
+    # Across the end of the week
+    assert index.next_transition(moment(7, "08:00:00")) == datetime(2022, 1, 10, 2)
+
+    assert compile_schedules(week()).next_transition(moment(1, "01:00:00")) is None
+
+
+def test_schedule_index_compiled_once():
+    """Test schedules are only compiled when they change"""
+    assert compile_schedules(week(1)) is compile_schedules(week(1))
+    assert compile_schedules(week(1)) is not compile_schedules(week(2))
@@ -26,7 +26,6 @@ from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.pod_point import async_setup_entry
 from custom_components.pod_point.const import (
-    ATTR_STATE,
     ATTR_STATE_AVAILABLE,
     ATTR_STATE_CHARGING,
     ATTR_STATE_CONNECTED_WAITING,
@@ -40,6 +39,7 @@ from custom_components.pod_point.const import (
     DOMAIN,
     SENSOR,
     SWITCH,
+    TIERS,
 )
 from custom_components.pod_point.sensor import (
     PodPointAccountBalanceEntity,
@@ -158,13 +158,14 @@ async def test_total_energy_pod_sensor(hass, bypass_get_data):
     assert STATE_CLASS_TOTAL_INCREASING == total_energy.state_class
     assert 0.0 == total_energy.native_value
     assert ENERGY_KILO_WATT_HOUR == total_energy.native_unit_of_measurement
-    assert "mdi:lightning-bolt-outline" == total_energy.icon
-    assert False == total_energy.is_on
-
-    total_energy.extra_attrs[ATTR_STATE] = "charging"
     assert "mdi:lightning-bolt" == total_energy.icon
     assert True == total_energy.is_on
 
+    total_energy.pod.statuses[0].key_name = "available"
+    total_energy.coordinator.update_view_models()
+    assert "mdi:lightning-bolt-outline" == total_energy.icon
+    assert False == total_energy.is_on
+
     assert total_energy.options is None
 
 
@@ -187,7 +188,8 @@ async def test_current_energy_pod_sensor(hass, bypass_get_data):
     assert 0.0 == current_energy.native_value
     assert "mdi:car-electric" == current_energy.icon
 
-    current_energy.extra_state_attributes[ATTR_STATE] = "foo"
+    current_energy.pod.statuses[0].key_name = "foo"
+    current_energy.coordinator.update_view_models()
     assert "mdi:car" == current_energy.icon
 
     assert current_energy.options is None
@@ -214,6 +216,7 @@ async def test_total_charge_time_pod_sensor(hass, bypass_get_data):
     assert "mdi:timer" == charge_time.icon
 
     charge_time.pod.total_charge_seconds = 61
+    charge_time.coordinator.update_view_models()
     assert 61 == charge_time.native_value
     assert {
         "formatted": "0:01:01",
@@ -222,6 +225,7 @@ async def test_total_charge_time_pod_sensor(hass, bypass_get_data):
     } == charge_time.extra_state_attributes
 
     charge_time.pod.total_charge_seconds = 9945
+    charge_time.coordinator.update_view_models()
     assert 9945 == charge_time.native_value
     assert {
         "formatted": "2:45:45",
@@ -230,6 +234,7 @@ async def test_total_charge_time_pod_sensor(hass, bypass_get_data):
     } == charge_time.extra_state_attributes
 
     charge_time.pod.total_charge_seconds = 175545
+    charge_time.coordinator.update_view_models()
     assert 175545 == charge_time.native_value
     assert {
         "formatted": "2 days, 0:45:45",
@@ -238,6 +243,7 @@ async def test_total_charge_time_pod_sensor(hass, bypass_get_data):
     } == charge_time.extra_state_attributes
 
     charge_time.pod.total_charge_seconds = 2764800
+    charge_time.coordinator.update_view_models()
     assert 2764800 == charge_time.native_value
     assert {
         "formatted": "32 days, 0:00:00",
@@ -246,6 +252,7 @@ async def test_total_charge_time_pod_sensor(hass, bypass_get_data):
     } == charge_time.extra_state_attributes
 
     charge_time.pod.total_charge_seconds = 66355200
+    charge_time.coordinator.update_view_models()
     assert 66355200 == charge_time.native_value
     assert {
         "formatted": "768 days, 0:00:00",
@@ -276,6 +283,7 @@ async def test_total_cost_pod_sensor(hass, bypass_get_data):
     assert "mdi:cash-multiple" == total_cost.icon
 
     total_cost.pod.total_cost = 61
+    total_cost.coordinator.update_view_models()
     assert 0.61 == total_cost.native_value
     assert {
         "amount": 0.61,
@@ -285,6 +293,7 @@ async def test_total_cost_pod_sensor(hass, bypass_get_data):
     } == total_cost.extra_state_attributes
 
     total_cost.pod.total_cost = 9945
+    total_cost.coordinator.update_view_models()
     assert 99.45 == total_cost.native_value
     assert {
         "amount": 99.45,
@@ -294,6 +303,7 @@ async def test_total_cost_pod_sensor(hass, bypass_get_data):
     } == total_cost.extra_state_attributes
 
     total_cost.pod.total_cost = 175545
+    total_cost.coordinator.update_view_models()
     assert 1755.45 == total_cost.native_value
     assert {
         "amount": 1755.45,
@@ -303,6 +313,7 @@ async def test_total_cost_pod_sensor(hass, bypass_get_data):
     } == total_cost.extra_state_attributes
 
     total_cost.pod.total_cost = 2764800
+    total_cost.coordinator.update_view_models()
     assert 27648.00 == total_cost.native_value
     assert {
         "amount": 27648.0,
@@ -346,6 +357,7 @@ async def test_last_charge_cost_pod_sensor(hass, bypass_get_data):
     } == last_charge.extra_state_attributes
 
     setattr(last_charge.pod, "last_charge_cost", 9945)
+    last_charge.coordinator.update_view_models()
     assert 99.45 == last_charge.native_value
     assert {
         "amount": 99.45,
@@ -379,6 +391,39 @@ async def test_balance_sensor(hass, bypass_get_data):
     assert balance.native_unit_of_measurement == "GBP"
 
 
+@pytest.mark.asyncio
+async def test_sensors_skip_unrendered_changes(hass, bypass_get_data):
+    """Tests sensors are not written when only data they do not show changes"""
+    (_, sensors) = await setup_sensors(hass)
+
+    [_, _, total_energy, _, _, last_message, _, _, _, _, balance] = sensors
+    coordinator = total_energy.coordinator
+    for sensor in (total_energy, last_message, balance):
+        sensor.async_write_ha_state = Mock()
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state.reset_mock()
+
+    # A connectivity heartbeat, alongside every other tier being refreshed
+    coordinator.refreshed_tiers = set(TIERS)
+    total_energy.pod.last_message_at = datetime.fromisoformat(
+        "2023-01-01T12:00:00+00:00"
+    )
+    coordinator.update_view_models()
+    assert {total_energy.pod_unit_id} == coordinator.changed_unit_ids
+
+    for sensor in (total_energy, last_message, balance):
+        sensor._handle_coordinator_update()
+
+    last_message.async_write_ha_state.assert_called_once()
+    total_energy.async_write_ha_state.assert_not_called()
+    balance.async_write_ha_state.assert_not_called()
+
+    total_energy.pod.total_kwh += 1.5
+    coordinator.update_view_models()
+    total_energy._handle_coordinator_update()
+    total_energy.async_write_ha_state.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_charge_mode_sensor(hass, bypass_get_data):
     """Tests for pod total charge time sensor."""
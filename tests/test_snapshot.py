@@ -0,0 +1,163 @@
+"""Test pod_point snapshot."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+from podpointclient.client import PodPointClient
+from podpointclient.errors import ApiConnectionError
+from podpointclient.factories import FirmwareFactory, PodFactory, UserFactory
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.pod_point.const import (
+    DOMAIN,
+    SNAPSHOT_KEY,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_VERSION,
+    TIER_USER,
+)
+from custom_components.pod_point.coordinator import PodPointDataUpdateCoordinator
+from custom_components.pod_point.snapshot import CoordinatorSnapshot
+
+from .const import MOCK_CONFIG
+from .fixtures import (
+    FIRMWARE_COMPLETE_FIXTURE,
+    POD_COMPLETE_FIXTURE,
+    USER_COMPLETE_FIXTURE,
+)
+
+
+def build_pods():
+    """Build the fixture pods, with their firmware"""
+    pods = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE]})
+    pods[0].firmware = FirmwareFactory().build_firmwares(FIRMWARE_COMPLETE_FIXTURE)[0]
+    return pods
+
+
+async def flush_saves(hass):
+    """Move time on so that delayed saves are written"""
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1)
+    )
+    await hass.async_block_till_done()
+
+
+async def save_snapshot(hass, fetched_at=None):
+    """Save a snapshot of the fixture pods and user for the test entry"""
+    CoordinatorSnapshot(hass, "test").async_save(
+        fetched_at or dt_util.utcnow(),
+        build_pods(),
+        UserFactory().build_user(USER_COMPLETE_FIXTURE),
+    )
+    await flush_saves(hass)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip(hass, hass_storage):
+    """Test pods and the user survive being saved and loaded."""
+    fetched_at = dt_util.utcnow().replace(microsecond=0)
+    await save_snapshot(hass, fetched_at)
+
+    stored = hass_storage[f"{SNAPSHOT_KEY}.test"]
+    assert stored["version"] == SNAPSHOT_VERSION
+    assert "connectivity_status" not in stored["data"]["pods"][0]
+
+    loaded_at, pods, user = await CoordinatorSnapshot(hass, "test").async_load()
+    original = build_pods()[0]
+    restored = pods[0]
+
+    assert loaded_at == fetched_at
+    assert restored.unit_id == original.unit_id
+    assert restored.ppid == original.ppid
+    assert restored.price == original.price
+    assert restored.model == original.model
+    assert restored.statuses == original.statuses
+    assert restored.charge_schedules == original.charge_schedules
+    assert restored.firmware.dict == original.firmware.dict
+    assert user.account == UserFactory().build_user(USER_COMPLETE_FIXTURE).account
+
+
+@pytest.mark.asyncio
+async def test_snapshot_nothing_saved(hass, hass_storage):
+    """Test loading without a snapshot returns nothing to restore."""
+    fetched_at, pods, user = await CoordinatorSnapshot(hass, "test").async_load()
+    assert fetched_at is None
+    assert pods == []
+    assert user is None
+
+
+@pytest.mark.asyncio
+async def test_setup_from_snapshot_while_unreachable(hass, hass_storage):
+    """Test entities are created from the snapshot when Pod Point cannot be reached,
+    and show the snapshot's data while it is fresh enough."""
+    await save_snapshot(hass)
+
+    config_entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG, entry_id="test")
+    config_entry.add_to_hass(hass)
+
+    unreachable = ApiConnectionError("down")
+    with patch(
+        "podpointclient.client.PodPointClient.async_get_all_pods",
+        side_effect=unreachable,
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_user",
+        side_effect=unreachable,
+    ), patch(
+        "podpointclient.client.PodPointClient.async_get_charges",
+        side_effect=unreachable,
+    ):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        coordinator = hass.data[DOMAIN][config_entry.entry_id]
+        assert coordinator.online is False
+        assert coordinator.restored_snapshot is True
+        assert coordinator.data_available is True
+        assert (
+            coordinator.view_models[coordinator.pods[0].unit_id].attributes["data_age"]
+            >= 0
+        )
+
+        assert hass.states.get("sensor.psl_123456_status").state == "charging"
+        assert hass.states.get("sensor.pod_point_balance").state == "1.73"
+        assert hass.states.get("switch.psl_123456_charging_allowed") is not None
+
+        assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_reconciles_snapshot(hass, hass_storage, bypass_get_data):
+    """Test the first refresh after a restore fetches everything and saves again."""
+    await save_snapshot(hass)
+
+    client = PodPointClient(
+        username="test@example.com",
+        password="password",
+        session=async_get_clientsession(hass),
+    )
+    coordinator = PodPointDataUpdateCoordinator(
+        hass, client=client, scan_interval=timedelta(seconds=300), entry_id="test"
+    )
+    assert await coordinator.async_restore_snapshot() is True
+    assert len(coordinator.data) == 1
+    assert coordinator.data[0].connectivity_status is None
+
+    # Without cached charges every charge is fetched
+    await coordinator.async_refresh()
+    assert coordinator.online is True
+    assert coordinator.restored_snapshot is False
+    assert coordinator.data_age is None
+    assert coordinator.data[0].connectivity_status is not None
+    assert len(coordinator.data[0].charges) == 9
+
+    with patch.object(coordinator.snapshot, "async_save") as save_mock:
+        coordinator.async_mark_tiers_due(TIER_USER)
+        await coordinator.async_refresh()
+    save_mock.assert_called_once()
+
+    await coordinator.async_shutdown()
@@ -0,0 +1,43 @@
+"""Test pod_point view model."""
+
+from dataclasses import FrozenInstanceError
+
+from podpointclient.connectivity_status import ConnectivityStatus
+from podpointclient.factories import PodFactory
+import pytest
+
+from custom_components.pod_point.view_model import build_pod_view_model
+
+from .fixtures import CONNECTIVITY_STATUS_COMPLETE_FIXTURE, POD_COMPLETE_FIXTURE
+
+
+def test_build_pod_view_model():
+    """Test a pod is resolved into what its entities display"""
+    pod = PodFactory().build_pods({"pods": [POD_COMPLETE_FIXTURE]})[0]
+    view_model = build_pod_view_model(pod)
+
+    assert view_model.state == "charging"
+    assert view_model.connected is True
+    assert view_model.charging_allowed is True
+    assert view_model.cloud_connected is False
+    assert view_model.signal_strength == 0
+    assert view_model.charge_override is None
+    assert view_model.attributes["state"] == "charging"
+    assert view_model.attributes["id"] == pod.id
+
+    # Shared between entities, so can not be changed
+    with pytest.raises(FrozenInstanceError):
+        view_model.state = "available"
+    with pytest.raises(TypeError):
+        view_model.attributes["state"] = "available"
+
+    pod.connectivity_status = ConnectivityStatus(CONNECTIVITY_STATUS_COMPLETE_FIXTURE)
+    pod.statuses[0].key_name = "available"
+    view_model = build_pod_view_model(pod)
+
+    assert view_model.state == "available"
+    assert view_model.connected is False
+    assert view_model.cloud_connected is True
+    assert view_model.signal_strength == (
+        pod.connectivity_status.evses[0].connectivity_state.signal_strength
+    )